@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import time
+
+from infrastructure.postgres_db import database
+from infrastructure.repositories import CarArchiver
+from logger import get_logger
+from settings import get_settings
+
+settings = get_settings()
+logger = get_logger()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Перенос проданных и устаревших объявлений в cars_archive"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.archive_batch_size,
+        help="Количество строк, переносимых одной транзакцией",
+    )
+    parser.add_argument(
+        "--max-batches",
+        type=int,
+        default=1_000_000,
+        help="Ограничение числа пачек; по умолчанию переносится всё",
+    )
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    archiver = CarArchiver(
+        sold_after_days=settings.archive_sold_after_days,
+        stale_after_days=settings.archive_stale_after_days,
+        batch_size=args.batch_size,
+        max_batches=args.max_batches,
+    )
+    started_at = time.perf_counter()
+    try:
+        async with database.session() as session:
+            archived = await archiver.run(session)
+        # Освобождаем место удалённых строк и обновляем статистику планировщика;
+        # VACUUM нельзя выполнять внутри транзакции
+        async with database.engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            await connection.exec_driver_sql("VACUUM ANALYZE cars")
+        logger.info(
+            f"Перенесено в архив {archived} объявлений за "
+            f"{time.perf_counter() - started_at:.1f} с"
+        )
+    except Exception as e:
+        logger.error(f"Произошла ошибка при переносе в архив: {e}")
+        raise
+    finally:
+        await database.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+import asyncio
+from typing import List, Optional
+
+
+async def asgi_get(
+    app, path: str, query_string: str = "", expected_status: int = 200
+) -> bytes:
+    """Минимальный ASGI-клиент: один GET-запрос без сети и сторонних зависимостей"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    request_sent = False
+    response_complete = asyncio.Event()
+    status: Optional[int] = None
+    body: List[bytes] = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(scope, receive, send)
+    if status != expected_status:
+        raise RuntimeError(f"{path}?{query_string}: статус {status}")
+    return b"".join(body)
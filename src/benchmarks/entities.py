@@ -0,0 +1,159 @@
+"""
+Память и скорость построения сущностей для страницы списка автомобилей:
+прежние dataclass без __slots__ с datetime.utcnow в default_factory и
+ручным _to_entity против текущих сущностей со __slots__ и общего EntityMapper.
+
+Для каждого автомобиля строятся три сущности (автомобиль, модель и бренд),
+как в GET /api/public/cars. ORM-объекты создаются в памяти, база данных не нужна.
+
+Запуск из каталога src: python -m benchmarks.entities
+"""
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+from dataclasses import field, fields, make_dataclass
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from benchmarks.fixtures import make_cars
+from core.entites import Brand as BrandEntity
+from core.entites import Car as CarEntity
+from core.entites import Model as ModelEntity
+from infrastructure.models import Brand, Car, Model
+from infrastructure.repositories import CarRepository
+
+
+def legacy_dataclass(entity_class: type) -> type:
+    """Копия сущности в прежнем виде: без __slots__, даты через default_factory"""
+    spec = []
+    for item in fields(entity_class):
+        if item.name in ("created_at", "updated_at"):
+            spec.append((item.name, datetime, field(default_factory=datetime.utcnow)))
+        else:
+            copy = field(default=item.default, default_factory=item.default_factory)
+            spec.append((item.name, item.type, copy))
+    return make_dataclass(f"Legacy{entity_class.__name__}", spec)
+
+
+LegacyBrand = legacy_dataclass(BrandEntity)
+LegacyModel = legacy_dataclass(ModelEntity)
+LegacyCar = legacy_dataclass(CarEntity)
+
+
+def legacy_to_entity(car: Car, model: Model, brand: Brand):
+    """Прежний CarRepository._to_entity с перечислением полей вручную"""
+    car_entity = LegacyCar(
+        id=car.id,
+        model_id=car.model_id,
+        year=car.year,
+        price=car.price,
+        mileage=car.mileage,
+        condition=car.condition,
+        fuel_type=car.fuel_type,
+        transmission=car.transmission,
+        drive_type=car.drive_type,
+        seller_id=car.seller_id,
+        color=car.color,
+        engine_volume=car.engine_volume,
+        power=car.power,
+        description=car.description,
+        vin=car.vin,
+        is_sold=car.is_sold,
+        photos=car.photos,
+        thumbnails=car.thumbnails,
+        created_at=car.created_at,
+        updated_at=car.updated_at,
+    )
+    car_entity.model = LegacyModel(
+        id=model.id,
+        name=model.name,
+        brand_id=model.brand_id,
+        year_from=model.year_from,
+        year_to=model.year_to,
+        created_at=model.created_at,
+        updated_at=model.updated_at,
+    )
+    car_entity.brand = LegacyBrand(
+        id=brand.id,
+        name=brand.name,
+        country=brand.country,
+        logo_url=brand.logo_url,
+        created_at=brand.created_at,
+        updated_at=brand.updated_at,
+    )
+    return car_entity
+
+
+def orm_rows(count: int) -> List[Car]:
+    """ORM-объекты автомобилей с загруженными моделью и брендом, без базы данных"""
+    models, brands, rows = {}, {}, []
+
+    def columns(entity, orm_class) -> dict:
+        names = set(orm_class.__table__.columns.keys())
+        return {
+            item.name: getattr(entity, item.name)
+            for item in fields(entity)
+            if item.name in names
+        }
+
+    for car in make_cars(count):
+        brand = brands.setdefault(car.brand.id, Brand(**columns(car.brand, Brand)))
+        model = models.get(car.model.id)
+        if model is None:
+            model = models[car.model.id] = Model(**columns(car.model, Model), brand=brand)
+        rows.append(Car(**columns(car, Car), model=model))
+    return rows
+
+
+def measure_memory(build: Callable[[], list]) -> Dict[str, float]:
+    """Объём и количество блоков памяти, которые остаются занятыми построенным списком"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    size = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    del result
+    return {"bytes": size, "blocks": blocks}
+
+
+def measure_time(build: Callable[[], list], repeat: int) -> float:
+    build()  # прогрев
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        build()
+        timings.append(time.perf_counter() - started_at)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк памяти и скорости сущностей")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = orm_rows(args.rows)
+    mapper = CarRepository(None)
+    variants = {
+        "legacy": lambda: [legacy_to_entity(car, car.model, car.model.brand) for car in rows],
+        "current": lambda: [mapper._to_entity(car, car.model, car.model.brand) for car in rows],
+    }
+
+    print(f"{'variant':>8} {'bytes/row':>10} {'blocks/row':>11} {'time, ms':>9}")
+    for name, build in variants.items():
+        memory = measure_memory(build)
+        elapsed = measure_time(build, args.repeat)
+        print(
+            f"{name:>8} {memory['bytes'] / args.rows:>10.0f} "
+            f"{memory['blocks'] / args.rows:>11.1f} {elapsed * 1000:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import random
+from dataclasses import fields
+from datetime import datetime, timedelta
+from typing import List, Tuple
+from uuid import UUID
+
+from core.entites import (
+    Car,
+    Brand,
+    Model,
+    CarCondition,
+    FuelType,
+    TransmissionType,
+    DriveType,
+)
+
+BRAND_NAMES = ["Toyota", "BMW", "Lada", "Kia", "Hyundai", "Audi", "Skoda", "Volvo"]
+COLORS = ["black", "white", "silver", "red", "blue", "grey", None]
+
+
+def _uuid(rng: random.Random) -> UUID:
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+def make_catalogue(
+    brands: int = 8, models_per_brand: int = 10, seed: int = 42
+) -> List[Tuple[Model, Brand]]:
+    """Воспроизводимый набор пар (модель, бренд)"""
+    rng = random.Random(seed)
+    base_time = datetime(2025, 1, 1)
+    models = []
+    for brand_index in range(brands):
+        brand = Brand(
+            id=_uuid(rng),
+            name=f"{BRAND_NAMES[brand_index % len(BRAND_NAMES)]} {brand_index}",
+            country="RU",
+            created_at=base_time,
+            updated_at=base_time,
+        )
+        for model_index in range(models_per_brand):
+            model = Model(
+                id=_uuid(rng),
+                name=f"Model {brand_index}-{model_index}",
+                brand_id=brand.id,
+                year_from=2000 + model_index,
+                created_at=base_time,
+                updated_at=base_time,
+            )
+            models.append((model, brand))
+    return models
+
+
+def make_cars(count: int, seed: int = 42, with_brand_model: bool = True) -> List[Car]:
+    """Воспроизводимый список автомобилей для бенчмарков"""
+    rng = random.Random(seed)
+    catalogue = make_catalogue(seed=seed)
+    base_time = datetime(2025, 6, 1)
+    cars = []
+    for index in range(count):
+        model, brand = catalogue[rng.randrange(len(catalogue))]
+        created_at = base_time + timedelta(minutes=index)
+        car = Car(
+            id=_uuid(rng),
+            model_id=model.id,
+            year=rng.randint(2000, 2025),
+            price=round(rng.uniform(300_000, 8_000_000), 2),
+            mileage=rng.randint(0, 300_000),
+            condition=rng.choice(list(CarCondition)),
+            fuel_type=rng.choice(list(FuelType)),
+            transmission=rng.choice(list(TransmissionType)),
+            drive_type=rng.choice(list(DriveType)),
+            seller_id=_uuid(rng),
+            color=rng.choice(COLORS),
+            engine_volume=round(rng.uniform(1.0, 5.0), 1),
+            power=rng.randint(70, 500),
+            description=f"Автомобиль в хорошем состоянии, объявление {index}",
+            vin=f"XTA{index:014d}",
+            photos=[f"https://cdn.example.com/cars/{index}/{n}.jpg" for n in range(3)],
+            created_at=created_at,
+            updated_at=created_at,
+        )
+        if with_brand_model:
+            car.model = model
+            car.brand = brand
+        cars.append(car)
+    return cars
+
+
+async def seed_database(session, car_count: int, seed: int = 42, chunk_size: int = 5000) -> None:
+    """
+    Заполняет базу воспроизводимым каталогом: бренды, модели и car_count
+    автомобилей. Существующие бренды, модели и автомобили удаляются
+    """
+    from sqlalchemy import insert, text
+
+    from infrastructure.models import Brand as BrandModel
+    from infrastructure.models import Car as CarModel
+    from infrastructure.models import Model as ModelModel
+
+    await session.execute(text("TRUNCATE cars, models, brands CASCADE"))
+
+    catalogue = make_catalogue(seed=seed)
+    brands = {brand.id: brand for _, brand in catalogue}
+    await session.execute(
+        insert(BrandModel),
+        [
+            dict(id=b.id, name=b.name, country=b.country, created_at=b.created_at, updated_at=b.updated_at)
+            for b in brands.values()
+        ],
+    )
+    await session.execute(
+        insert(ModelModel),
+        [
+            dict(
+                id=m.id,
+                name=m.name,
+                brand_id=m.brand_id,
+                year_from=m.year_from,
+                created_at=m.created_at,
+                updated_at=m.updated_at,
+            )
+            for m, _ in catalogue
+        ],
+    )
+
+    cars = make_cars(car_count, seed=seed, with_brand_model=False)
+    for start in range(0, len(cars), chunk_size):
+        rows = []
+        for car in cars[start : start + chunk_size]:
+            row = {
+                item.name: getattr(car, item.name)
+                for item in fields(car)
+                if item.name not in ("model", "brand")
+            }
+            # Продавцы в бенчмарке не создаются
+            row["seller_id"] = None
+            rows.append(row)
+        await session.execute(insert(CarModel), rows)
+    await session.commit()
+    await session.execute(text("ANALYZE cars, models, brands"))
+    await session.commit()
@@ -0,0 +1,264 @@
+"""
+Бенчмарк страницы списка автомобилей по слоям:
+
+- orm — запрос с joinedload модели и бренда, загрузка ORM-объектов;
+- mapping — CarRepository._to_entity для уже загруженных объектов;
+- repository — CarRepository.get_all (запрос и преобразование);
+- service — CarService.get_cars_page без кэша справочника (модель и бренд
+  через joinedload);
+- service_index — CarService.get_cars_page с кэшем справочника, как в
+  публичном списке: загружаются только строки cars, модель и бренд берутся
+  из снимка справочника в памяти;
+- validation — валидация сущностей по List[CarDetailResponse];
+- orjson — выгрузка провалидированных моделей и кодирование orjson;
+- dump_json — кодирование сразу в JSON-байты pydantic-core (текущий путь);
+- asgi — полный запрос GET /api/public/cars к приложению в том же процессе.
+
+Перед каждым размером каталога бренды, модели и автомобили в базе удаляются
+и создаются заново, поэтому бенчмарк работает только с отдельной базой,
+в имени которой есть "bench". Запуск из каталога src:
+
+    POSTGRES_DB=my_cars_bench python -m benchmarks.layers --output bench.json
+
+Сравнение двух прогонов (например, до и после изменения):
+
+    python -m benchmarks.layers --compare before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from benchmarks.asgi import asgi_get
+from benchmarks.fixtures import seed_database
+from core.services import CarService
+from infrastructure.models import Car, Model
+from infrastructure.postgres_db import database
+from infrastructure.repositories import (
+    BrandRepository,
+    CarRepository,
+    CatalogueCache,
+    ModelRepository,
+)
+from interface.schemas.car import CarDetailResponse
+from interface.serialization import get_adapter
+from settings import get_settings
+
+config = get_settings()
+
+LAYERS = (
+    "orm",
+    "mapping",
+    "repository",
+    "service",
+    "service_index",
+    "validation",
+    "orjson",
+    "dump_json",
+    "asgi",
+)
+
+
+async def measure(func: Callable[[], Awaitable], repeat: int, number: int) -> dict:
+    """Время одного вызова: минимум, медиана и максимум по repeat сериям из number вызовов"""
+    await func()  # прогрев: кэши запросов, подготовленные выражения, TypeAdapter
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        for _ in range(number):
+            await func()
+        timings.append((time.perf_counter() - started_at) / number)
+    return {
+        "min_ms": min(timings) * 1000,
+        "median_ms": statistics.median(timings) * 1000,
+        "max_ms": max(timings) * 1000,
+    }
+
+
+def list_query(limit: int):
+    return (
+        select(Car)
+        .options(joinedload(Car.model).joinedload(Model.brand))
+        .order_by(Car.created_at.desc(), Car.id.desc())
+        .limit(limit)
+    )
+
+
+async def run_page(app, page_size: int, repeat: int, number: int) -> dict:
+    adapter = get_adapter(List[CarDetailResponse])
+
+    async with database.session() as session:
+        orm_cars = (await session.execute(list_query(page_size))).unique().scalars().all()
+    mapper = CarRepository(None)
+    # Отдельный кэш: снимок справочника строится при прогреве и живёт весь замер
+    catalogue = CatalogueCache(max_size=16, ttl=3600)
+    entities = [mapper._to_entity(car, car.model, car.model.brand) for car in orm_cars]
+    validated = adapter.validate_python(entities, from_attributes=True)
+
+    async def orm():
+        async with database.session() as session:
+            (await session.execute(list_query(page_size))).unique().scalars().all()
+
+    async def mapping():
+        [mapper._to_entity(car, car.model, car.model.brand) for car in orm_cars]
+
+    async def repository():
+        async with database.session() as session:
+            await CarRepository(session).get_all(limit=page_size, include_brand_model=True)
+
+    async def service():
+        async with database.session() as session:
+            car_service = CarService(
+                CarRepository(session), BrandRepository(session), ModelRepository(session)
+            )
+            await car_service.get_cars_page(limit=page_size, include_brand_model=True)
+
+    async def service_index():
+        async with database.session() as session:
+            car_service = CarService(
+                CarRepository(session),
+                BrandRepository(session),
+                ModelRepository(session),
+                catalogue,
+            )
+            await car_service.get_cars_page(limit=page_size, include_brand_model=True)
+
+    async def validation():
+        adapter.validate_python(entities, from_attributes=True)
+
+    async def orjson_encoding():
+        orjson.dumps(adapter.dump_python(validated, mode="json"))
+
+    async def dump_json():
+        adapter.dump_json(validated)
+
+    async def asgi():
+        await asgi_get(app, "/api/public/cars", f"limit={page_size}")
+
+    layers = {
+        "orm": orm,
+        "mapping": mapping,
+        "repository": repository,
+        "service": service,
+        "service_index": service_index,
+        "validation": validation,
+        "orjson": orjson_encoding,
+        "dump_json": dump_json,
+        "asgi": asgi,
+    }
+    return {name: await measure(layers[name], repeat, number) for name in LAYERS}
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(catalogue_sizes: List[int], page_sizes: List[int], repeat: int, seed: int) -> dict:
+    from interface.main import app
+
+    results = []
+    try:
+        for catalogue_size in catalogue_sizes:
+            async with database.session() as session:
+                await seed_database(session, catalogue_size, seed=seed)
+            for page_size in page_sizes:
+                number = max(1, 200 // page_size)
+                timings = await run_page(app, page_size, repeat, number)
+                for layer, stats in timings.items():
+                    results.append(
+                        {
+                            "catalogue_size": catalogue_size,
+                            "page_size": page_size,
+                            "layer": layer,
+                            **stats,
+                        }
+                    )
+                    print(
+                        f"{catalogue_size:>9} {page_size:>6} {layer:>13} "
+                        f"{stats['median_ms']:>10.3f}"
+                    )
+    finally:
+        await database.engine.dispose()
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(before_path: str, after_path: str) -> None:
+    def load(path):
+        with open(path) as file:
+            data = json.load(file)
+        return {
+            (row["catalogue_size"], row["page_size"], row["layer"]): row
+            for row in data["results"]
+        }
+
+    before, after = load(before_path), load(after_path)
+    print(f"{'catalogue':>9} {'page':>6} {'layer':>13} {'before, ms':>11} {'after, ms':>10} {'ratio':>7}")
+    for key in sorted(before.keys() & after.keys(), key=lambda k: (k[0], k[1], LAYERS.index(k[2]))):
+        old, new = before[key]["median_ms"], after[key]["median_ms"]
+        print(f"{key[0]:>9} {key[1]:>6} {key[2]:>13} {old:>11.3f} {new:>10.3f} {new / old:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк списка автомобилей по слоям")
+    parser.add_argument("--catalogue-sizes", default="1000,10000,100000")
+    parser.add_argument("--page-sizes", default="10,100,1000")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if "bench" not in config.postgres_db:
+        sys.exit(
+            f"База {config.postgres_db} будет перезаполнена: укажите отдельную базу "
+            f"с 'bench' в имени через POSTGRES_DB"
+        )
+
+    report = asyncio.run(
+        run(
+            [int(size) for size in args.catalogue_sizes.split(",")],
+            [int(size) for size in args.page_sizes.split(",")],
+            args.repeat,
+            args.seed,
+        )
+    )
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+    print(f"Результаты записаны в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Пропускная способность обработки ошибок: прежний @app.middleware("http")
+(BaseHTTPMiddleware) против обработчиков исключений и чистого ASGI-middleware.
+
+Оба приложения одинаковы, кроме способа обработки исключений, и вызываются в
+том же процессе без сети, поэтому разница — это накладные расходы самого
+middleware. Маршруты: обычный JSON-ответ, доменная ошибка (404) и потоковый
+ответ из нескольких частей.
+
+Запуск из каталога src: python -m benchmarks.middleware
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+
+from benchmarks.asgi import asgi_get
+from core.exceptions import NotFoundError
+from interface.errors import (
+    EXCEPTION_STATUS_CODES,
+    UnhandledErrorMiddleware,
+    register_exception_handlers,
+)
+
+ROUTES = {
+    "/ok": 200,
+    "/not-found": 404,
+    "/stream": 200,
+}
+
+
+def add_routes(app: FastAPI) -> None:
+    @app.get("/ok")
+    async def ok():
+        return {"status": "ok"}
+
+    @app.get("/not-found")
+    async def not_found():
+        raise NotFoundError("Автомобиль не найден")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for index in range(16):
+                yield b"x" * 1024
+
+        return StreamingResponse(chunks(), media_type="application/octet-stream")
+
+
+def legacy_app() -> FastAPI:
+    """Прежняя схема: все доменные исключения ловит BaseHTTPMiddleware"""
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    @app.middleware("http")
+    async def custom_exception_middleware(request: Request, call_next):
+        try:
+            return await call_next(request)
+        except tuple(EXCEPTION_STATUS_CODES) as e:
+            return JSONResponse(
+                status_code=EXCEPTION_STATUS_CODES[type(e)], content={"detail": str(e)}
+            )
+        except Exception:
+            return JSONResponse(
+                status_code=500, content={"detail": "Internal Server Error"}
+            )
+
+    add_routes(app)
+    return app
+
+
+def current_app() -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    register_exception_handlers(app)
+    app.add_middleware(UnhandledErrorMiddleware)
+    add_routes(app)
+    return app
+
+
+async def requests_per_second(
+    app: FastAPI, path: str, status: int, requests: int, concurrency: int
+) -> float:
+    async def worker(count: int):
+        for _ in range(count):
+            await asgi_get(app, path, expected_status=status)
+
+    await worker(50)  # прогрев
+    per_worker = requests // concurrency
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+    return per_worker * concurrency / (time.perf_counter() - started_at)
+
+
+async def run(requests: int, concurrency: int, repeat: int) -> List[Dict]:
+    apps = {"legacy": legacy_app(), "current": current_app()}
+    results = []
+    for path, status in ROUTES.items():
+        row = {"route": path}
+        for name, app in apps.items():
+            row[name] = max(
+                [
+                    await requests_per_second(app, path, status, requests, concurrency)
+                    for _ in range(repeat)
+                ]
+            )
+        results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк middleware обработки ошибок")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.requests, args.concurrency, args.repeat))
+    print(f"{'route':>11} {'legacy, rps':>12} {'current, rps':>13} {'speedup':>8}")
+    for row in results:
+        print(
+            f"{row['route']:>11} {row['legacy']:>12.0f} "
+            f"{row['current']:>13.0f} {row['current'] / row['legacy']:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Сравнение сериализации списка автомобилей: прежний путь (model_validate в
+обработчике, повторная валидация response_model и ORJSONResponse) против
+однократной валидации с записью JSON-байтов в pydantic-core.
+
+Запуск из каталога src: python -m benchmarks.serialization
+"""
+import argparse
+import timeit
+from typing import List
+
+import orjson
+from pydantic import TypeAdapter
+
+from benchmarks.fixtures import make_cars
+from interface.schemas.car import CarDetailResponse
+from interface.serialization import get_adapter
+
+
+def legacy_path(cars) -> bytes:
+    # Обработчик строил модели, FastAPI выгружал их в dict, валидировал заново
+    # по response_model, приводил к JSON-совместимым типам и отдавал в orjson
+    models = [CarDetailResponse.model_validate(car) for car in cars]
+    adapter: TypeAdapter = get_adapter(List[CarDetailResponse])
+    dumped = [model.model_dump(by_alias=True) for model in models]
+    validated = adapter.validate_python(dumped)
+    return orjson.dumps(adapter.dump_python(validated, mode="json"))
+
+
+def fast_path(cars) -> bytes:
+    adapter: TypeAdapter = get_adapter(List[CarDetailResponse])
+    return adapter.dump_json(adapter.validate_python(cars, from_attributes=True))
+
+
+def run(page_sizes: List[int], repeat: int) -> List[dict]:
+    results = []
+    for page_size in page_sizes:
+        cars = make_cars(page_size)
+        assert orjson.loads(legacy_path(cars)) == orjson.loads(fast_path(cars))
+        number = max(1, 2000 // page_size)
+        legacy = min(timeit.repeat(lambda: legacy_path(cars), number=number, repeat=repeat)) / number
+        fast = min(timeit.repeat(lambda: fast_path(cars), number=number, repeat=repeat)) / number
+        results.append(
+            {
+                "page_size": page_size,
+                "legacy_ms": legacy * 1000,
+                "fast_ms": fast * 1000,
+                "speedup": legacy / fast,
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк сериализации списка автомобилей")
+    parser.add_argument("--page-sizes", default="10,100,1000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    page_sizes = [int(size) for size in args.page_sizes.split(",")]
+    print(f"{'page':>6} {'legacy, ms':>12} {'fast, ms':>10} {'speedup':>8}")
+    for row in run(page_sizes, args.repeat):
+        print(
+            f"{row['page_size']:>6} {row['legacy_ms']:>12.2f} "
+            f"{row['fast_ms']:>10.2f} {row['speedup']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
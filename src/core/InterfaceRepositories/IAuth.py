@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from uuid import UUID
-from core.entites import User, AccessToken, RefreshToken, Token
+from core.entites import User, AccessToken, RefreshToken, Token, TokenState
 
 
 class IAuthRepository(ABC):
@@ -58,6 +59,23 @@ class IAuthRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    async def revoke_user_tokens(self, user_id: str) -> None:
+        """
+        Revoke all access tokens of a user issued before now.
+        """
+        pass
+
+    @abstractmethod
+    async def get_token_state(
+        self, user_id: UUID, jti: Optional[str]
+    ) -> Optional[TokenState]:
+        """
+        Get the user's token revocation time and whether the jti is banned.
+        Returns None if the user does not exist.
+        """
+        pass
+
 
 class IBannedRefreshTokenRepository(ABC):
     """
@@ -65,9 +83,13 @@ class IBannedRefreshTokenRepository(ABC):
     """
 
     @abstractmethod
-    async def create_banned_refresh_token(self, jti: UUID) -> None:
+    async def create_banned_refresh_token(
+        self, jti: UUID, expires_at: Optional[datetime] = None
+    ) -> bool:
         """
-        Create a new banned refresh token.
+        Ban a refresh token until it expires. Access tokens revoked at logout
+        are banned by jti in the same table.
+        Returns False if the token was already banned.
         """
         pass
 
@@ -77,3 +99,10 @@ class IBannedRefreshTokenRepository(ABC):
         Check if a refresh token is banned.
         """
         pass
+
+    @abstractmethod
+    async def purge_expired(self, batch_size: int) -> int:
+        """
+        Delete expired banned tokens in batches. Returns the number of deleted rows.
+        """
+        pass
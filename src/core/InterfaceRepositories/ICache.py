@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+
+
+class ICatalogueCache(ABC):
+    """Интерфейс кэша справочника брендов и моделей"""
+
+    @abstractmethod
+    def get(self, key):
+        """Значение по ключу или None, если его нет или срок хранения истёк"""
+        pass
+
+    @abstractmethod
+    def set(self, key, value) -> None:
+        """Сохранение значения по ключу"""
+        pass
+
+    @abstractmethod
+    def invalidate(self) -> None:
+        """Сброс всех закэшированных данных справочника"""
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Статистика попаданий и промахов кэша"""
+        pass
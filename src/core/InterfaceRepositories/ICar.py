@@ -1,7 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 from uuid import UUID
-from core.entites import Car, Brand, Model
+from core.entites import (
+    Car,
+    Brand,
+    Model,
+    CarSearchQuery,
+    CarSearchResult,
+    CarMarketStats,
+    CarCount,
+)
 
 
 class IBrandRepository(ABC):
@@ -22,6 +31,11 @@ class IBrandRepository(ABC):
         """Создание нового бренда"""
         pass
 
+    @abstractmethod
+    async def patch(self, id: UUID, values: Dict) -> Optional[Brand]:
+        """Частичное обновление бренда одним UPDATE ... RETURNING; None, если запись не найдена"""
+        pass
+
     @abstractmethod
     async def update(self, brand: Brand) -> Brand:
         """Обновление информации о бренде"""
@@ -46,11 +60,21 @@ class IModelRepository(ABC):
         """Получение модели по ID"""
         pass
 
+    @abstractmethod
+    async def get_existing_ids(self, ids: Set[UUID]) -> Set[UUID]:
+        """Получение тех ID из переданных, для которых модели существуют"""
+        pass
+
     @abstractmethod
     async def create(self, model: Model) -> Model:
         """Создание новой модели"""
         pass
 
+    @abstractmethod
+    async def patch(self, id: UUID, values: Dict) -> Optional[Model]:
+        """Частичное обновление модели одним UPDATE ... RETURNING; None, если запись не найдена"""
+        pass
+
     @abstractmethod
     async def update(self, model: Model) -> Model:
         """Обновление информации о модели"""
@@ -75,15 +99,57 @@ class ICarRepository(ABC):
         limit: int = 100,
         offset: int = 0,
         include_brand_model: bool = False,  # Новый параметр
+        after: Optional[Tuple[datetime, UUID]] = None,
     ) -> List[Car]:
-        """Получение списка автомобилей с фильтрацией и возможностью включения данных модели и бренда"""
+        """Получение списка автомобилей с фильтрацией и возможностью включения данных модели и бренда.
+        Если передан after = (created_at, id), вместо offset используется keyset-пагинация"""
+        pass
+
+    @abstractmethod
+    async def count(
+        self,
+        model_id: Optional[UUID] = None,
+        brand_id: Optional[UUID] = None,
+        condition: Optional[str] = None,
+        seller_id: Optional[UUID] = None,
+    ) -> CarCount:
+        """Количество автомобилей с теми же фильтрами, что и get_all: точное для
+        избирательных фильтров, оценка планировщика для широких"""
+        pass
+
+    @abstractmethod
+    def stream_all(
+        self,
+        model_id: Optional[UUID] = None,
+        brand_id: Optional[UUID] = None,
+        condition: Optional[str] = None,
+        seller_id: Optional[UUID] = None,
+        include_brand_model: bool = False,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Car]]:
+        """Потоковое чтение всех автомобилей с теми же фильтрами, что и get_all,
+        пачками по batch_size без загрузки всего каталога в память"""
+        pass
+
+    @abstractmethod
+    async def search(self, query: CarSearchQuery) -> CarSearchResult:
+        """Полнотекстовый поиск автомобилей с диапазонными фильтрами и фасетами"""
         pass
 
     @abstractmethod
     async def get_by_id(
-        self, id: UUID, include_brand_model: bool = False
+        self, id: UUID, include_brand_model: bool = False, include_archived: bool = True
     ) -> Optional[Car]:
-        """Получение автомобиля по ID с возможностью включения данных модели и бренда"""
+        """Получение автомобиля по ID с возможностью включения данных модели и бренда.
+        Если автомобиля нет среди активных, он ищется в архиве (archived_at заполнен);
+        проверки перед изменением передают include_archived=False"""
+        pass
+
+    @abstractmethod
+    async def get_versions(self, id: UUID) -> List[Tuple[UUID, datetime]]:
+        """ID и updated_at автомобиля, его модели и бренда одним запросом по
+        первичным ключам, без загрузки самих строк; учитывается и архив.
+        Пустой список, если автомобиля нет"""
         pass
 
     @abstractmethod
@@ -96,7 +162,56 @@ class ICarRepository(ABC):
         """Обновление информации об автомобиле"""
         pass
 
+    @abstractmethod
+    async def patch(
+        self, id: UUID, values: Dict, seller_id: Optional[UUID] = None
+    ) -> Optional[Car]:
+        """Частичное обновление автомобиля одним UPDATE ... RETURNING.
+        Если передан seller_id, обновляется только объявление этого продавца.
+        None, если ни одна строка не обновлена"""
+        pass
+
+    @abstractmethod
+    async def add_photos(
+        self, id: UUID, photos: List[str], thumbnails: List[str]
+    ) -> bool:
+        """Атомарное добавление ссылок на фотографии и миниатюры в конец списков"""
+        pass
+
+    @abstractmethod
+    async def get_many(self, ids: List[UUID]) -> List[Car]:
+        """Получение автомобилей по списку ID одним запросом"""
+        pass
+
+    @abstractmethod
+    async def create_many(self, cars: List[Car]) -> List[Car]:
+        """Добавление нескольких автомобилей в одной транзакции, в порядке входного списка"""
+        pass
+
+    @abstractmethod
+    async def update_many(
+        self, changes: List[Tuple[UUID, Dict]], seller_id: Optional[UUID] = None
+    ) -> List[Car]:
+        """Частичное обновление нескольких автомобилей в одной транзакции.
+        Если передан seller_id, обновляются только объявления этого продавца.
+        Возвращает состояние только тех автомобилей, которые действительно обновлены"""
+        pass
+
     @abstractmethod
     async def delete(self, id: UUID) -> bool:
-        """Удаление автомобиля"""
+        """Удаление автомобиля; если среди активных его нет, удаляется из архива"""
+        pass
+
+
+class ICarStatsRepository(ABC):
+    """Предрассчитанная рыночная статистика по объявлениям"""
+
+    @abstractmethod
+    async def get_market_stats(
+        self,
+        brand_id: Optional[UUID] = None,
+        model_id: Optional[UUID] = None,
+        year: Optional[int] = None,
+    ) -> List[CarMarketStats]:
+        """Статистика по бренду или по модели, по годам выпуска"""
         pass
@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Dict, Optional
+
+
+class IObjectStorage(ABC):
+    """Хранилище файлов (S3-совместимое или локальная файловая система)"""
+
+    @abstractmethod
+    async def save(self, key: str, file: BinaryIO, content_type: str) -> str:
+        """Сохранение файла потоком; возвращает публичную ссылку"""
+        pass
+
+    @abstractmethod
+    async def load(self, key: str) -> bytes:
+        """Чтение содержимого файла"""
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Удаление файла"""
+        pass
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """Публичная ссылка на файл"""
+        pass
+
+
+class IImageProcessor(ABC):
+    """Подготовка уменьшенных копий изображений"""
+
+    @abstractmethod
+    async def identify(self, file: BinaryIO) -> Optional[str]:
+        """MIME-тип изображения по содержимому файла или None, если его не
+        удаётся разобрать; позиция в файле не меняется"""
+        pass
+
+    @abstractmethod
+    async def make_variants(self, data: bytes) -> Dict[str, bytes]:
+        """Возвращает JPEG-копии изображения по имени размера (thumbnail, card)"""
+        pass
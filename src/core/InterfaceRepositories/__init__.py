@@ -2,11 +2,14 @@ from core.InterfaceRepositories.IAuth import (
     IAuthRepository,
     IBannedRefreshTokenRepository,
 )
+from core.InterfaceRepositories.ICache import ICatalogueCache
 from core.InterfaceRepositories.ICar import (
     IBrandRepository,
     IModelRepository,
     ICarRepository,
+    ICarStatsRepository,
 )
+from core.InterfaceRepositories.IStorage import IObjectStorage, IImageProcessor
 
 __all__ = [
     "IAuthRepository",
@@ -14,4 +17,8 @@ __all__ = [
     "IBrandRepository",
     "IModelRepository",
     "ICarRepository",
+    "ICarStatsRepository",
+    "ICatalogueCache",
+    "IObjectStorage",
+    "IImageProcessor",
 ]
\ No newline at end of file
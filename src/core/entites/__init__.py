@@ -1,12 +1,28 @@
-from core.entites.auth import User, AccessToken, RefreshToken, Token, BannedRefreshToken
+from core.entites.auth import (
+    User,
+    AccessToken,
+    RefreshToken,
+    Token,
+    BannedRefreshToken,
+    TokenState,
+)
 from core.entites.car import (
     Car,
     Brand,
     Model,
+    CatalogueBrand,
+    CatalogueModel,
     FuelType,
     TransmissionType,
     DriveType,
     CarCondition,
+    CarSearchQuery,
+    CarSearchResult,
+    CarCount,
+    BatchItemResult,
+    CarMarketStats,
+    PhotoUpload,
+    CarPhoto,
 )
 
 __all__ = [
@@ -15,11 +31,21 @@ __all__ = [
     "RefreshToken",
     "Token",
     "BannedRefreshToken",
+    "TokenState",
     "Car",
     "Brand",
     "Model",
+    "CatalogueBrand",
+    "CatalogueModel",
     "FuelType",
     "TransmissionType",
     "DriveType",
     "CarCondition",
+    "CarSearchQuery",
+    "CarSearchResult",
+    "CarCount",
+    "BatchItemResult",
+    "CarMarketStats",
+    "PhotoUpload",
+    "CarPhoto",
 ]
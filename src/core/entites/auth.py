@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from typing import Optional
 from uuid import UUID
 from datetime import datetime, timedelta
 from settings import get_settings
@@ -6,7 +7,7 @@ from settings import get_settings
 settings = get_settings()
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """
     User entity class.
@@ -20,17 +21,17 @@ class User:
     is_active: bool = field(default=True)
     is_superuser: bool = field(default=False)
     scopes: list[str] = field(default_factory=list)
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    updated_at: datetime = field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AccessToken:
     token: str
     type: str = field(default="Bearer")
     expires: timedelta = field(default_factory=lambda: timedelta(minutes=settings.access_token_expire_minutes)) 
 
-@dataclass
+@dataclass(slots=True)
 class RefreshToken:
     token: str
     type: str = field(default="Bearer")
@@ -38,7 +39,7 @@ class RefreshToken:
     jti: UUID = field(default="")
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     """
     Token entity class.
@@ -48,12 +49,23 @@ class Token:
     refresh_token: RefreshToken
 
 
-@dataclass
+@dataclass(slots=True)
 class BannedRefreshToken:
     """ "
     Banned refresh token entity class.
     """
 
     jti: str
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    updated_at: datetime = field(default_factory=datetime.utcnow)
+    expires_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+@dataclass(slots=True)
+class TokenState:
+    """
+    Shared revocation state of an access token's user and jti.
+    """
+
+    tokens_revoked_at: Optional[datetime] = None
+    token_banned: bool = False
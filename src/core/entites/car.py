@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 from uuid import UUID
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import BinaryIO, Dict, List, Optional, Union
 
 
 class FuelType(str, Enum):
@@ -31,7 +31,7 @@ class CarCondition(str, Enum):
     USED = "used"
 
 
-@dataclass
+@dataclass(slots=True)
 class Brand:
     """Бренд автомобиля"""
 
@@ -39,11 +39,11 @@ class Brand:
     id: Optional[UUID] = None
     country: Optional[str] = None
     logo_url: Optional[str] = None
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    updated_at: datetime = field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Model:
     """Модель автомобиля"""
 
@@ -52,11 +52,36 @@ class Model:
     id: Optional[UUID] = None
     year_from: Optional[int] = None
     year_to: Optional[int] = None
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    updated_at: datetime = field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
+class CatalogueBrand:
+    """Неизменяемая копия бренда в снимке справочника, общая для многих ответов"""
+
+    name: str
+    id: Optional[UUID] = None
+    country: Optional[str] = None
+    logo_url: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+@dataclass(slots=True, frozen=True)
+class CatalogueModel:
+    """Неизменяемая копия модели в снимке справочника, общая для многих ответов"""
+
+    name: str
+    brand_id: UUID
+    id: Optional[UUID] = None
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+@dataclass(slots=True)
 class Car:
     """Автомобиль"""
 
@@ -77,8 +102,108 @@ class Car:
     vin: Optional[str] = None
     is_sold: bool = False
     photos: List[str] = field(default_factory=list)
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    updated_at: datetime = field(default_factory=datetime.utcnow)
-    model: Optional[Model] = None
-    brand: Optional[Brand] = None
-    
+    thumbnails: List[str] = field(default_factory=list)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    # Время переноса в архив; None для активных объявлений
+    archived_at: Optional[datetime] = None
+    model: Optional[Union[Model, CatalogueModel]] = None
+    brand: Optional[Union[Brand, CatalogueBrand]] = None
+
+
+@dataclass(slots=True)
+class CarSearchQuery:
+    """Параметры поиска автомобилей"""
+
+    text: Optional[str] = None
+    model_id: Optional[UUID] = None
+    brand_id: Optional[UUID] = None
+    condition: Optional[CarCondition] = None
+    fuel_type: Optional[FuelType] = None
+    transmission: Optional[TransmissionType] = None
+    drive_type: Optional[DriveType] = None
+    color: Optional[str] = None
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    year_min: Optional[int] = None
+    year_max: Optional[int] = None
+    mileage_min: Optional[int] = None
+    mileage_max: Optional[int] = None
+    engine_volume_min: Optional[float] = None
+    engine_volume_max: Optional[float] = None
+    power_min: Optional[int] = None
+    power_max: Optional[int] = None
+    is_sold: Optional[bool] = False
+    limit: int = 20
+    offset: int = 0
+
+
+@dataclass(slots=True)
+class CarSearchResult:
+    """Результат поиска: страница автомобилей, общее количество и фасеты"""
+
+    items: List[Car]
+    total: int
+    facets: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class CarCount:
+    """Количество автомобилей под фильтром: точное или оценка планировщика"""
+
+    total: int
+    exact: bool
+
+
+@dataclass(slots=True)
+class BatchItemResult:
+    """Результат обработки одного элемента пакетной операции"""
+
+    index: int
+    car: Optional[Car] = None
+    error: Optional[str] = None
+
+
+@dataclass(slots=True)
+class CarMarketStats:
+    """
+    Рыночная статистика по активным объявлениям за год выпуска:
+    по бренду целиком (model_id не задан) или по модели
+    """
+
+    brand_id: UUID
+    year: int
+    listings: int
+    price_min: float
+    price_max: float
+    price_mean: float
+    price_median: float
+    price_p10: float
+    price_p90: float
+    mileage_min: int
+    mileage_max: int
+    mileage_mean: float
+    mileage_median: float
+    mileage_p10: float
+    mileage_p90: float
+    model_id: Optional[UUID] = None
+
+
+@dataclass(slots=True)
+class PhotoUpload:
+    """Загружаемая фотография: поток с содержимым и заявленный тип"""
+
+    file: BinaryIO
+    content_type: str
+    size: Optional[int] = None
+
+
+@dataclass(slots=True)
+class CarPhoto:
+    """Сохранённый оригинал фотографии, ожидающий обработки"""
+
+    id: UUID
+    car_id: UUID
+    key: str
+    original_key: str
+    original_url: str
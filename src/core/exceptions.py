@@ -34,7 +34,19 @@ class InvalidTokenError(Exception):
     pass
 
 
+class PermissionDeniedError(Exception):
+    """Not allowed to modify the resource."""
+
+    pass
+
+
 class InvalidRequestError(Exception):
     """Invalid request."""
 
     pass
+
+
+class ServiceUnavailableError(Exception):
+    """Service is temporarily overloaded."""
+
+    pass
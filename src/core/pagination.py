@@ -0,0 +1,27 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+from core.exceptions import InvalidRequestError
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """
+    Кодирует позицию (created_at, id) в непрозрачный курсор для keyset-пагинации
+    """
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Декодирует курсор обратно в позицию (created_at, id)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (ValueError, binascii.Error) as e:
+        raise InvalidRequestError("Некорректный курсор пагинации") from e
@@ -1,7 +1,11 @@
 from core.services.auth import AuthService
 from core.services.car import CarService
+from core.services.catalogue import CatalogueIndex
+from core.services.photo import PhotoService
 
 __all__ = [
     "AuthService",
     "CarService",
+    "CatalogueIndex",
+    "PhotoService",
 ]
\ No newline at end of file
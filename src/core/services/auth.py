@@ -1,5 +1,6 @@
+import time
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import List, Optional
 from uuid import UUID, uuid4
 from core.entites import User, AccessToken, RefreshToken, Token
 from core.InterfaceRepositories.IAuth import (
@@ -10,23 +11,33 @@ from core.exceptions import (
     DuplicateEntryError,
     NotFoundError,
 )
+from core.services.password import PasswordHasher, get_password_hasher
+from core.services.revocation import revocation_registry
+from cache import TTLCache
+from metrics import LatencyStats
 from settings import get_settings
-from passlib.context import CryptContext
 import jwt
 
 
 settings = get_settings()
 
+# Полная длительность входа, включая ожидание пула хеширования
+login_latency = LatencyStats()
+
+# Короткоживущий кэш полных записей пользователей для require_scopes(load_user=True)
+user_cache = TTLCache(max_size=10_000, ttl=settings.principal_cache_ttl)
+
 
 class AuthService:
     def __init__(
         self,
         auth_repository: IAuthRepository,
         banned_refresh_token_repository: IBannedRefreshTokenRepository,
+        password_hasher: Optional[PasswordHasher] = None,
     ):
         self.auth_repository = auth_repository
         self.banned_refresh_token_repository = banned_refresh_token_repository
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.password_hasher = password_hasher or get_password_hasher()
 
     async def create_user(self, user: User) -> User:
         """
@@ -34,7 +45,7 @@ class AuthService:
         """
         if await self.auth_repository.get_user(email=user.email):
             raise DuplicateEntryError("User already exists")
-        user.password = self.pwd_context.hash(user.password)
+        user.password = await self.password_hasher.hash(user.password)
         return await self.auth_repository.create_user(user)
 
     async def get_user(self, user_id: str) -> User:
@@ -46,6 +57,25 @@ class AuthService:
             raise NotFoundError("User not found")
         return user
 
+    async def get_principal(self, user_id: str) -> User:
+        """
+        Get a full user record through the short-TTL per-user cache.
+        """
+        user = user_cache.get(str(user_id))
+        if user is None:
+            user = await self.get_user(user_id)
+            user_cache.set(str(user_id), user)
+        return user
+
+    async def _forget_user(self, user_id) -> None:
+        """
+        Drop cached data and revoke access tokens issued before a user change
+        in every process.
+        """
+        user_cache.delete(str(user_id))
+        revocation_registry.revoke_user(str(user_id))
+        await self.auth_repository.revoke_user_tokens(str(user_id))
+
     async def get_user_by_email(self, email: str) -> User:
         """
         Get a user by email.
@@ -61,21 +91,25 @@ class AuthService:
         """
         if not self.auth_repository.get_user(user.id):
             raise NotFoundError("User not found")
-        user.password = self.pwd_context.hash(user.password)
-        return await self.auth_repository.update_user(user)
+        user.password = await self.password_hasher.hash(user.password)
+        updated_user = await self.auth_repository.update_user(user)
+        await self._forget_user(user.id)
+        return updated_user
 
     async def login(self, email: str, password: str) -> Token:
         """
         Login a user.
         """
-        user = await self.get_user_by_email(email)
-        if not user:
-            raise NotFoundError("User not found")
-        if not self.pwd_context.verify(password, user.password):
-            raise NotFoundError("Invalid password")
-        access_token = self.create_access_token(
-            {"sub": str(user.id), "scopes": user.scopes}
-        )
+        started_at = time.perf_counter()
+        try:
+            user = await self.get_user_by_email(email)
+            if not user:
+                raise NotFoundError("User not found")
+            if not await self.password_hasher.verify(password, user.password):
+                raise NotFoundError("Invalid password")
+        finally:
+            login_latency.observe(time.perf_counter() - started_at)
+        access_token = self.create_access_token(self._access_claims(user))
         refresh_token = self.create_refresh_token(
             {"sub": str(user.id), "jti": str(uuid4())}
         )
@@ -84,17 +118,37 @@ class AuthService:
             refresh_token=refresh_token,
         )
 
-    async def logout(self, token: str) -> None:
+    async def revoke_access_token(self, token: str) -> None:
+        """
+        Revoke an access token until it expires, in every process.
+        """
+        try:
+            payload = jwt.decode(
+                token, settings.secret_key, algorithms=[settings.algorithm]
+            )
+        except jwt.PyJWTError:
+            return
+        jti = payload.get("jti")
+        if not jti:
+            return
+        revocation_registry.revoke_token(jti)
+        await self.banned_refresh_token_repository.create_banned_refresh_token(
+            jti=jti, expires_at=self._token_expiry(payload)
+        )
+
+    async def logout(self, token: str, access_token: Optional[str] = None) -> None:
         """
         Logout a user.
         """
+        if access_token:
+            await self.revoke_access_token(access_token)
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
         )
         jti: str = payload.get("jti")
         banned_token = (
             await self.banned_refresh_token_repository.create_banned_refresh_token(
-                jti=jti
+                jti=jti, expires_at=self._token_expiry(payload)
             )
         )
         return banned_token
@@ -115,15 +169,14 @@ class AuthService:
         jti = payload.get("jti")
         if jti is None:
             raise NotFoundError("Invalid token")
-        banned_token = (
-            await self.banned_refresh_token_repository.is_banned_refresh_token(jti=jti)
+        # Блокировка старого токена и проверка повторного использования — один
+        # INSERT: из параллельных обновлений одного токена успешно только одно
+        banned = await self.banned_refresh_token_repository.create_banned_refresh_token(
+            jti=jti, expires_at=self._token_expiry(payload)
         )
-        if banned_token:
+        if not banned:
             raise NotFoundError("Token is banned")
-        await self.banned_refresh_token_repository.create_banned_refresh_token(jti=jti)
-        access_token = self.create_access_token(
-            {"sub": str(user.id), "scopes": user.scopes}
-        )
+        access_token = self.create_access_token(self._access_claims(user))
         refresh_token = self.create_refresh_token(
             {"sub": str(user.id), "jti": str(uuid4())}
         )
@@ -132,12 +185,33 @@ class AuthService:
             refresh_token=refresh_token,
         )
 
+    @staticmethod
+    def _token_expiry(payload: dict) -> Optional[datetime]:
+        exp = payload.get("exp")
+        if exp is None:
+            return None
+        return datetime.fromtimestamp(exp, timezone.utc)
+
+    def _access_claims(self, user: User) -> dict:
+        """
+        Claims that let secured routes build the principal without a DB lookup.
+        """
+        return {
+            "sub": str(user.id),
+            "scopes": user.scopes,
+            "email": user.email,
+            "name": user.name,
+            "surname": user.surname,
+            "is_superuser": user.is_superuser,
+        }
+
     def create_access_token(self, data: dict) -> AccessToken:
         to_encode = data.copy()
         expire = datetime.now(timezone.utc) + timedelta(
             minutes=settings.access_token_expire_minutes
         )
-        to_encode.update({"exp": expire, "type": "access"})
+        to_encode.setdefault("jti", str(uuid4()))
+        to_encode.update({"exp": expire, "iat": time.time(), "type": "access"})
         encoded_jwt = jwt.encode(
             to_encode, settings.secret_key, algorithm=settings.algorithm
         )
@@ -218,7 +292,9 @@ class AuthService:
         if not user:
             raise NotFoundError("Пользователь не найден")
 
-        return await self.auth_repository.add_scopes(user_id, scopes)
+        updated_user = await self.auth_repository.add_scopes(user_id, scopes)
+        await self._forget_user(user_id)
+        return updated_user
 
     async def update_scopes(self, user_id: str, scopes: List[str]) -> User:
         """
@@ -228,7 +304,9 @@ class AuthService:
         if not user:
             raise NotFoundError("Пользователь не найден")
 
-        return await self.auth_repository.update_scopes(user_id, scopes)
+        updated_user = await self.auth_repository.update_scopes(user_id, scopes)
+        await self._forget_user(user_id)
+        return updated_user
 
     async def remove_scopes(self, user_id: str, scopes: List[str]) -> User:
         """
@@ -238,7 +316,9 @@ class AuthService:
         if not user:
             raise NotFoundError("Пользователь не найден")
 
-        return await self.auth_repository.remove_scopes(user_id, scopes)
+        updated_user = await self.auth_repository.remove_scopes(user_id, scopes)
+        await self._forget_user(user_id)
+        return updated_user
 
     async def get_user_scopes(self, user_id: str) -> List[str]:
         """
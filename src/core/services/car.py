@@ -1,13 +1,54 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from core.entites import Car, Brand, Model
+from core.entites import (
+    Car,
+    Brand,
+    Model,
+    CarSearchQuery,
+    CarSearchResult,
+    CarCount,
+    BatchItemResult,
+    CarMarketStats,
+)
+from core.pagination import encode_cursor, decode_cursor
+from core.services.catalogue import CatalogueIndex
 from core.InterfaceRepositories.ICar import (
     ICarRepository,
     IBrandRepository,
     IModelRepository,
+    ICarStatsRepository,
+)
+from core.InterfaceRepositories.ICache import ICatalogueCache
+from core.exceptions import NotFoundError, InvalidRequestError, PermissionDeniedError
+
+CATALOGUE_INDEX_KEY = ("index",)
+
+# Колонки NOT NULL, которые можно изменить частичным обновлением: явный null
+# отклоняется до запроса, а не ошибкой целостности всей транзакции
+BRAND_REQUIRED_FIELDS = ("name",)
+MODEL_REQUIRED_FIELDS = ("name", "brand_id")
+CAR_REQUIRED_FIELDS = (
+    "model_id",
+    "year",
+    "price",
+    "mileage",
+    "condition",
+    "fuel_type",
+    "transmission",
+    "drive_type",
+    "is_sold",
+    "photos",
 )
-from core.exceptions import NotFoundError, InvalidRequestError
+
+
+def null_fields_error(values: Dict, required: Tuple[str, ...]) -> Optional[str]:
+    """Сообщение об ошибке, если обязательным полям передан null"""
+    fields = [name for name in required if name in values and values[name] is None]
+    if fields:
+        return f"Поля не могут быть пустыми: {', '.join(fields)}"
+    return None
 
 
 class CarService:
@@ -16,10 +57,49 @@ class CarService:
         car_repository: ICarRepository,
         brand_repository: IBrandRepository,
         model_repository: IModelRepository,
+        catalogue_cache: Optional[ICatalogueCache] = None,
+        stats_repository: Optional[ICarStatsRepository] = None,
     ):
         self.car_repository = car_repository
         self.brand_repository = brand_repository
         self.model_repository = model_repository
+        self.catalogue_cache = catalogue_cache
+        self.stats_repository = stats_repository
+
+    def _invalidate_catalogue(self) -> None:
+        """Сброс кэша справочника после изменения брендов или моделей"""
+        if self.catalogue_cache:
+            self.catalogue_cache.invalidate()
+
+    async def _catalogue_index(self) -> Optional[CatalogueIndex]:
+        """
+        Снимок справочника для списков автомобилей. Хранится в кэше справочника,
+        поэтому сбрасывается вместе с ним; None, если кэш не подключён
+        """
+        if not self.catalogue_cache:
+            return None
+        index = self.catalogue_cache.get(CATALOGUE_INDEX_KEY)
+        if index is None:
+            index = CatalogueIndex(
+                await self.brand_repository.get_all(),
+                await self.model_repository.get_all(),
+            )
+            self.catalogue_cache.set(CATALOGUE_INDEX_KEY, index)
+        return index
+
+    async def _attach_brand_model(
+        self, cars: List[Car], index: CatalogueIndex
+    ) -> CatalogueIndex:
+        """
+        Проставляет автомобилям модель и бренд из снимка. Если модели в снимке
+        нет (она создана после его построения, например в другом процессе),
+        снимок строится заново один раз. Возвращает актуальный снимок
+        """
+        if index.attach(cars):
+            self._invalidate_catalogue()
+            index = await self._catalogue_index()
+            index.attach(cars)
+        return index
 
     # Методы для работы с брендами
     async def get_all_brands(self) -> List[Brand]:
@@ -32,15 +112,33 @@ class CarService:
         return brand
 
     async def create_brand(self, brand: Brand) -> Brand:
-        return await self.brand_repository.create(brand)
+        created_brand = await self.brand_repository.create(brand)
+        self._invalidate_catalogue()
+        return created_brand
 
     async def update_brand(self, brand: Brand) -> Brand:
         # Проверяем, существует ли бренд
         if not await self.brand_repository.get_by_id(brand.id):
             raise NotFoundError(f"Бренд с ID {brand.id} не найден")
-        return await self.brand_repository.update(brand)
+        updated_brand = await self.brand_repository.update(brand)
+        self._invalidate_catalogue()
+        return updated_brand
+
+    async def patch_brand(self, id: UUID, values: Dict) -> Brand:
+        """
+        Частичное обновление бренда одним запросом
+        """
+        if error := null_fields_error(values, BRAND_REQUIRED_FIELDS):
+            raise InvalidRequestError(error)
+        brand = await self.brand_repository.patch(id, values)
+        if not brand:
+            raise NotFoundError(f"Бренд с ID {id} не найден")
+        self._invalidate_catalogue()
+        return brand
 
     async def delete_brand(self, id: UUID) -> bool:
+        # Проверка связанных моделей должна видеть актуальные данные, а не кэш
+        self._invalidate_catalogue()
         # Проверяем, существуют ли модели для этого бренда
         models = await self.model_repository.get_all(brand_id=id)
         if models:
@@ -52,7 +150,9 @@ class CarService:
         if not await self.brand_repository.get_by_id(id):
             raise NotFoundError(f"Бренд с ID {id} не найден")
 
-        return await self.brand_repository.delete(id)
+        deleted = await self.brand_repository.delete(id)
+        self._invalidate_catalogue()
+        return deleted
 
     # Методы для работы с моделями
     async def get_all_models(self, brand_id: Optional[UUID] = None) -> List[Model]:
@@ -69,7 +169,9 @@ class CarService:
         if not await self.brand_repository.get_by_id(model.brand_id):
             raise NotFoundError(f"Бренд с ID {model.brand_id} не найден")
 
-        return await self.model_repository.create(model)
+        created_model = await self.model_repository.create(model)
+        self._invalidate_catalogue()
+        return created_model
 
     async def update_model(self, model: Model) -> Model:
         # Проверяем, существует ли модель
@@ -80,7 +182,22 @@ class CarService:
         if not await self.brand_repository.get_by_id(model.brand_id):
             raise NotFoundError(f"Бренд с ID {model.brand_id} не найден")
 
-        return await self.model_repository.update(model)
+        updated_model = await self.model_repository.update(model)
+        self._invalidate_catalogue()
+        return updated_model
+
+    async def patch_model(self, id: UUID, values: Dict) -> Model:
+        """
+        Частичное обновление модели одним запросом; существование бренда
+        проверяет внешний ключ
+        """
+        if error := null_fields_error(values, MODEL_REQUIRED_FIELDS):
+            raise InvalidRequestError(error)
+        model = await self.model_repository.patch(id, values)
+        if not model:
+            raise NotFoundError(f"Модель с ID {id} не найдена")
+        self._invalidate_catalogue()
+        return model
 
     async def delete_model(self, id: UUID) -> bool:
         # Проверяем, существуют ли автомобили для этой модели
@@ -94,7 +211,9 @@ class CarService:
         if not await self.model_repository.get_by_id(id):
             raise NotFoundError(f"Модель с ID {id} не найдена")
 
-        return await self.model_repository.delete(id)
+        deleted = await self.model_repository.delete(id)
+        self._invalidate_catalogue()
+        return deleted
 
     # Методы для работы с автомобилями
     async def get_all_cars(
@@ -120,6 +239,114 @@ class CarService:
             include_brand_model=include_brand_model,
         )
 
+    async def get_cars_page(
+        self,
+        model_id: Optional[UUID] = None,
+        brand_id: Optional[UUID] = None,
+        condition: Optional[str] = None,
+        seller_id: Optional[UUID] = None,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        include_brand_model: bool = True,
+    ) -> Tuple[List[Car], Optional[str]]:
+        """
+        Получение страницы автомобилей и курсора следующей страницы.
+        Если передан cursor, offset игнорируется и используется keyset-пагинация
+        """
+        after = decode_cursor(cursor) if cursor else None
+        index = await self._catalogue_index() if include_brand_model else None
+        # Запрашиваем на одну запись больше, чтобы понять, есть ли следующая страница.
+        # Если есть снимок справочника, модель и бренд не загружаются из базы
+        cars = await self.car_repository.get_all(
+            model_id=model_id,
+            brand_id=brand_id,
+            condition=condition,
+            seller_id=seller_id,
+            limit=limit + 1,
+            offset=offset,
+            include_brand_model=include_brand_model and index is None,
+            after=after,
+        )
+        next_cursor = None
+        if len(cars) > limit:
+            cars = cars[:limit]
+            next_cursor = encode_cursor(cars[-1].created_at, cars[-1].id)
+        if index:
+            await self._attach_brand_model(cars, index)
+        return cars, next_cursor
+
+    async def count_cars(
+        self,
+        model_id: Optional[UUID] = None,
+        brand_id: Optional[UUID] = None,
+        condition: Optional[str] = None,
+        seller_id: Optional[UUID] = None,
+    ) -> CarCount:
+        """
+        Общее количество автомобилей под фильтрами списка. Для широких фильтров
+        возвращается оценка (exact=False), чтобы не считать COUNT по всей таблице
+        """
+        return await self.car_repository.count(
+            model_id=model_id, brand_id=brand_id, condition=condition, seller_id=seller_id
+        )
+
+    async def stream_cars(
+        self,
+        model_id: Optional[UUID] = None,
+        brand_id: Optional[UUID] = None,
+        condition: Optional[str] = None,
+        seller_id: Optional[UUID] = None,
+        include_brand_model: bool = True,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Car]]:
+        """
+        Выгрузка всех автомобилей, подходящих под фильтры, пачками по batch_size
+        """
+        index = await self._catalogue_index() if include_brand_model else None
+        batches = self.car_repository.stream_all(
+            model_id=model_id,
+            brand_id=brand_id,
+            condition=condition,
+            seller_id=seller_id,
+            include_brand_model=include_brand_model and index is None,
+            batch_size=batch_size,
+        )
+        async for cars in batches:
+            if index:
+                index = await self._attach_brand_model(cars, index)
+            yield cars
+
+    async def search_cars(self, query: CarSearchQuery) -> CarSearchResult:
+        """
+        Поиск автомобилей по тексту и фильтрам с подсчётом фасетов
+        """
+        for field_name in ("price", "year", "mileage", "engine_volume", "power"):
+            low = getattr(query, f"{field_name}_min")
+            high = getattr(query, f"{field_name}_max")
+            if low is not None and high is not None and low > high:
+                raise InvalidRequestError(
+                    f"Некорректный диапазон {field_name}: минимум больше максимума"
+                )
+        return await self.car_repository.search(query)
+
+    async def get_market_stats(
+        self,
+        brand_id: Optional[UUID] = None,
+        model_id: Optional[UUID] = None,
+        year: Optional[int] = None,
+    ) -> List[CarMarketStats]:
+        """
+        Рыночная статистика цен и пробега по годам выпуска для бренда или модели.
+        Данные берутся из предрассчитанных агрегатов и могут отставать от
+        последних изменений объявлений
+        """
+        if (brand_id is None) == (model_id is None):
+            raise InvalidRequestError("Укажите либо brand_id, либо model_id")
+        return await self.stats_repository.get_market_stats(
+            brand_id=brand_id, model_id=model_id, year=year
+        )
+
     async def get_car(self, id: UUID, include_brand_model: bool = True) -> Car:
         """
         Получение информации об автомобиле по ID с информацией о модели и бренде
@@ -131,6 +358,16 @@ class CarService:
             raise NotFoundError(f"Автомобиль с ID {id} не найден")
         return car
 
+    async def get_car_versions(self, id: UUID) -> List[Tuple[UUID, datetime]]:
+        """
+        Версии (ID и время изменения) объявления, его модели и бренда для
+        проверки кэша клиента без загрузки самого объявления
+        """
+        versions = await self.car_repository.get_versions(id)
+        if not versions:
+            raise NotFoundError(f"Автомобиль с ID {id} не найден")
+        return versions
+
     async def create_car(self, car: Car) -> Car:
         # Проверяем, существует ли модель
         if not await self.model_repository.get_by_id(car.model_id):
@@ -138,9 +375,89 @@ class CarService:
 
         return await self.car_repository.create(car)
 
+    async def create_cars(self, cars: List[Car]) -> List[BatchItemResult]:
+        """
+        Пакетное создание автомобилей: все model_id проверяются одним запросом,
+        корректные объявления добавляются в одной транзакции
+        """
+        existing_models = await self.model_repository.get_existing_ids(
+            {car.model_id for car in cars}
+        )
+        results = []
+        valid = []
+        for index, car in enumerate(cars):
+            if car.model_id in existing_models:
+                valid.append((index, car))
+            else:
+                results.append(
+                    BatchItemResult(
+                        index=index, error=f"Модель с ID {car.model_id} не найдена"
+                    )
+                )
+
+        created = await self.car_repository.create_many([car for _, car in valid])
+        results.extend(
+            BatchItemResult(index=index, car=car)
+            for (index, _), car in zip(valid, created)
+        )
+        return sorted(results, key=lambda result: result.index)
+
+    async def update_cars(
+        self, changes: List[Tuple[UUID, Dict]], seller_id: Optional[UUID] = None
+    ) -> List[BatchItemResult]:
+        """
+        Пакетное частичное обновление автомобилей. Если передан seller_id,
+        обновляются только объявления этого продавца. Ошибки отдельных элементов
+        (нет объявления, чужое объявление, null в обязательном поле, нет модели)
+        не прерывают обновление остальных
+        """
+        current = {
+            car.id: car
+            for car in await self.car_repository.get_many([id for id, _ in changes])
+        }
+        existing_models = await self.model_repository.get_existing_ids(
+            {values["model_id"] for _, values in changes if values.get("model_id")}
+        )
+
+        results = []
+        valid = []
+        for index, (id, values) in enumerate(changes):
+            car = current.get(id)
+            error = None
+            if not car:
+                error = f"Автомобиль с ID {id} не найден"
+            elif seller_id and car.seller_id != seller_id:
+                error = "Вы можете редактировать только свои объявления"
+            elif null_error := null_fields_error(values, CAR_REQUIRED_FIELDS):
+                error = null_error
+            elif values.get("model_id") and values["model_id"] not in existing_models:
+                error = f"Модель с ID {values['model_id']} не найдена"
+            if error:
+                results.append(BatchItemResult(index=index, error=error))
+            else:
+                valid.append((index, id, values))
+
+        updated = {
+            car.id: car
+            for car in await self.car_repository.update_many(
+                [(id, values) for _, id, values in valid], seller_id=seller_id
+            )
+        }
+        # Между чтением и UPDATE объявление могли удалить, перенести в архив
+        # или передать другому продавцу: такие элементы не обновлены
+        for index, id, _ in valid:
+            car = updated.get(id)
+            if not car:
+                results.append(
+                    BatchItemResult(index=index, error=f"Автомобиль с ID {id} не найден")
+                )
+            else:
+                results.append(BatchItemResult(index=index, car=car))
+        return sorted(results, key=lambda result: result.index)
+
     async def update_car(self, car: Car) -> Car:
         # Проверяем, существует ли автомобиль
-        if not await self.car_repository.get_by_id(car.id):
+        if not await self.car_repository.get_by_id(car.id, include_archived=False):
             raise NotFoundError(f"Автомобиль с ID {car.id} не найден")
 
         # Проверяем, существует ли модель
@@ -149,9 +466,26 @@ class CarService:
 
         return await self.car_repository.update(car)
 
+    async def patch_car(
+        self, id: UUID, values: Dict, seller_id: Optional[UUID] = None
+    ) -> Car:
+        """
+        Частичное обновление автомобиля одним запросом. Существование модели
+        проверяет внешний ключ, право владения — условие на seller_id
+        """
+        if error := null_fields_error(values, CAR_REQUIRED_FIELDS):
+            raise InvalidRequestError(error)
+        car = await self.car_repository.patch(id, values, seller_id=seller_id)
+        if car:
+            return car
+        # Ни одна строка не обновлена: причину выясняем только на пути ошибки
+        if seller_id and await self.car_repository.get_by_id(id, include_archived=False):
+            raise PermissionDeniedError("Вы можете редактировать только свои объявления")
+        raise NotFoundError(f"Автомобиль с ID {id} не найден")
+
     async def delete_car(self, id: UUID) -> bool:
-        # Проверяем, существует ли автомобиль
-        if not await self.car_repository.get_by_id(id):
+        # Удаляется и активное, и архивное объявление: архивные видны владельцу,
+        # поэтому он должен иметь возможность их удалить
+        if not await self.car_repository.delete(id):
             raise NotFoundError(f"Автомобиль с ID {id} не найден")
-
-        return await self.car_repository.delete(id)
+        return True
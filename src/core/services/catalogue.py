@@ -0,0 +1,52 @@
+import itertools
+from dataclasses import fields
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Type, TypeVar
+from uuid import UUID
+
+from core.entites import Brand, CatalogueBrand, CatalogueModel, Car, Model
+
+_versions = itertools.count(1)
+
+Frozen = TypeVar("Frozen")
+
+
+def _freeze(entity, frozen_class: Type[Frozen]) -> Frozen:
+    """Неизменяемая копия сущности с теми же полями"""
+    return frozen_class(*(getattr(entity, item.name) for item in fields(frozen_class)))
+
+
+class CatalogueIndex:
+    """
+    Снимок справочника: модель и её бренд по ID модели.
+
+    Модели и бренды в индексе общие для всех ответов, построенных из одного
+    снимка, поэтому это неизменяемые копии: записи, которые вернули
+    репозитории (и их кэш), со снимком не связаны. Снимок не обновляется на
+    месте: после изменения брендов или моделей строится новый с новым номером
+    версии
+    """
+
+    def __init__(self, brands: Iterable[Brand], models: Iterable[Model]):
+        self.version = next(_versions)
+        brands_by_id = {brand.id: _freeze(brand, CatalogueBrand) for brand in brands}
+        self.models: Dict[UUID, Tuple[CatalogueModel, Optional[CatalogueBrand]]] = {
+            model.id: (_freeze(model, CatalogueModel), brands_by_id.get(model.brand_id))
+            for model in models
+        }
+
+    def __len__(self) -> int:
+        return len(self.models)
+
+    def attach(self, cars: List[Car]) -> Set[UUID]:
+        """
+        Проставляет автомобилям модель и бренд из снимка.
+        Возвращает ID моделей, которых в снимке нет
+        """
+        missing = set()
+        for car in cars:
+            entry = self.models.get(car.model_id)
+            if entry is None:
+                missing.add(car.model_id)
+                continue
+            car.model, car.brand = entry
+        return missing
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from passlib.context import CryptContext
+
+from core.exceptions import ServiceUnavailableError
+from metrics import LatencyStats
+from settings import get_settings
+
+settings = get_settings()
+
+
+class PasswordHasher:
+    """
+    Хеширование и проверка паролей bcrypt в пуле потоков.
+
+    bcrypt освобождает GIL, поэтому потоки выполняются параллельно, а event loop
+    не блокируется на время хеширования. Количество ожидающих задач ограничено:
+    при переполнении очереди запрос отклоняется с ServiceUnavailableError,
+    вместо того чтобы копить задержку.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hasher"
+        )
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.rejected = 0
+        self.queue_wait = LatencyStats()
+        self.run_time = LatencyStats()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.pwd_context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(self.pwd_context.verify, password, hashed_password)
+
+    async def _run(self, func: Callable, *args):
+        if self.pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise ServiceUnavailableError("Сервис перегружен, повторите попытку позже")
+
+        submitted_at = time.perf_counter()
+
+        def job():
+            started_at = time.perf_counter()
+            result = func(*args)
+            return result, started_at - submitted_at, time.perf_counter() - started_at
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, wait, duration = await loop.run_in_executor(self.executor, job)
+        finally:
+            self.pending -= 1
+
+        self.queue_wait.observe(wait)
+        self.run_time.observe(duration)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait.stats(),
+            "run_time": self.run_time.stats(),
+        }
+
+
+password_hasher: PasswordHasher | None = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """
+    Возвращает общий для процесса пул хеширования паролей
+    """
+    global password_hasher
+
+    if not password_hasher:
+        password_hasher = PasswordHasher(
+            max_workers=settings.password_hash_workers,
+            max_queue=settings.password_hash_max_queue,
+        )
+    return password_hasher
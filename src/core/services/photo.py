@@ -0,0 +1,197 @@
+import asyncio
+from io import BytesIO
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from core.entites import CarPhoto, PhotoUpload
+from core.exceptions import InvalidRequestError, NotFoundError, PermissionDeniedError
+from core.InterfaceRepositories.ICar import ICarRepository
+from core.InterfaceRepositories.IStorage import IImageProcessor, IObjectStorage
+
+# Допустимые типы изображений и расширения оригиналов
+PHOTO_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+}
+
+
+class SizeLimitedReader:
+    """
+    Поток, который при чтении считает байты и прерывает сохранение, как только
+    содержимое превышает допустимый размер: заявленный клиентом размер может
+    отсутствовать или не совпадать с настоящим
+    """
+
+    def __init__(self, file: BinaryIO, max_size: int):
+        self.file = file
+        self.max_size = max_size
+        self.read_bytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.file.read(size)
+        self.read_bytes += len(chunk)
+        if self.read_bytes > self.max_size:
+            raise InvalidRequestError(f"Размер фотографии превышает {self.max_size} байт")
+        return chunk
+
+
+class PhotoService:
+    """
+    Загрузка фотографий объявлений.
+
+    Оригиналы сохраняются в хранилище в рамках запроса, а уменьшенные копии
+    (миниатюра для списков и карточка для страницы объявления) готовятся
+    позже, вне запроса, в пуле процессов. Ссылки на готовые копии
+    дописываются в объявление одним атомарным UPDATE.
+    """
+
+    def __init__(
+        self,
+        car_repository: ICarRepository,
+        storage: IObjectStorage,
+        image_processor: IImageProcessor,
+        max_size: int,
+        max_count: int,
+    ):
+        self.car_repository = car_repository
+        self.storage = storage
+        self.image_processor = image_processor
+        self.max_size = max_size
+        self.max_count = max_count
+
+    def _validate(self, uploads: List[PhotoUpload]) -> None:
+        if not uploads:
+            raise InvalidRequestError("Не переданы фотографии")
+        if len(uploads) > self.max_count:
+            raise InvalidRequestError(
+                f"За один запрос можно загрузить не больше {self.max_count} фотографий"
+            )
+        for upload in uploads:
+            if upload.size is not None and upload.size > self.max_size:
+                raise InvalidRequestError(
+                    f"Размер фотографии превышает {self.max_size} байт"
+                )
+
+    async def store_originals(
+        self,
+        car_id: UUID,
+        uploads: List[PhotoUpload],
+        seller_id: Optional[UUID] = None,
+    ) -> List[CarPhoto]:
+        """
+        Проверяет права на объявление и сохраняет оригиналы.
+        Размер проверяется по ходу сохранения, поэтому файл больше max_size не
+        попадает в хранилище, даже если клиент не передал его размер
+        """
+        self._validate(uploads)
+        # Тип определяется по содержимому: заголовок от клиента не проверяет,
+        # что файл удастся обработать
+        content_types = []
+        for upload in uploads:
+            content_type = await self.image_processor.identify(upload.file)
+            if content_type not in PHOTO_EXTENSIONS:
+                raise InvalidRequestError(
+                    "Файл не является изображением JPEG, PNG или WebP"
+                )
+            content_types.append(content_type)
+
+        car = await self.car_repository.get_by_id(
+            car_id, include_brand_model=False, include_archived=False
+        )
+        if not car:
+            raise NotFoundError(f"Автомобиль с ID {car_id} не найден")
+        if seller_id and car.seller_id != seller_id:
+            raise PermissionDeniedError("Вы можете редактировать только свои объявления")
+
+        stored = []
+        try:
+            for upload, content_type in zip(uploads, content_types):
+                photo_id = uuid4()
+                key = f"cars/{car_id}/{photo_id}"
+                original_key = f"{key}/original.{PHOTO_EXTENSIONS[content_type]}"
+                try:
+                    original_url = await self.storage.save(
+                        original_key,
+                        SizeLimitedReader(upload.file, self.max_size),
+                        content_type,
+                    )
+                except Exception:
+                    # Частично записанный оригинал не должен остаться в хранилище
+                    await self.storage.delete(original_key)
+                    raise
+                stored.append(
+                    CarPhoto(
+                        id=photo_id,
+                        car_id=car_id,
+                        key=key,
+                        original_key=original_key,
+                        original_url=original_url,
+                    )
+                )
+        except Exception:
+            for photo in stored:
+                await self.storage.delete(photo.original_key)
+            raise
+        return stored
+
+    async def _delete_photo(self, photo: CarPhoto) -> None:
+        await self.storage.delete(photo.original_key)
+        await self.storage.delete(f"{photo.key}/card.jpg")
+        await self.storage.delete(f"{photo.key}/thumbnail.jpg")
+
+    async def _process_photo(self, photo: CarPhoto) -> Tuple[str, str]:
+        """
+        Готовит и сохраняет копии одной фотографии; возвращает ссылки на
+        карточку и миниатюру. Если фотографию обработать не удалось, её файлы
+        удаляются из хранилища
+        """
+        try:
+            # Оригинал читается из хранилища, а не передаётся из запроса: до
+            # начала обработки его содержимое не держится в памяти
+            images = await self.image_processor.make_variants(
+                await self.storage.load(photo.original_key)
+            )
+            card = await self.storage.save(
+                f"{photo.key}/card.jpg", BytesIO(images["card"]), "image/jpeg"
+            )
+            thumbnail = await self.storage.save(
+                f"{photo.key}/thumbnail.jpg", BytesIO(images["thumbnail"]), "image/jpeg"
+            )
+        except Exception:
+            await self._delete_photo(photo)
+            raise
+        return card, thumbnail
+
+    async def process(self, photos: List[CarPhoto]) -> Dict[UUID, Exception]:
+        """
+        Готовит уменьшенные копии, сохраняет их и дописывает ссылки в объявление.
+        Фотографии обрабатываются независимо: ошибка одной не мешает остальным.
+        Возвращает ошибки необработанных фотографий по их ID
+        """
+        if not photos:
+            return {}
+        car_id = photos[0].car_id
+        results = await asyncio.gather(
+            *(self._process_photo(photo) for photo in photos), return_exceptions=True
+        )
+
+        processed, failed = [], {}
+        for photo, result in zip(photos, results):
+            if isinstance(result, Exception):
+                failed[photo.id] = result
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                processed.append((photo, result))
+        if not processed:
+            return failed
+
+        cards = [card for _, (card, _) in processed]
+        thumbnails = [thumbnail for _, (_, thumbnail) in processed]
+        if not await self.car_repository.add_photos(car_id, cards, thumbnails):
+            # Объявление удалили, пока фотографии обрабатывались
+            for photo, _ in processed:
+                await self._delete_photo(photo)
+            raise NotFoundError(f"Автомобиль с ID {car_id} не найден")
+        return failed
@@ -0,0 +1,76 @@
+import time
+from datetime import timezone
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+
+from cache import TTLCache
+from core.entites import TokenState
+from settings import get_settings
+
+settings = get_settings()
+
+_MISSING = object()
+
+
+class TokenRevocationRegistry:
+    """
+    Реестр отозванных access-токенов.
+
+    Отзыв хранится в базе данных, поэтому действует во всех процессах и после
+    перезапуска. Отзыв бывает двух видов: конкретного токена по jti (выход из
+    системы, jti попадает в таблицу заблокированных токенов) и всех токенов
+    пользователя, выпущенных до момента отзыва (изменение прав или данных
+    пользователя, момент записывается в users.tokens_revoked_at). Токены
+    удалённого пользователя тоже не принимаются.
+
+    Состояние токена читается из базы не чаще раза в check_ttl секунд на токен.
+    В процессе, который выполнил отзыв, он действует сразу, в остальных — не
+    позже чем через check_ttl секунд.
+    """
+
+    def __init__(self, ttl: float, check_ttl: float, max_size: int = 100_000):
+        self.revoked_tokens = TTLCache(max_size=max_size, ttl=ttl)
+        self.revoked_users = TTLCache(max_size=max_size, ttl=ttl)
+        self.states = TTLCache(max_size=max_size, ttl=check_ttl)
+
+    def revoke_token(self, jti: str) -> None:
+        self.revoked_tokens.set(jti, True)
+
+    def revoke_user(self, user_id: str) -> None:
+        self.revoked_users.set(str(user_id), time.time())
+
+    async def is_revoked(
+        self,
+        payload: dict,
+        load_state: Callable[[UUID, Optional[str]], Awaitable[Optional[TokenState]]],
+    ) -> bool:
+        jti = payload.get("jti")
+        user_id = str(payload.get("sub"))
+        issued_at = payload.get("iat", 0)
+        # Отзывы, выполненные в этом процессе, известны без обращения к базе
+        if jti and jti in self.revoked_tokens:
+            return True
+        revoked_at = self.revoked_users.get(user_id)
+        if revoked_at is not None and issued_at < revoked_at:
+            return True
+
+        key = (user_id, jti)
+        state = self.states.get(key, _MISSING)
+        if state is _MISSING:
+            state = await load_state(UUID(user_id), jti)
+            self.states.set(key, state)
+        if state is None or state.token_banned:
+            return True
+        if state.tokens_revoked_at is None:
+            return False
+        revoked_at = state.tokens_revoked_at.replace(tzinfo=timezone.utc).timestamp()
+        return issued_at < revoked_at
+
+    def stats(self) -> dict:
+        return self.states.stats()
+
+
+revocation_registry = TokenRevocationRegistry(
+    ttl=settings.access_token_expire_minutes * 60,
+    check_ttl=settings.token_revocation_check_ttl,
+)
@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import sys
+import time
+from uuid import UUID
+
+from infrastructure.postgres_db import database
+from infrastructure.repositories import CarRepository
+from interface.export import EXPORT_MEDIA_TYPES, export_chunks
+from logger import get_logger
+from settings import get_settings
+
+settings = get_settings()
+logger = get_logger()
+
+
+async def export_database(
+    output,
+    format: str = "ndjson",
+    model_id: UUID | None = None,
+    brand_id: UUID | None = None,
+    condition: str | None = None,
+    include_brand_model: bool = True,
+    batch_size: int = 1000,
+) -> int:
+    """Пишет каталог в output пачками и возвращает количество выгруженных автомобилей"""
+    rows = 0
+
+    async def counted(batches):
+        nonlocal rows
+        async for cars in batches:
+            rows += len(cars)
+            yield cars
+
+    try:
+        async with database.session(read_only=True) as session:
+            batches = CarRepository(session).stream_all(
+                model_id=model_id,
+                brand_id=brand_id,
+                condition=condition,
+                include_brand_model=include_brand_model,
+                batch_size=batch_size,
+            )
+            async for chunk in export_chunks(counted(batches), format, include_brand_model):
+                output.write(chunk)
+    finally:
+        await database.engine.dispose()
+    return rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Выгрузка каталога автомобилей")
+    parser.add_argument(
+        "output", nargs="?", default="-", help="Файл для выгрузки, по умолчанию stdout"
+    )
+    parser.add_argument("--format", choices=tuple(EXPORT_MEDIA_TYPES), default="ndjson")
+    parser.add_argument("--model-id", type=UUID, default=None)
+    parser.add_argument("--brand-id", type=UUID, default=None)
+    parser.add_argument("--condition", default=None)
+    parser.add_argument(
+        "--without-brand-model",
+        action="store_true",
+        help="Не добавлять данные модели и бренда",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.export_batch_size,
+        help="Количество строк, получаемых из курсора за раз",
+    )
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    started_at = time.perf_counter()
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        rows = await export_database(
+            output,
+            format=args.format,
+            model_id=args.model_id,
+            brand_id=args.brand_id,
+            condition=args.condition,
+            include_brand_model=not args.without_brand_model,
+            batch_size=args.batch_size,
+        )
+        logger.info(
+            f"Выгружено {rows} автомобилей за {time.perf_counter() - started_at:.1f} с"
+        )
+    except Exception as e:
+        logger.error(f"Произошла ошибка при выгрузке данных: {e}")
+        raise
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
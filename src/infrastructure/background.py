@@ -0,0 +1,214 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from infrastructure.postgres_db import database
+from infrastructure.repositories import (
+    BannedRefreshTokenRepository,
+    car_archiver,
+    market_stats_refresher,
+)
+from logger import get_logger
+from settings import get_settings
+
+config = get_settings()
+logger = get_logger()
+
+# Ключ advisory-блокировки фонового обслуживания, общий для всех процессов
+MAINTENANCE_LOCK_KEY = 7_310_422_817
+TRY_LOCK_QUERY = text("SELECT pg_try_advisory_lock(:key)")
+UNLOCK_QUERY = text("SELECT pg_advisory_unlock(:key)")
+
+
+class MaintenanceLock:
+    """
+    Advisory-блокировка Postgres, которую удерживает единственный процесс,
+    выполняющий фоновое обслуживание базы. Блокировка уровня сессии держится на
+    отдельном соединении вне пула: если процесс завершился или соединение
+    оборвалось, Postgres её освобождает и её забирает другой процесс.
+
+    Попытка захвата сначала делается на соединении из общего пула, поэтому
+    отдельное соединение открывает только процесс, получивший блокировку
+    """
+
+    def __init__(self, url: str, key: int):
+        self.key = key
+        self.engine = create_async_engine(url, poolclass=NullPool)
+        self.connection: Optional[AsyncConnection] = None
+
+    async def hold(self) -> bool:
+        """Захватывает блокировку или проверяет, что удерживаемая ещё действует"""
+        if self.connection is not None:
+            try:
+                await self.connection.execute(text("SELECT 1"))
+                await self.connection.commit()
+                return True
+            except (exc.SQLAlchemyError, OSError) as e:
+                logger.warning(f"Соединение с блокировкой фонового обслуживания потеряно: {e!r}")
+                await self._close()
+
+        async with database.engine.connect() as conn:
+            if not await conn.scalar(TRY_LOCK_QUERY, {"key": self.key}):
+                return False
+            await conn.scalar(UNLOCK_QUERY, {"key": self.key})
+
+        connection = await self.engine.connect()
+        try:
+            acquired = await connection.scalar(TRY_LOCK_QUERY, {"key": self.key})
+            # Блокировка уровня сессии переживает завершение транзакции;
+            # открытая транзакция не должна висеть на соединении
+            await connection.commit()
+        except BaseException:
+            await connection.close()
+            raise
+        if not acquired:
+            await connection.close()
+            return False
+        self.connection = connection
+        return True
+
+    async def _close(self) -> None:
+        connection, self.connection = self.connection, None
+        try:
+            await connection.close()
+        except (exc.SQLAlchemyError, OSError):
+            pass
+
+    async def release(self) -> None:
+        if self.connection is not None:
+            try:
+                await self.connection.scalar(UNLOCK_QUERY, {"key": self.key})
+            except (exc.SQLAlchemyError, OSError):
+                pass
+            await self._close()
+        await self.engine.dispose()
+
+
+maintenance_lock = MaintenanceLock(config.database_url, MAINTENANCE_LOCK_KEY)
+
+
+async def run_periodically(
+    name: str,
+    interval: float,
+    job: Callable[[], Awaitable[None]],
+    run_first: bool = False,
+) -> None:
+    """
+    Запускает job раз в interval секунд (с run_first — сразу после старта);
+    ошибки логируются и не останавливают цикл
+    """
+    if not run_first:
+        await asyncio.sleep(interval)
+    while True:
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Фоновая задача {name} завершилась с ошибкой: {e}")
+        await asyncio.sleep(interval)
+
+
+async def purge_banned_refresh_tokens() -> None:
+    async with database.session() as session:
+        repository = BannedRefreshTokenRepository(session)
+        deleted = await repository.purge_expired(config.banned_token_purge_batch_size)
+    if deleted:
+        logger.info(f"Удалено истёкших заблокированных refresh-токенов: {deleted}")
+
+
+async def refresh_market_stats() -> None:
+    async with database.session() as session:
+        await market_stats_refresher.refresh(session)
+
+
+async def archive_cars() -> None:
+    async with database.session() as session:
+        archived = await car_archiver.run(session)
+    if archived:
+        logger.info(f"Перенесено в архив объявлений: {archived}")
+
+
+def start_maintenance_tasks() -> List[asyncio.Task]:
+    return [
+        asyncio.create_task(
+            run_periodically(
+                "purge_banned_refresh_tokens",
+                config.banned_token_purge_interval,
+                purge_banned_refresh_tokens,
+            )
+        ),
+        asyncio.create_task(
+            run_periodically(
+                "refresh_market_stats",
+                config.market_stats_refresh_interval,
+                refresh_market_stats,
+            )
+        ),
+        asyncio.create_task(
+            run_periodically("archive_cars", config.archive_interval, archive_cars)
+        ),
+    ]
+
+
+async def run_maintenance(lock: MaintenanceLock, interval: float) -> None:
+    """
+    Раз в interval секунд захватывает или проверяет блокировку фонового
+    обслуживания; задачи обслуживания работают, пока процесс её удерживает
+    """
+    tasks: List[asyncio.Task] = []
+    try:
+        while True:
+            try:
+                is_leader = await lock.hold()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Не удалось проверить блокировку фонового обслуживания: {e}")
+                is_leader = False
+            if is_leader and not tasks:
+                logger.info("Процесс выполняет фоновое обслуживание базы")
+                tasks = start_maintenance_tasks()
+            elif not is_leader and tasks:
+                logger.warning("Процесс больше не выполняет фоновое обслуживание базы")
+                await stop_background_tasks(tasks)
+                tasks = []
+            await asyncio.sleep(interval)
+    finally:
+        await stop_background_tasks(tasks)
+        await lock.release()
+
+
+def start_background_tasks() -> List[asyncio.Task]:
+    """
+    Обслуживание базы (очистка токенов, рыночная статистика, архив) выполняет
+    только процесс, удерживающий блокировку. Отставание реплик проверяет каждый
+    процесс: по нему процесс выбирает реплику для своих запросов
+    """
+    tasks = [
+        asyncio.create_task(
+            run_maintenance(maintenance_lock, config.maintenance_lock_interval)
+        )
+    ]
+    if database.replicas:
+        # Отставание реплик проверяется вне запросов; запросы читают готовое состояние
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "probe_replicas",
+                    config.replica_lag_check_interval,
+                    database.probe_replicas,
+                    run_first=True,
+                )
+            )
+        )
+    return tasks
+
+
+async def stop_background_tasks(tasks: List[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,102 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import BinaryIO, Dict, Optional
+
+from PIL import Image, ImageOps
+
+from core.InterfaceRepositories import IImageProcessor
+from settings import get_settings
+
+config = get_settings()
+
+# Размеры копий: (ширина, высота, качество JPEG). Миниатюра для списков
+# укладывается примерно в 20 КБ, карточка — для страницы объявления
+PHOTO_VARIANTS = {
+    "thumbnail": (320, 240, 70),
+    "card": (1024, 768, 82),
+}
+
+
+def render_variants(data: bytes) -> Dict[str, bytes]:
+    """
+    Уменьшает изображение до всех размеров PHOTO_VARIANTS.
+    Выполняется в отдельном процессе, поэтому принимает и возвращает только байты
+    """
+    largest = max((width, height) for width, height, _ in PHOTO_VARIANTS.values())
+    with Image.open(BytesIO(data)) as image:
+        # Для JPEG декодируем сразу в уменьшенном масштабе (DCT scaling)
+        image.draft("RGB", largest)
+        image = ImageOps.exif_transpose(image).convert("RGB")
+
+        variants = {}
+        for name, (width, height, quality) in PHOTO_VARIANTS.items():
+            variant = image.copy()
+            variant.thumbnail((width, height), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            variant.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+            variants[name] = buffer.getvalue()
+        return variants
+
+
+def identify_image(file: BinaryIO) -> Optional[str]:
+    """
+    Проверяет структуру изображения без декодирования пикселей и возвращает его
+    MIME-тип по содержимому, а не по заголовку от клиента
+    """
+    position = file.tell()
+    try:
+        with Image.open(file) as image:
+            content_type = image.get_format_mimetype()
+            image.verify()
+        return content_type
+    except Exception:
+        # Pillow сообщает о повреждённых файлах разными исключениями
+        return None
+    finally:
+        file.seek(position)
+
+
+class ImageProcessor(IImageProcessor):
+    """
+    Пул процессов для обработки изображений: декодирование и масштабирование
+    нагружают CPU и не должны блокировать цикл событий
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    async def identify(self, file: BinaryIO) -> Optional[str]:
+        # Проверка структуры быстрая, пул процессов для неё не нужен
+        return await asyncio.to_thread(identify_image, file)
+
+    async def make_variants(self, data: bytes) -> Dict[str, bytes]:
+        if self.executor is None:
+            # spawn: дочерние процессы не наследуют потоки и соединения воркера
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, render_variants, data)
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+image_processor: Optional[ImageProcessor] = None
+
+
+def get_image_processor() -> ImageProcessor:
+    """
+    Возвращает общий для процесса пул обработки изображений
+    """
+    global image_processor
+
+    if not image_processor:
+        image_processor = ImageProcessor(max_workers=config.image_workers)
+    return image_processor
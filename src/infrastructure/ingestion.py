@@ -0,0 +1,343 @@
+import csv
+import json
+import os
+import time
+from collections import ChainMap
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from core.entites.car import FuelType, TransmissionType, DriveType, CarCondition
+from infrastructure.models import Brand, Model, Car
+from infrastructure.models.base import utc_now
+from logger import get_logger
+
+logger = get_logger()
+
+# Порядок колонок, в котором строки автомобилей передаются в COPY / INSERT
+CAR_COLUMNS = (
+    "id",
+    "model_id",
+    "year",
+    "price",
+    "mileage",
+    "condition",
+    "fuel_type",
+    "transmission",
+    "drive_type",
+    "color",
+    "engine_volume",
+    "power",
+    "description",
+    "vin",
+    "is_sold",
+    "photos",
+    "created_at",
+    "updated_at",
+)
+
+INGESTION_METHODS = ("copy", "insert")
+
+
+@dataclass
+class IngestionStats:
+    """Итоги загрузки CSV"""
+
+    rows: int = 0
+    skipped: int = 0
+    brands_created: int = 0
+    models_created: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def _optional(value: Optional[str]) -> Optional[str]:
+    if value is None or value == "" or value == "null":
+        return None
+    return value
+
+
+class CarCsvIngestor:
+    """
+    Потоковая загрузка автомобилей из CSV.
+
+    Файл читается пачками по batch_size строк. Для каждой пачки бренды и модели
+    разрешаются одним запросом (недостающие создаются одной вставкой, бренды и
+    модели, параллельно созданные другим загрузчиком, перечитываются), а
+    автомобили записываются через asyncpg COPY или многострочный INSERT.
+    Каждая пачка — отдельная транзакция, после её фиксации номер строки
+    сохраняется в файл чекпоинта, с которого можно продолжить загрузку, а
+    найденные и созданные бренды и модели попадают в кэш.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        batch_size: int = 10000,
+        checkpoint_path: Optional[str] = None,
+        method: str = "copy",
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size должен быть положительным")
+        if method not in INGESTION_METHODS:
+            raise ValueError(f"Неизвестный метод загрузки: {method}")
+        self.engine = engine
+        self.batch_size = batch_size
+        self.checkpoint_path = checkpoint_path
+        self.method = method
+        self.brands_cache: Dict[str, UUID] = {}
+        self.models_cache: Dict[Tuple[UUID, str], UUID] = {}
+
+    # Чекпоинты
+    def _load_checkpoint(self, csv_file: str) -> int:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path, mode="r", encoding="utf-8") as file:
+            checkpoint = json.load(file)
+        if checkpoint.get("source") != os.path.abspath(csv_file):
+            logger.warning(
+                f"Чекпоинт {self.checkpoint_path} относится к другому файлу, игнорируем"
+            )
+            return 0
+        return int(checkpoint.get("rows", 0))
+
+    def _save_checkpoint(self, csv_file: str, rows: int) -> None:
+        if not self.checkpoint_path:
+            return
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, mode="w", encoding="utf-8") as file:
+            json.dump({"source": os.path.abspath(csv_file), "rows": rows}, file)
+        # Атомарная замена, чтобы прерванная запись не испортила чекпоинт
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # Чтение
+    def _read_chunks(self, file, skip: int) -> Iterator[List[dict]]:
+        reader = csv.DictReader(file)
+        if skip:
+            for _ in islice(reader, skip):
+                pass
+        while True:
+            chunk = list(islice(reader, self.batch_size))
+            if not chunk:
+                return
+            yield chunk
+
+    # Справочники. ID брендов и моделей пачки собираются отдельно от кэша и
+    # попадают в него только после фиксации пачки: иначе после отката в кэше
+    # остались бы ID, которых нет в базе
+    async def _resolve_brands(
+        self, conn: AsyncConnection, chunk: List[dict], stats: IngestionStats
+    ) -> Dict[str, UUID]:
+        resolved: Dict[str, UUID] = {}
+        missing: Dict[str, dict] = {}
+        for row in chunk:
+            name = row["brand_name"]
+            if name not in self.brands_cache and name not in missing:
+                missing[name] = row
+        if not missing:
+            return resolved
+
+        result = await conn.execute(
+            select(Brand.name, Brand.id).where(Brand.name.in_(list(missing)))
+        )
+        for name, id in result.all():
+            resolved[name] = id
+            missing.pop(name)
+        if not missing:
+            return resolved
+
+        now = utc_now()
+        stmt = (
+            pg_insert(Brand)
+            .values(
+                [
+                    {
+                        "id": uuid4(),
+                        "name": name,
+                        "country": _optional(row["brand_country"]),
+                        "logo_url": _optional(row["brand_logo_url"]),
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for name, row in missing.items()
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(Brand.name, Brand.id)
+        )
+        result = await conn.execute(stmt)
+        for name, id in result.all():
+            resolved[name] = id
+            missing.pop(name)
+            stats.brands_created += 1
+
+        if missing:
+            # Бренды, параллельно созданные другим процессом
+            result = await conn.execute(
+                select(Brand.name, Brand.id).where(Brand.name.in_(list(missing)))
+            )
+            for name, id in result.all():
+                resolved[name] = id
+        return resolved
+
+    async def _resolve_models(
+        self,
+        conn: AsyncConnection,
+        chunk: List[dict],
+        brands: Mapping[str, UUID],
+        stats: IngestionStats,
+    ) -> Dict[Tuple[UUID, str], UUID]:
+        resolved: Dict[Tuple[UUID, str], UUID] = {}
+        missing: Dict[Tuple[UUID, str], dict] = {}
+        for row in chunk:
+            key = (brands[row["brand_name"]], row["model_name"])
+            if key not in self.models_cache and key not in missing:
+                missing[key] = row
+        if not missing:
+            return resolved
+
+        result = await conn.execute(
+            select(Model.brand_id, Model.name, Model.id).where(
+                tuple_(Model.brand_id, Model.name).in_(list(missing))
+            )
+        )
+        for brand_id, name, id in result.all():
+            resolved[(brand_id, name)] = id
+            missing.pop((brand_id, name), None)
+        if not missing:
+            return resolved
+
+        now = utc_now()
+        values = []
+        for (brand_id, name), row in missing.items():
+            year_from = _optional(row["model_year_from"])
+            year_to = _optional(row["model_year_to"])
+            values.append(
+                {
+                    "id": uuid4(),
+                    "brand_id": brand_id,
+                    "name": name,
+                    "year_from": int(year_from) if year_from else None,
+                    "year_to": int(year_to) if year_to else None,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+        stmt = (
+            pg_insert(Model)
+            .values(values)
+            .on_conflict_do_nothing(index_elements=["brand_id", "name"])
+            .returning(Model.brand_id, Model.name, Model.id)
+        )
+        result = await conn.execute(stmt)
+        for brand_id, name, id in result.all():
+            resolved[(brand_id, name)] = id
+            missing.pop((brand_id, name))
+            stats.models_created += 1
+
+        if missing:
+            # Модели, параллельно созданные другим процессом
+            result = await conn.execute(
+                select(Model.brand_id, Model.name, Model.id).where(
+                    tuple_(Model.brand_id, Model.name).in_(list(missing))
+                )
+            )
+            for brand_id, name, id in result.all():
+                resolved[(brand_id, name)] = id
+        return resolved
+
+    # Автомобили
+    @staticmethod
+    def _to_car_record(
+        row: dict,
+        brands: Mapping[str, UUID],
+        models: Mapping[Tuple[UUID, str], UUID],
+        now,
+    ) -> tuple:
+        model_id = models[(brands[row["brand_name"]], row["model_name"])]
+        engine_volume = _optional(row["car_engine_volume"])
+        power = _optional(row["car_power"])
+        photos = _optional(row["car_photos"])
+        # Enum-колонки в БД хранят имена членов перечислений (NEW, USED, ...)
+        return (
+            uuid4(),
+            model_id,
+            int(row["car_year"]),
+            float(row["car_price"]),
+            int(row["car_mileage"]),
+            CarCondition(row["car_condition"]).name,
+            FuelType(row["car_fuel_type"]).name,
+            TransmissionType(row["car_transmission"]).name,
+            DriveType(row["car_drive_type"]).name,
+            _optional(row["car_color"]),
+            float(engine_volume) if engine_volume else None,
+            int(power) if power else None,
+            _optional(row["car_description"]),
+            _optional(row["car_vin"]),
+            False,
+            photos.split(";") if photos else [],
+            now,
+            now,
+        )
+
+    async def _write_cars(self, conn: AsyncConnection, records: List[tuple]) -> None:
+        if self.method == "copy":
+            raw_connection = await conn.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                Car.__tablename__, records=records, columns=CAR_COLUMNS
+            )
+        else:
+            await conn.execute(
+                insert(Car.__table__),
+                [dict(zip(CAR_COLUMNS, record)) for record in records],
+            )
+
+    async def run(self, csv_file: str) -> IngestionStats:
+        stats = IngestionStats()
+        processed = self._load_checkpoint(csv_file)
+        stats.skipped = processed
+        if processed:
+            logger.info(f"Продолжаем загрузку {csv_file} со строки {processed}")
+
+        started = time.perf_counter()
+        with open(csv_file, mode="r", encoding="utf-8", newline="") as file:
+            for chunk in self._read_chunks(file, skip=processed):
+                batch_started = time.perf_counter()
+                async with self.engine.begin() as conn:
+                    brands = ChainMap(
+                        await self._resolve_brands(conn, chunk, stats), self.brands_cache
+                    )
+                    models = ChainMap(
+                        await self._resolve_models(conn, chunk, brands, stats),
+                        self.models_cache,
+                    )
+                    now = utc_now()
+                    records = [
+                        self._to_car_record(row, brands, models, now) for row in chunk
+                    ]
+                    await self._write_cars(conn, records)
+                # Пачка зафиксирована: её бренды и модели есть в базе
+                self.brands_cache.update(brands.maps[0])
+                self.models_cache.update(models.maps[0])
+
+                processed += len(chunk)
+                stats.rows += len(chunk)
+                self._save_checkpoint(csv_file, processed)
+
+                batch_elapsed = time.perf_counter() - batch_started
+                stats.elapsed = time.perf_counter() - started
+                logger.info(
+                    f"Загружено {processed} строк: пачка {len(chunk) / batch_elapsed:.0f} строк/с, "
+                    f"в среднем {stats.rows_per_second:.0f} строк/с"
+                )
+
+        stats.elapsed = time.perf_counter() - started
+        return stats
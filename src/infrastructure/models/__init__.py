@@ -1,6 +1,7 @@
 from .auth import BannedRefreshToken, User
 from .base import BaseModelMixin
-from .car import Brand, Model, Car
+from .car import Brand, Model, Car, ArchivedCar
+from .stats import car_market_stats
 
 __all__ = [
     "BannedRefreshToken",
@@ -9,4 +10,6 @@ __all__ = [
     "Brand",
     "Model",
     "Car",
+    "ArchivedCar",
+    "car_market_stats",
 ]
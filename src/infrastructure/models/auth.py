@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from sqlalchemy import ARRAY, ForeignKey, String
 from sqlalchemy.orm import mapped_column, Mapped, relationship
@@ -11,7 +11,8 @@ class BannedRefreshToken(Base, BaseModelMixin):
     __tablename__ = "BannedRefreshTokens"
 
     jti: Mapped[str] = mapped_column(nullable=False, unique=True)
-
+    # Срок действия самого refresh-токена: после него запись можно удалить
+    expires_at: Mapped[datetime] = mapped_column(nullable=False, index=True)
 
 
 class User(Base, BaseModelMixin):
@@ -24,5 +25,7 @@ class User(Base, BaseModelMixin):
     is_active: Mapped[bool] = mapped_column(default=True)
     is_superuser: Mapped[bool] = mapped_column(default=False)
     scopes: Mapped[List[str]] = mapped_column(ARRAY(String), default=[])
+    # Access-токены, выпущенные раньше, отозваны (изменение прав или данных)
+    tokens_revoked_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
 
 
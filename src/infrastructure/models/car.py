@@ -1,12 +1,16 @@
 from datetime import datetime
 from typing import List
 from uuid import UUID
-from sqlalchemy import ARRAY, ForeignKey, String, Float, Integer, Boolean, Enum
+from sqlalchemy import ARRAY, ForeignKey, String, Float, Integer, Boolean, Enum, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from infrastructure.models.base import BaseModelMixin
 from infrastructure.postgres_db import Base
 from core.entites.car import FuelType, TransmissionType, DriveType, CarCondition
 
+# Конфигурация полнотекстового поиска; должна совпадать с триггером в миграции
+SEARCH_CONFIG = "simple"
+
 
 class Brand(Base, BaseModelMixin):
     __tablename__ = "brands"
@@ -21,6 +25,8 @@ class Brand(Base, BaseModelMixin):
 
 class Model(Base, BaseModelMixin):
     __tablename__ = "models"
+    # Загрузка CSV создаёт модели через INSERT ... ON CONFLICT по этой паре
+    __table_args__ = (UniqueConstraint("brand_id", "name", name="uq_models_brand_id_name"),)
     
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     brand_id: Mapped[UUID] = mapped_column(ForeignKey("brands.id", ondelete="CASCADE"), nullable=False)
@@ -34,6 +40,18 @@ class Model(Base, BaseModelMixin):
 
 class Car(Base, BaseModelMixin):
     __tablename__ = "cars"
+    __table_args__ = (
+        # Индексы для keyset-пагинации по (created_at, id)
+        Index("ix_cars_created_at_id", "created_at", "id"),
+        Index("ix_cars_seller_id_created_at_id", "seller_id", "created_at", "id"),
+        # Поиск: полнотекстовый индекс и индексы для диапазонных фильтров
+        Index("ix_cars_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_cars_price", "price"),
+        Index("ix_cars_year", "year"),
+        Index("ix_cars_mileage", "mileage"),
+        # Выбор объявлений для переноса в архив
+        Index("ix_cars_updated_at", "updated_at"),
+    )
     
     model_id: Mapped[UUID] = mapped_column(ForeignKey("models.id", ondelete="CASCADE"), nullable=False)
     year: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -53,6 +71,50 @@ class Car(Base, BaseModelMixin):
     vin: Mapped[str] = mapped_column(String(17), nullable=True)
     is_sold: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     photos: Mapped[List[str]] = mapped_column(ARRAY(String), default=[], nullable=False)
+    # Миниатюры для списков, в том же порядке, что и photos
+    thumbnails: Mapped[List[str]] = mapped_column(
+        ARRAY(String), default=[], server_default="{}", nullable=False
+    )
+
+    # Заполняется триггером из описания, названий модели и бренда; не загружается по умолчанию
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, nullable=True, deferred=True)
     
     # Отношения
-    model: Mapped["Model"] = relationship(back_populates="cars")
\ No newline at end of file
+    model: Mapped["Model"] = relationship(back_populates="cars")
+
+
+class ArchivedCar(Base):
+    """
+    Проданные и устаревшие объявления, перенесённые из cars.
+
+    Таблица секционирована по годам created_at, поэтому первичный ключ включает
+    created_at. Внешних ключей нет: архив хранит объявления и после удаления
+    модели или продавца
+    """
+
+    __tablename__ = "cars_archive"
+    __table_args__ = ({"postgresql_partition_by": "RANGE (created_at)"},)
+
+    id: Mapped[UUID] = mapped_column(primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(primary_key=True)
+    updated_at: Mapped[datetime] = mapped_column(nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(nullable=False)
+
+    model_id: Mapped[UUID] = mapped_column(nullable=False)
+    year: Mapped[int] = mapped_column(Integer, nullable=False)
+    price: Mapped[float] = mapped_column(Float, nullable=False)
+    mileage: Mapped[int] = mapped_column(Integer, nullable=False)
+    condition: Mapped[CarCondition] = mapped_column(Enum(CarCondition), nullable=False)
+    fuel_type: Mapped[FuelType] = mapped_column(Enum(FuelType), nullable=False)
+    transmission: Mapped[TransmissionType] = mapped_column(Enum(TransmissionType), nullable=False)
+    drive_type: Mapped[DriveType] = mapped_column(Enum(DriveType), nullable=False)
+
+    seller_id: Mapped[UUID] = mapped_column(nullable=True)
+    color: Mapped[str] = mapped_column(String(50), nullable=True)
+    engine_volume: Mapped[float] = mapped_column(Float, nullable=True)
+    power: Mapped[int] = mapped_column(Integer, nullable=True)
+    description: Mapped[str] = mapped_column(String(2000), nullable=True)
+    vin: Mapped[str] = mapped_column(String(17), nullable=True)
+    is_sold: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    photos: Mapped[List[str]] = mapped_column(ARRAY(String), nullable=False)
+    thumbnails: Mapped[List[str]] = mapped_column(ARRAY(String), nullable=False)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Float, Integer, MetaData, Table, Uuid
+
+# Материализованное представление создаётся и обновляется миграцией/фоновой
+# задачей, а не через ORM. Отдельный MetaData не даёт alembic autogenerate
+# принять его за таблицу
+stats_metadata = MetaData()
+
+car_market_stats = Table(
+    "car_market_stats",
+    stats_metadata,
+    # model_id для строк по модели, brand_id для строк по бренду целиком
+    Column("group_id", Uuid, nullable=False),
+    Column("brand_id", Uuid, nullable=False),
+    Column("model_id", Uuid, nullable=True),
+    Column("year", Integer, nullable=False),
+    Column("listings", Integer, nullable=False),
+    Column("price_min", Float),
+    Column("price_max", Float),
+    Column("price_mean", Float),
+    Column("price_median", Float),
+    Column("price_p10", Float),
+    Column("price_p90", Float),
+    Column("mileage_min", Integer),
+    Column("mileage_max", Integer),
+    Column("mileage_mean", Float),
+    Column("mileage_median", Float),
+    Column("mileage_p10", Float),
+    Column("mileage_p90", Float),
+)
@@ -1,6 +1,11 @@
+import asyncio
+import itertools
+import time
 from asyncio import current_task
 from contextlib import asynccontextmanager
+from typing import List, Optional, Sequence
 
+from sqlalchemy import event, exc, text
 from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
@@ -8,41 +13,254 @@ from sqlalchemy.ext.asyncio import (
     async_scoped_session,
 )
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
+from logger import get_logger
+from infrastructure.query_stats import query_log
+from metrics import LatencyStats
 from settings import get_settings
 
 config = get_settings()
+logger = get_logger()
 
-
-from asyncio import current_task
-from sqlalchemy.ext.asyncio import (
-    create_async_engine,
-    AsyncSession,
-    async_scoped_session,
+# Отставание реплики: 0, если всё полученное WAL уже применено, иначе время
+# с момента последней применённой транзакции
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
 )
-from sqlalchemy.orm import declarative_base
+
+REPLICA_SELECTION_STRATEGIES = ("round_robin", "least_connections")
 
 
 Base = declarative_base()
 
 
+class PoolMetrics:
+    """
+    Метрики пула соединений: ожидание выдачи соединения и время жизни соединений
+    """
+
+    def __init__(self):
+        self.checkout_wait = LatencyStats()
+        self.connection_lifetime = LatencyStats()
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidations = 0
+
+    def attach(self, engine) -> None:
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "close", self._on_close)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+        connection_record.info["connected_at"] = time.monotonic()
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+
+    def _on_close(self, dbapi_connection, connection_record):
+        connected_at = connection_record.info.pop("connected_at", None)
+        if connected_at is not None:
+            self.connection_lifetime.observe(time.monotonic() - connected_at)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.invalidations += 1
+
+    def pool_class(self):
+        """
+        Класс пула, замеряющий ожидание соединения (включая открытие нового
+        соединения при переполнении)
+        """
+        metrics = self
+
+        class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+            def _do_get(self):
+                started_at = time.perf_counter()
+                try:
+                    return super()._do_get()
+                finally:
+                    metrics.checkout_wait.observe(time.perf_counter() - started_at)
+
+        return InstrumentedAsyncAdaptedQueuePool
+
+
+class Replica:
+    """
+    Реплика для чтения: движок, фабрика сессий и последнее измеренное отставание.
+
+    Отставание измеряет фоновая задача через отдельный движок без пула с
+    короткими таймаутами подключения и запроса, поэтому недоступная реплика не
+    задерживает запросы пользователей и не занимает соединения их пула
+    """
+
+    def __init__(self, url: str, engine_options: dict, probe_timeout: float = 2.0):
+        self.pool_metrics = PoolMetrics()
+        self.engine = create_engine(url, self.pool_metrics, **engine_options)
+        self.session_factory = create_session_factory(self.engine)
+        self.probe_timeout = probe_timeout
+        self.probe_engine = create_async_engine(
+            url,
+            poolclass=NullPool,
+            connect_args={"timeout": probe_timeout, "command_timeout": probe_timeout},
+        )
+        self.lag: Optional[float] = None
+        self.lag_checked_at = float("-inf")
+        self.healthy = False
+
+    async def _measure_lag(self) -> float:
+        async with self.probe_engine.connect() as conn:
+            return float((await conn.execute(REPLICA_LAG_QUERY)).scalar())
+
+    async def refresh_lag(self) -> None:
+        try:
+            self.lag = await asyncio.wait_for(self._measure_lag(), self.probe_timeout)
+            self.healthy = True
+        except (exc.SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+            logger.warning(f"Реплика {self.engine.url.host} недоступна: {e!r}")
+            self.healthy = False
+        self.lag_checked_at = time.monotonic()
+
+    def checked_out(self) -> int:
+        return self.engine.sync_engine.pool.checkedout()
+
+    def stats(self) -> dict:
+        return {
+            "host": self.engine.url.host,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            **pool_stats(self.engine, self.pool_metrics),
+        }
+
+
+def create_engine(url: str, pool_metrics: PoolMetrics, **options):
+    statement_cache_size = options.pop("statement_cache_size")
+    engine = create_async_engine(
+        url=url,
+        poolclass=pool_metrics.pool_class(),
+        connect_args={"prepared_statement_cache_size": statement_cache_size},
+        **options,
+    )
+    pool_metrics.attach(engine.sync_engine)
+    query_log.attach(engine.sync_engine)
+    return engine
+
+
+def create_session_factory(engine):
+    return async_sessionmaker(
+        bind=engine, autoflush=False, autocommit=False, expire_on_commit=False
+    )
+
+
+def pool_stats(engine, pool_metrics: PoolMetrics) -> dict:
+    pool = engine.sync_engine.pool
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "connects": pool_metrics.connects,
+        "checkouts": pool_metrics.checkouts,
+        "invalidations": pool_metrics.invalidations,
+        "checkout_wait": pool_metrics.checkout_wait.stats(),
+        "connection_lifetime": pool_metrics.connection_lifetime.stats(),
+    }
+
+
 class Database:
-    def __init__(self, url: str, echo: bool = False):
-        self.engine = create_async_engine(url=url, echo=echo)
+    """
+    Основная база данных и необязательные реплики для чтения.
+
+    Сессии только для чтения открываются на реплике, выбранной по кругу или по
+    наименьшему числу занятых соединений. Реплики, отставание которых больше
+    replica_max_lag секунд или которые недоступны, пропускаются; если подходящих
+    реплик нет, чтение идёт в основную базу. Состояние реплик обновляет
+    probe_replicas, которую раз в replica_lag_check_interval секунд запускает
+    фоновая задача; выбор реплики только читает его. Реплика, которую давно не
+    удавалось проверить, считается недоступной.
+    """
 
-        self.session_factory = async_sessionmaker(
-            bind=self.engine, autoflush=False, autocommit=False, expire_on_commit=False
+    def __init__(
+        self,
+        url: str,
+        echo: bool = False,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        statement_cache_size: int = 100,
+        replica_urls: Sequence[str] = (),
+        replica_max_lag: float = 5.0,
+        replica_lag_check_interval: float = 5.0,
+        replica_selection: str = "round_robin",
+        replica_probe_timeout: float = 2.0,
+    ):
+        if replica_selection not in REPLICA_SELECTION_STRATEGIES:
+            raise ValueError(f"Неизвестная стратегия выбора реплики: {replica_selection}")
+        engine_options = dict(
+            echo=echo,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+            statement_cache_size=statement_cache_size,
         )
+        self.pool_metrics = PoolMetrics()
+        self.engine = create_engine(url, self.pool_metrics, **engine_options)
+        self.session_factory = create_session_factory(self.engine)
+
+        self.replicas: List[Replica] = [
+            Replica(replica_url, dict(engine_options), replica_probe_timeout)
+            for replica_url in replica_urls
+        ]
+        self.replica_max_lag = replica_max_lag
+        self.replica_lag_check_interval = replica_lag_check_interval
+        self.replica_selection = replica_selection
+        self._round_robin = itertools.count()
+        self.primary_fallbacks = 0
 
     def get_scope_session(self):
         return async_scoped_session(
             session_factory=self.session_factory, scopefunc=current_task
         )
 
-    async def get_db_session(self):
-        from sqlalchemy import exc
+    async def probe_replicas(self) -> None:
+        """Проверяет отставание всех реплик параллельно"""
+        await asyncio.gather(*(replica.refresh_lag() for replica in self.replicas))
+
+    def _select_replica(self) -> Optional[Replica]:
+        # Проверка, которая не обновлялась несколько интервалов, означает, что
+        # фоновая задача остановлена: устаревшему состоянию не доверяем
+        stale_before = time.monotonic() - 3 * self.replica_lag_check_interval
+        candidates = [
+            replica
+            for replica in self.replicas
+            if replica.healthy
+            and replica.lag_checked_at >= stale_before
+            and replica.lag is not None
+            and replica.lag <= self.replica_max_lag
+        ]
+        if not candidates:
+            return None
+        if self.replica_selection == "least_connections":
+            return min(candidates, key=Replica.checked_out)
+        return candidates[next(self._round_robin) % len(candidates)]
 
-        session: AsyncSession = self.session_factory()
+    @asynccontextmanager
+    async def session(self, read_only: bool = False):
+        session_factory = self.session_factory
+        if read_only and self.replicas:
+            replica = self._select_replica()
+            if replica:
+                session_factory = replica.session_factory
+            else:
+                self.primary_fallbacks += 1
+
+        session: AsyncSession = session_factory()
         try:
             yield session
         except exc.SQLAlchemyError as error:
@@ -51,6 +269,40 @@ class Database:
         finally:
             await session.close()
 
+    async def get_db_session(self):
+        async with self.session() as session:
+            yield session
+
+    async def get_read_session(self):
+        async with self.session(read_only=True) as session:
+            yield session
+
+    async def dispose(self) -> None:
+        """Закрывает соединения основной базы и реплик"""
+        await self.engine.dispose()
+        for replica in self.replicas:
+            await replica.engine.dispose()
+            await replica.probe_engine.dispose()
 
-# database = Database(config.database_url)
-database: Database = Database(config.database_url)
\ No newline at end of file
+    def stats(self) -> dict:
+        return {
+            **pool_stats(self.engine, self.pool_metrics),
+            "primary_fallbacks": self.primary_fallbacks,
+            "replicas": [replica.stats() for replica in self.replicas],
+        }
+
+
+database: Database = Database(
+    config.database_url,
+    pool_size=config.db_pool_size,
+    max_overflow=config.db_max_overflow,
+    pool_timeout=config.db_pool_timeout,
+    pool_recycle=config.db_pool_recycle,
+    pool_pre_ping=config.db_pool_pre_ping,
+    statement_cache_size=config.db_statement_cache_size,
+    replica_urls=config.replica_database_urls,
+    replica_max_lag=config.replica_max_lag,
+    replica_lag_check_interval=config.replica_lag_check_interval,
+    replica_selection=config.replica_selection,
+    replica_probe_timeout=config.replica_probe_timeout,
+)
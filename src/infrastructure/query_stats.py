@@ -0,0 +1,120 @@
+import re
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from logger import get_logger
+from settings import get_settings
+
+config = get_settings()
+logger = get_logger()
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])\d+(?:\.\d+)?\b")
+# Развёрнутые списки параметров IN ($1, $2, ...) и VALUES (...), (...)
+_PARAMETER_LIST = re.compile(r"(\$\d+|\?)(?:\s*,\s*(\$\d+|\?))+")
+_VALUES_LIST = re.compile(r"(\([^()]*\))(?:\s*,\s*\([^()]*\))+")
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Приводит SQL к виду, пригодному для группировки в логах: без литералов,
+    с одним плейсхолдером вместо списков параметров и в одну строку
+    """
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PARAMETER_LIST.sub("?, ...", statement)
+    statement = _VALUES_LIST.sub(r"\1, ...", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class QueryStats:
+    """Запросы к базе данных в рамках одного HTTP-запроса"""
+
+    __slots__ = ("count", "total_time", "slowest_time", "slowest_statement")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def observe(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+
+# Статистика текущего HTTP-запроса; сессии SQLAlchemy выполняют запросы в
+# greenlet с тем же контекстом, поэтому обработчики событий видят её
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+class QueryLog:
+    """Счётчики запросов процесса и журнал медленных запросов"""
+
+    def __init__(self, slow_query_threshold: float):
+        self.slow_query_threshold = slow_query_threshold
+        self.statements = 0
+        self.failed_statements = 0
+        self.slow_statements = 0
+
+    def attach(self, engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        # Запросы на одном соединении выполняются по очереди, поэтому хватает
+        # одного времени начала; его снимает и завершение, и ошибка запроса
+        conn.info["query_started_at"] = time.perf_counter()
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        self._observe(conn, statement)
+
+    def _handle_error(self, exception_context) -> None:
+        conn = exception_context.connection
+        if conn is None or exception_context.statement is None:
+            # Ошибка подключения, а не запроса
+            return
+        self.failed_statements += 1
+        self._observe(conn, exception_context.statement)
+
+    def _observe(self, conn, statement: str) -> None:
+        started_at = conn.info.pop("query_started_at", None)
+        if started_at is None:
+            return
+        duration = time.perf_counter() - started_at
+        self.statements += 1
+
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.observe(statement, duration)
+
+        if duration * 1000 >= self.slow_query_threshold:
+            self.slow_statements += 1
+            logger.warning(
+                f"Медленный запрос {duration * 1000:.1f} мс: {normalize_sql(statement)}"
+            )
+
+    def stats(self) -> dict:
+        return {
+            "statements": self.statements,
+            "failed_statements": self.failed_statements,
+            "slow_statements": self.slow_statements,
+            "slow_query_threshold_ms": self.slow_query_threshold,
+        }
+
+
+query_log = QueryLog(slow_query_threshold=config.slow_query_threshold_ms)
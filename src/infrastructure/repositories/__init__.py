@@ -1,10 +1,28 @@
 from .auth import AuthRepository, BannedRefreshTokenRepository
-from .car import BrandRepository, ModelRepository, CarRepository
+from .archive import CarArchiver, car_archiver
+from .car import BrandRepository, ModelRepository, CarRepository, car_count_cache
+from .cached import (
+    CatalogueCache,
+    CachedBrandRepository,
+    CachedModelRepository,
+    catalogue_cache,
+)
+from .stats import CarStatsRepository, MarketStatsRefresher, market_stats_refresher
 
 __all__ = [
     "AuthRepository",
     "BannedRefreshTokenRepository",
+    "CarArchiver",
+    "car_archiver",
     "BrandRepository",
     "ModelRepository",
     "CarRepository",
+    "car_count_cache",
+    "CatalogueCache",
+    "CachedBrandRepository",
+    "CachedModelRepository",
+    "catalogue_cache",
+    "CarStatsRepository",
+    "MarketStatsRefresher",
+    "market_stats_refresher",
 ]
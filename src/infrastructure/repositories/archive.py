@@ -0,0 +1,141 @@
+import time
+from datetime import timedelta
+from typing import Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infrastructure.models import ArchivedCar
+from infrastructure.models.base import utc_now
+from logger import get_logger
+from settings import get_settings
+
+settings = get_settings()
+logger = get_logger()
+
+COLUMNS = ", ".join(
+    column.name for column in ArchivedCar.__table__.columns if column.name != "archived_at"
+)
+
+# Перенос одной пачки одним запросом: строки удаляются из cars и вставляются в
+# архив в той же транзакции. SKIP LOCKED не даёт архиватору ждать строки,
+# которые сейчас изменяются, и позволяет нескольким процессам работать параллельно
+MOVE_BATCH = text(
+    f"""
+    WITH moved AS (
+        DELETE FROM cars
+        WHERE id IN (
+            SELECT id FROM cars
+            WHERE updated_at < :stale_before OR (is_sold AND updated_at < :sold_before)
+            ORDER BY updated_at
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING {COLUMNS}
+    )
+    INSERT INTO cars_archive ({COLUMNS}, archived_at)
+    SELECT {COLUMNS}, timezone('utc', now()) FROM moved
+    """
+)
+
+
+class CarArchiver:
+    """
+    Переносит проданные и устаревшие объявления из cars в секционированный
+    cars_archive, чтобы активная таблица и её индексы оставались небольшими.
+
+    Проданное объявление переносится через sold_after_days после последнего
+    изменения, непроданное — через stale_after_days. За один запуск
+    переносится не больше max_batches пачек по batch_size строк
+    """
+
+    def __init__(
+        self,
+        sold_after_days: float,
+        stale_after_days: float,
+        batch_size: int,
+        max_batches: int,
+    ):
+        self.sold_after = timedelta(days=sold_after_days)
+        self.stale_after = timedelta(days=stale_after_days)
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        # Годы, секцию которых создать не удалось: повторная попытка на каждом
+        # запуске только пишет то же предупреждение
+        self.failed_partitions: Set[int] = set()
+        self.runs = 0
+        self.archived = 0
+        self.last_duration: Optional[float] = None
+
+    async def ensure_partitions(self, session: AsyncSession) -> None:
+        """Создаёт секции архива текущего и следующего года, если их ещё нет"""
+        year = utc_now().year
+        for partition_year in (year, year + 1):
+            if partition_year in self.failed_partitions:
+                continue
+            name = f"cars_archive_{partition_year}"
+            exists = (
+                await session.execute(text("SELECT to_regclass(:name)"), {"name": name})
+            ).scalar()
+            if exists:
+                continue
+            try:
+                await session.execute(
+                    text(
+                        f"CREATE TABLE {name} PARTITION OF cars_archive FOR VALUES "
+                        f"FROM ('{partition_year}-01-01') TO ('{partition_year + 1}-01-01')"
+                    )
+                )
+                await session.commit()
+            except DBAPIError as e:
+                # Секцию уже создал другой процесс или строки этого года лежат в
+                # секции по умолчанию; перенос всё равно работает через неё
+                await session.rollback()
+                self.failed_partitions.add(partition_year)
+                logger.warning(f"Не удалось создать секцию {name}: {e}")
+
+    async def archive_batch(self, session: AsyncSession) -> int:
+        now = utc_now()
+        result = await session.execute(
+            MOVE_BATCH,
+            {
+                "stale_before": now - self.stale_after,
+                "sold_before": now - self.sold_after,
+                "batch_size": self.batch_size,
+            },
+        )
+        await session.commit()
+        return result.rowcount
+
+    async def run(self, session: AsyncSession) -> int:
+        """Переносит пачки, пока они заполнены целиком, и возвращает число строк"""
+        started_at = time.perf_counter()
+        await self.ensure_partitions(session)
+        archived = 0
+        for _ in range(self.max_batches):
+            moved = await self.archive_batch(session)
+            archived += moved
+            if moved < self.batch_size:
+                break
+        self.runs += 1
+        self.archived += archived
+        self.last_duration = time.perf_counter() - started_at
+        return archived
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "archived": self.archived,
+            "last_duration_ms": (
+                self.last_duration * 1000 if self.last_duration is not None else None
+            ),
+        }
+
+
+car_archiver = CarArchiver(
+    sold_after_days=settings.archive_sold_after_days,
+    stale_after_days=settings.archive_stale_after_days,
+    batch_size=settings.archive_batch_size,
+    max_batches=settings.archive_max_batches,
+)
@@ -1,11 +1,23 @@
-from sqlalchemy import select, update
-from core.entites import User, BannedRefreshToken
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.postgresql import insert
+from core.entites import User, BannedRefreshToken, TokenState
 from core.InterfaceRepositories import IAuthRepository, IBannedRefreshTokenRepository
 from infrastructure.models import User as UserModel
 from infrastructure.models import BannedRefreshToken as BannedRefreshTokenModel
+from infrastructure.models.base import utc_now
+from infrastructure.repositories.mapping import EntityMapper
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from uuid import UUID
 from core.exceptions import NotFoundError
+from logger import get_logger
+from settings import get_settings
+
+settings = get_settings()
+logger = get_logger()
+
+user_mapper = EntityMapper(User, UserModel)
 
 
 class AuthRepository(IAuthRepository):
@@ -13,18 +25,7 @@ class AuthRepository(IAuthRepository):
         self.session = session
 
     def _to_user(self, user_model: UserModel) -> User:
-        return User(
-            id=user_model.id,
-            email=user_model.email,
-            password=user_model.password,
-            name=user_model.name,
-            surname=user_model.surname,
-            is_active=user_model.is_active,
-            is_superuser=user_model.is_superuser,
-            scopes=user_model.scopes,
-            created_at=user_model.created_at,
-            updated_at=user_model.updated_at,
-        )
+        return user_mapper(user_model)
 
     async def get_user(self, **filters) -> User | None:
         """ "
@@ -38,7 +39,7 @@ class AuthRepository(IAuthRepository):
                 return None
             return self._to_user(user)
         except Exception as e:
-            print(f"Error getting user: {e}")
+            logger.exception(f"Error getting user: {e}")
             return None
 
     async def create_user(self, user: User) -> User:
@@ -60,7 +61,7 @@ class AuthRepository(IAuthRepository):
             await self.session.refresh(user_model)
             return self._to_user(user_model)
         except Exception as e:
-            print(f"Error creating user: {e}")
+            logger.exception(f"Error creating user: {e}")
             return None
 
     async def update_user(self, user: User) -> User:
@@ -88,7 +89,7 @@ class AuthRepository(IAuthRepository):
         except NotFoundError:
             raise
         except Exception as e:
-            print(f"Error updating user: {e}")
+            logger.exception(f"Error updating user: {e}")
             return None
 
     async def add_scopes(self, user_id: str, scopes: List[str]) -> User:
@@ -113,7 +114,7 @@ class AuthRepository(IAuthRepository):
         except NotFoundError:
             raise
         except Exception as e:
-            print(f"Error adding scopes: {e}")
+            logger.exception(f"Error adding scopes: {e}")
             return None
 
     async def update_scopes(self, user_id: str, scopes: List[str]) -> User:
@@ -136,7 +137,7 @@ class AuthRepository(IAuthRepository):
         except NotFoundError:
             raise
         except Exception as e:
-            print(f"Error updating scopes: {e}")
+            logger.exception(f"Error updating scopes: {e}")
             return None
 
     async def remove_scopes(self, user_id: str, scopes: List[str]) -> User:
@@ -159,7 +160,7 @@ class AuthRepository(IAuthRepository):
         except NotFoundError:
             raise
         except Exception as e:
-            print(f"Error removing scopes: {e}")
+            logger.exception(f"Error removing scopes: {e}")
             return None
 
     async def get_user_scopes(self, user_id: str) -> List[str]:
@@ -177,10 +178,103 @@ class AuthRepository(IAuthRepository):
         except NotFoundError:
             raise
         except Exception as e:
-            print(f"Error getting user scopes: {e}")
+            logger.exception(f"Error getting user scopes: {e}")
             return []
 
+    async def revoke_user_tokens(self, user_id: str) -> None:
+        """
+        Revoke all access tokens of a user issued before now.
+        """
+        stmt = (
+            update(UserModel)
+            .where(UserModel.id == UUID(str(user_id)))
+            .values(tokens_revoked_at=utc_now())
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def get_token_state(
+        self, user_id: UUID, jti: Optional[str]
+    ) -> Optional[TokenState]:
+        """
+        Get the user's token revocation time and whether the jti is banned,
+        in one query by primary key and the unique jti index.
+        """
+        banned = (
+            select(BannedRefreshTokenModel.id)
+            .where(BannedRefreshTokenModel.jti == str(jti))
+            .exists()
+        )
+        stmt = select(UserModel.tokens_revoked_at, banned).where(UserModel.id == user_id)
+        row = (await self.session.execute(stmt)).first()
+        if row is None:
+            return None
+        return TokenState(tokens_revoked_at=row[0], token_banned=bool(jti) and row[1])
+
 
 class BannedRefreshTokenRepository(IBannedRefreshTokenRepository):
-    # Этот класс оставляем без изменений
-    pass
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create_banned_refresh_token(
+        self, jti: str, expires_at: Optional[datetime] = None
+    ) -> bool:
+        """
+        Ban a refresh token (or an access token revoked at logout) until it expires.
+        A single INSERT ... ON CONFLICT DO NOTHING makes concurrent refreshes
+        of the same token race-free: only one of them gets True.
+        """
+        if expires_at is None:
+            expires_at = utc_now() + timedelta(days=settings.refresh_token_expire_days)
+        elif expires_at.tzinfo is not None:
+            expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+        stmt = (
+            insert(BannedRefreshTokenModel)
+            .values(jti=str(jti), expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[BannedRefreshTokenModel.jti])
+            .returning(BannedRefreshTokenModel.id)
+        )
+        result = await self.session.execute(stmt)
+        created = result.scalar() is not None
+        await self.session.commit()
+        return created
+
+    async def is_banned_refresh_token(self, jti: str) -> bool:
+        """
+        Check if a refresh token is banned.
+        """
+        stmt = (
+            select(BannedRefreshTokenModel.id)
+            .filter_by(jti=str(jti))
+            .limit(1)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar() is not None
+
+    async def purge_expired(self, batch_size: int) -> int:
+        """
+        Delete expired banned tokens in batches.
+        SKIP LOCKED lets several workers purge concurrently without waiting on each other.
+        """
+        deleted = 0
+        while True:
+            batch = (
+                select(BannedRefreshTokenModel.id)
+                .where(BannedRefreshTokenModel.expires_at < utc_now())
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            stmt = (
+                delete(BannedRefreshTokenModel)
+                .where(BannedRefreshTokenModel.id.in_(batch))
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.execute(stmt)
+            await self.session.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
+
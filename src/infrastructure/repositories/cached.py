@@ -0,0 +1,104 @@
+from typing import Dict, List, Optional, Set
+from uuid import UUID
+
+from cache import TTLCache
+from core.entites import Brand as BrandEntity
+from core.entites import Model as ModelEntity
+from core.InterfaceRepositories import (
+    IBrandRepository,
+    IModelRepository,
+    ICatalogueCache,
+)
+from settings import get_settings
+
+settings = get_settings()
+
+
+class CatalogueCache(ICatalogueCache):
+    """Общий для процесса кэш списков брендов и моделей"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value) -> None:
+        self.cache.set(key, value)
+
+    def invalidate(self) -> None:
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+class CachedBrandRepository(IBrandRepository):
+    """Read-through кэш перед репозиторием брендов"""
+
+    def __init__(self, repository: IBrandRepository, cache: CatalogueCache):
+        self.repository = repository
+        self.cache = cache
+
+    async def get_all(self) -> List[BrandEntity]:
+        key = ("brands",)
+        brands = self.cache.get(key)
+        if brands is None:
+            brands = await self.repository.get_all()
+            self.cache.set(key, brands)
+        # Отдаём копию списка, чтобы вызывающий код не изменил закэшированный
+        return list(brands)
+
+    async def get_by_id(self, id: UUID) -> Optional[BrandEntity]:
+        return await self.repository.get_by_id(id)
+
+    async def create(self, brand: BrandEntity) -> BrandEntity:
+        return await self.repository.create(brand)
+
+    async def update(self, brand: BrandEntity) -> BrandEntity:
+        return await self.repository.update(brand)
+
+    async def patch(self, id: UUID, values: Dict) -> Optional[BrandEntity]:
+        return await self.repository.patch(id, values)
+
+    async def delete(self, id: UUID) -> bool:
+        return await self.repository.delete(id)
+
+
+class CachedModelRepository(IModelRepository):
+    """Read-through кэш перед репозиторием моделей"""
+
+    def __init__(self, repository: IModelRepository, cache: CatalogueCache):
+        self.repository = repository
+        self.cache = cache
+
+    async def get_all(self, brand_id: Optional[UUID] = None) -> List[ModelEntity]:
+        key = ("models", brand_id)
+        models = self.cache.get(key)
+        if models is None:
+            models = await self.repository.get_all(brand_id=brand_id)
+            self.cache.set(key, models)
+        return list(models)
+
+    async def get_by_id(self, id: UUID) -> Optional[ModelEntity]:
+        return await self.repository.get_by_id(id)
+
+    async def get_existing_ids(self, ids: Set[UUID]) -> Set[UUID]:
+        return await self.repository.get_existing_ids(ids)
+
+    async def create(self, model: ModelEntity) -> ModelEntity:
+        return await self.repository.create(model)
+
+    async def update(self, model: ModelEntity) -> ModelEntity:
+        return await self.repository.update(model)
+
+    async def patch(self, id: UUID, values: Dict) -> Optional[ModelEntity]:
+        return await self.repository.patch(id, values)
+
+    async def delete(self, id: UUID) -> bool:
+        return await self.repository.delete(id)
+
+
+catalogue_cache = CatalogueCache(
+    max_size=settings.catalogue_cache_max_size, ttl=settings.catalogue_cache_ttl
+)
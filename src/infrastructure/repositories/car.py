@@ -1,19 +1,61 @@
-from typing import List, Optional
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
 from uuid import UUID
-from sqlalchemy import select, delete, and_
+from sqlalchemy import select, delete, update, insert, and_, tuple_, func, desc, bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
 from core.entites import Car as CarEntity
 from core.entites import Brand as BrandEntity
 from core.entites import Model as ModelEntity
-from infrastructure.models import Car, Brand, Model
+from core.entites import CarCount, CarSearchQuery, CarSearchResult
+from infrastructure.models import ArchivedCar, Car, Brand, Model
+from infrastructure.models.car import SEARCH_CONFIG
+from infrastructure.models.base import utc_now
 from core.InterfaceRepositories.ICar import (
     ICarRepository,
     IBrandRepository,
     IModelRepository,
 )
-from core.exceptions import NotFoundError
+from core.exceptions import NotFoundError, DuplicateEntryError
+from cache import TTLCache
+from settings import get_settings
+from infrastructure.repositories.mapping import EntityMapper
+
+settings = get_settings()
+
+# SQLSTATE нарушения уникальности в Postgres
+UNIQUE_VIOLATION = "23505"
+
+# Оценки количества автомобилей для широких фильтров списка
+car_count_cache = TTLCache(
+    max_size=settings.count_cache_max_size, ttl=settings.count_cache_ttl
+)
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) для произвольного SELECT с обычными параметрами"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+brand_mapper = EntityMapper(BrandEntity, Brand)
+model_mapper = EntityMapper(ModelEntity, Model)
+car_mapper = EntityMapper(CarEntity, Car)
+archived_car_mapper = EntityMapper(CarEntity, ArchivedCar)
 
 
 class BrandRepository(IBrandRepository):
@@ -21,14 +63,7 @@ class BrandRepository(IBrandRepository):
         self.session = session
 
     def _to_entity(self, model: Brand) -> BrandEntity:
-        return BrandEntity(
-            id=model.id,
-            name=model.name,
-            country=model.country,
-            logo_url=model.logo_url,
-            created_at=model.created_at,
-            updated_at=model.updated_at,
-        )
+        return brand_mapper(model)
 
     async def get_all(self) -> List[BrandEntity]:
         stmt = select(Brand).order_by(Brand.name)
@@ -67,6 +102,25 @@ class BrandRepository(IBrandRepository):
         await self.session.refresh(db_brand)
         return self._to_entity(db_brand)
 
+    async def patch(self, id: UUID, values: Dict) -> Optional[BrandEntity]:
+        stmt = (
+            update(Brand)
+            .where(Brand.id == id)
+            .values(**values, updated_at=utc_now())
+            .returning(Brand)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            result = await self.session.execute(stmt)
+            db_brand = result.scalars().first()
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            raise DuplicateEntryError(f"Бренд с названием {values.get('name')} уже существует")
+        if not db_brand:
+            return None
+        return self._to_entity(db_brand)
+
     async def delete(self, id: UUID) -> bool:
         stmt = delete(Brand).where(Brand.id == id)
         result = await self.session.execute(stmt)
@@ -79,15 +133,7 @@ class ModelRepository(IModelRepository):
         self.session = session
 
     def _to_entity(self, model: Model) -> ModelEntity:
-        return ModelEntity(
-            id=model.id,
-            name=model.name,
-            brand_id=model.brand_id,
-            year_from=model.year_from,
-            year_to=model.year_to,
-            created_at=model.created_at,
-            updated_at=model.updated_at,
-        )
+        return model_mapper(model)
 
     async def get_all(self, brand_id: Optional[UUID] = None) -> List[ModelEntity]:
         query = select(Model)
@@ -106,6 +152,13 @@ class ModelRepository(IModelRepository):
             return None
         return self._to_entity(model)
 
+    async def get_existing_ids(self, ids: Set[UUID]) -> Set[UUID]:
+        if not ids:
+            return set()
+        stmt = select(Model.id).where(Model.id.in_(ids))
+        result = await self.session.execute(stmt)
+        return set(result.scalars().all())
+
     async def create(self, model: ModelEntity) -> ModelEntity:
         db_model = Model(
             name=model.name,
@@ -114,7 +167,12 @@ class ModelRepository(IModelRepository):
             year_to=model.year_to,
         )
         self.session.add(db_model)
-        await self.session.commit()
+        try:
+            await self.session.commit()
+        except IntegrityError:
+            # Бренд проверен сервисом, остаётся уникальность названия у бренда
+            await self.session.rollback()
+            raise DuplicateEntryError(f"Модель {model.name} у этого бренда уже существует")
         await self.session.refresh(db_model)
         return self._to_entity(db_model)
 
@@ -134,6 +192,31 @@ class ModelRepository(IModelRepository):
         await self.session.refresh(db_model)
         return self._to_entity(db_model)
 
+    async def patch(self, id: UUID, values: Dict) -> Optional[ModelEntity]:
+        stmt = (
+            update(Model)
+            .where(Model.id == id)
+            .values(**values, updated_at=utc_now())
+            .returning(Model)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            result = await self.session.execute(stmt)
+            db_model = result.scalars().first()
+            await self.session.commit()
+        except IntegrityError as e:
+            # UPDATE может нарушить внешний ключ на бренд или уникальность
+            # названия модели у бренда
+            await self.session.rollback()
+            if getattr(e.orig, "sqlstate", None) == UNIQUE_VIOLATION:
+                raise DuplicateEntryError(
+                    f"Модель {values.get('name')} у этого бренда уже существует"
+                )
+            raise NotFoundError(f"Бренд с ID {values.get('brand_id')} не найден")
+        if not db_model:
+            return None
+        return self._to_entity(db_model)
+
     async def delete(self, id: UUID) -> bool:
         stmt = delete(Model).where(Model.id == id)
         result = await self.session.execute(stmt)
@@ -148,64 +231,24 @@ class CarRepository(ICarRepository):
     def _to_entity(
         self, car: Car, model: Optional[Model] = None, brand: Optional[Brand] = None
     ) -> CarEntity:
-        car_entity = CarEntity(
-            id=car.id,
-            model_id=car.model_id,
-            year=car.year,
-            price=car.price,
-            mileage=car.mileage,
-            condition=car.condition,
-            fuel_type=car.fuel_type,
-            transmission=car.transmission,
-            drive_type=car.drive_type,
-            seller_id=car.seller_id,
-            color=car.color,
-            engine_volume=car.engine_volume,
-            power=car.power,
-            description=car.description,
-            vin=car.vin,
-            is_sold=car.is_sold,
-            photos=car.photos,
-            created_at=car.created_at,
-            updated_at=car.updated_at,
-        )
-
+        car_entity = car_mapper(car)
         # Если предоставлены модель и бренд, добавляем их в сущность
         if model:
-            model_entity = ModelEntity(
-                id=model.id,
-                name=model.name,
-                brand_id=model.brand_id,
-                year_from=model.year_from,
-                year_to=model.year_to,
-                created_at=model.created_at,
-                updated_at=model.updated_at,
-            )
-            car_entity.model = model_entity
-
+            car_entity.model = model_mapper(model)
         if brand:
-            brand_entity = BrandEntity(
-                id=brand.id,
-                name=brand.name,
-                country=brand.country,
-                logo_url=brand.logo_url,
-                created_at=brand.created_at,
-                updated_at=brand.updated_at,
-            )
-            car_entity.brand = brand_entity
-
+            car_entity.brand = brand_mapper(brand)
         return car_entity
 
-    async def get_all(
+    def _list_query(
         self,
         model_id: Optional[UUID] = None,
         brand_id: Optional[UUID] = None,
         condition: Optional[str] = None,
         seller_id: Optional[UUID] = None,
-        limit: int = 100,
-        offset: int = 0,
         include_brand_model: bool = False,
-    ) -> List[CarEntity]:
+        after: Optional[Tuple[datetime, UUID]] = None,
+    ):
+        """Запрос списка автомобилей с фильтрами, от новых к старым"""
         # Базовый запрос
         if include_brand_model:
             # Если нужно включить модель и бренд, используем joinedload
@@ -230,28 +273,223 @@ class CarRepository(ICarRepository):
         if seller_id:
             filters.append(Car.seller_id == seller_id)
 
+        if after:
+            # Keyset-пагинация: продолжаем строго после последней выданной строки,
+            # сравнение кортежей использует индекс (created_at, id)
+            filters.append(tuple_(Car.created_at, Car.id) < tuple_(*after))
+
         if filters:
             query = query.where(and_(*filters))
 
+        return query.order_by(Car.created_at.desc(), Car.id.desc())
+
+    def _to_entities(self, cars: Sequence[Car], include_brand_model: bool) -> List[CarEntity]:
+        if not include_brand_model:
+            return [self._to_entity(car) for car in cars]
+        # Если загружаем с моделью и брендом, результат содержит все связанные объекты
+        entities = []
+        for car_obj in cars:
+            model_obj = car_obj.model
+            brand_obj = model_obj.brand if model_obj else None
+            entities.append(self._to_entity(car_obj, model_obj, brand_obj))
+        return entities
+
+    async def get_all(
+        self,
+        model_id: Optional[UUID] = None,
+        brand_id: Optional[UUID] = None,
+        condition: Optional[str] = None,
+        seller_id: Optional[UUID] = None,
+        limit: int = 100,
+        offset: int = 0,
+        include_brand_model: bool = False,
+        after: Optional[Tuple[datetime, UUID]] = None,
+    ) -> List[CarEntity]:
+        query = self._list_query(
+            model_id=model_id,
+            brand_id=brand_id,
+            condition=condition,
+            seller_id=seller_id,
+            include_brand_model=include_brand_model,
+            after=after,
+        )
+
         # Применяем пагинацию
-        query = query.limit(limit).offset(offset).order_by(Car.created_at.desc())
+        query = query.limit(limit)
+        if not after:
+            query = query.offset(offset)
 
         result = await self.session.execute(query)
-
-        cars = []
         if include_brand_model:
-            # Если загружаем с моделью и брендом, результат будет содержать все связанные объекты
-            for car_obj in result.unique().scalars().all():
-                model_obj = car_obj.model
-                brand_obj = model_obj.brand if model_obj else None
-                cars.append(self._to_entity(car_obj, model_obj, brand_obj))
+            cars = result.unique().scalars().all()
         else:
-            cars = [self._to_entity(car) for car in result.scalars().all()]
+            cars = result.scalars().all()
+        return self._to_entities(cars, include_brand_model)
 
-        return cars
+    async def _estimate_rows(self, query) -> int:
+        """Оценка числа строк запроса планировщиком по статистике таблиц, без выполнения"""
+        plan = (await self.session.execute(Explain(query))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def count(
+        self,
+        model_id: Optional[UUID] = None,
+        brand_id: Optional[UUID] = None,
+        condition: Optional[str] = None,
+        seller_id: Optional[UUID] = None,
+    ) -> CarCount:
+        key = (model_id, brand_id, condition, seller_id)
+        # В кэше хранятся только оценки широких фильтров: точные количества
+        # считаются заново, чтобы флаг exact оставался честным
+        cached = car_count_cache.get(key)
+        if cached is not None:
+            return cached
+
+        query = self._list_query(
+            model_id=model_id, brand_id=brand_id, condition=condition, seller_id=seller_id
+        ).order_by(None)
+        estimate = await self._estimate_rows(query)
+        if estimate <= settings.count_exact_threshold:
+            stmt = select(func.count()).select_from(query.subquery())
+            total = (await self.session.execute(stmt)).scalar_one()
+            return CarCount(total=total, exact=True)
+
+        count = CarCount(total=estimate, exact=False)
+        car_count_cache.set(key, count)
+        return count
+
+    async def stream_all(
+        self,
+        model_id: Optional[UUID] = None,
+        brand_id: Optional[UUID] = None,
+        condition: Optional[str] = None,
+        seller_id: Optional[UUID] = None,
+        include_brand_model: bool = False,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[CarEntity]]:
+        query = self._list_query(
+            model_id=model_id,
+            brand_id=brand_id,
+            condition=condition,
+            seller_id=seller_id,
+            include_brand_model=include_brand_model,
+        ).execution_options(yield_per=batch_size)
+
+        # Серверный курсор asyncpg: строки приходят пачками по batch_size, и в памяти
+        # одновременно находится только текущая пачка. Модель и бренд загружаются
+        # через joinedload по связи многие-к-одному, поэтому unique() не нужен
+        result = await self.session.stream(query)
+        async for partition in result.scalars().partitions():
+            yield self._to_entities(partition, include_brand_model)
+            # Сессия хранит слабые ссылки на неизменённые объекты, но явная
+            # очистка не даёт identity map расти вместе с выгрузкой
+            self.session.expunge_all()
+
+    def _search_filters(self, query: CarSearchQuery) -> list:
+        filters = []
+        if query.text:
+            filters.append(
+                Car.search_vector.op("@@")(
+                    func.websearch_to_tsquery(SEARCH_CONFIG, query.text)
+                )
+            )
+        for column, value in (
+            (Car.model_id, query.model_id),
+            (Model.brand_id, query.brand_id),
+            (Car.condition, query.condition),
+            (Car.fuel_type, query.fuel_type),
+            (Car.transmission, query.transmission),
+            (Car.drive_type, query.drive_type),
+            (Car.color, query.color),
+            (Car.is_sold, query.is_sold),
+        ):
+            if value is not None:
+                filters.append(column == value)
+        # Диапазонные фильтры по числовым колонкам
+        for column, low, high in (
+            (Car.price, query.price_min, query.price_max),
+            (Car.year, query.year_min, query.year_max),
+            (Car.mileage, query.mileage_min, query.mileage_max),
+            (Car.engine_volume, query.engine_volume_min, query.engine_volume_max),
+            (Car.power, query.power_min, query.power_max),
+        ):
+            if low is not None:
+                filters.append(column >= low)
+            if high is not None:
+                filters.append(column <= high)
+        return filters
+
+    async def search(self, query: CarSearchQuery) -> CarSearchResult:
+        filters = self._search_filters(query)
+
+        # Страница результатов: по релевантности, если есть текст, иначе по новизне
+        items_query = (
+            select(Car)
+            .join(Model, Car.model_id == Model.id)
+            .options(joinedload(Car.model).joinedload(Model.brand))
+            .where(*filters)
+        )
+        if query.text:
+            rank = func.ts_rank_cd(
+                Car.search_vector, func.websearch_to_tsquery(SEARCH_CONFIG, query.text)
+            )
+            items_query = items_query.order_by(desc(rank))
+        items_query = (
+            items_query.order_by(Car.created_at.desc(), Car.id.desc())
+            .limit(query.limit)
+            .offset(query.offset)
+        )
+        result = await self.session.execute(items_query)
+        items = self._to_entities(result.unique().scalars().all(), include_brand_model=True)
+
+        # Фасеты по всем полям одним запросом через GROUPING SETS
+        facet_columns = {
+            "brand_id": Model.brand_id,
+            "condition": Car.condition,
+            "fuel_type": Car.fuel_type,
+            "transmission": Car.transmission,
+            "drive_type": Car.drive_type,
+            "color": Car.color,
+            "year": Car.year,
+        }
+        columns = list(facet_columns.values())
+        facets_query = (
+            select(
+                *columns,
+                *[func.grouping(column) for column in columns],
+                func.count(),
+            )
+            .select_from(Car)
+            .join(Model, Car.model_id == Model.id)
+            .where(*filters)
+            .group_by(func.grouping_sets(*[tuple_(column) for column in columns]))
+        )
+        result = await self.session.execute(facets_query)
+
+        facets = {name: {} for name in facet_columns}
+        names = list(facet_columns)
+        for row in result.all():
+            values = row[: len(columns)]
+            groupings = row[len(columns) : 2 * len(columns)]
+            count = row[-1]
+            for name, value, grouping in zip(names, values, groupings):
+                # grouping() = 0 для колонки, по которой сгруппирована строка
+                if grouping == 0:
+                    if value is None:
+                        key = "null"
+                    else:
+                        key = str(value.value if hasattr(value, "value") else value)
+                    facets[name][key] = count
+                    break
+
+        # condition обязателен, поэтому сумма его фасета равна общему количеству
+        total = sum(facets["condition"].values())
+        return CarSearchResult(items=items, total=total, facets=facets)
 
     async def get_by_id(
-        self, id: UUID, include_brand_model: bool = False
+        self, id: UUID, include_brand_model: bool = False, include_archived: bool = True
     ) -> Optional[CarEntity]:
         if include_brand_model:
             query = (
@@ -266,20 +504,81 @@ class CarRepository(ICarRepository):
 
         if include_brand_model:
             car_obj = result.unique().scalars().first()
-            if not car_obj:
-                return None
-
-            model_obj = car_obj.model
-            brand_obj = model_obj.brand if model_obj else None
-            return self._to_entity(car_obj, model_obj, brand_obj)
+            if car_obj:
+                model_obj = car_obj.model
+                brand_obj = model_obj.brand if model_obj else None
+                return self._to_entity(car_obj, model_obj, brand_obj)
         else:
             car = result.scalars().first()
-            if not car:
-                return None
-            return self._to_entity(car)
+            if car:
+                return self._to_entity(car)
 
-    async def create(self, car: CarEntity) -> CarEntity:
-        db_car = Car(
+        if include_archived:
+            return await self._get_archived(id, include_brand_model)
+        return None
+
+    async def _get_archived(
+        self, id: UUID, include_brand_model: bool
+    ) -> Optional[CarEntity]:
+        """Объявление из архива; модель и бренд могли быть удалены после переноса"""
+        if not include_brand_model:
+            result = await self.session.execute(
+                select(ArchivedCar).where(ArchivedCar.id == id)
+            )
+            archived = result.scalars().first()
+            return archived_car_mapper(archived) if archived else None
+
+        query = (
+            select(ArchivedCar, Model, Brand)
+            .outerjoin(Model, ArchivedCar.model_id == Model.id)
+            .outerjoin(Brand, Model.brand_id == Brand.id)
+            .where(ArchivedCar.id == id)
+        )
+        row = (await self.session.execute(query)).first()
+        if not row:
+            return None
+        archived, model_obj, brand_obj = row
+        car_entity = archived_car_mapper(archived)
+        if model_obj:
+            car_entity.model = model_mapper(model_obj)
+        if brand_obj:
+            car_entity.brand = brand_mapper(brand_obj)
+        return car_entity
+
+    async def get_versions(self, id: UUID) -> List[Tuple[UUID, datetime]]:
+        for table in (Car, ArchivedCar):
+            query = (
+                select(
+                    table.id,
+                    table.updated_at,
+                    Model.id,
+                    Model.updated_at,
+                    Brand.id,
+                    Brand.updated_at,
+                    *([ArchivedCar.archived_at] if table is ArchivedCar else []),
+                )
+                .outerjoin(Model, table.model_id == Model.id)
+                .outerjoin(Brand, Model.brand_id == Brand.id)
+                .where(table.id == id)
+            )
+            row = (await self.session.execute(query)).first()
+            if row:
+                # Пары в том же порядке, что и у загруженного объявления: автомобиль,
+                # время переноса в архив, модель, бренд; удалённые после архивации
+                # модель и бренд пропускаются
+                versions = [(row[0], row[1])]
+                if table is ArchivedCar:
+                    versions.append((row[0], row[6]))
+                versions += [
+                    (row[index], row[index + 1])
+                    for index in (2, 4)
+                    if row[index] is not None
+                ]
+                return versions
+        return []
+
+    def _to_values(self, car: CarEntity) -> dict:
+        return dict(
             model_id=car.model_id,
             year=car.year,
             price=car.price,
@@ -296,7 +595,11 @@ class CarRepository(ICarRepository):
             vin=car.vin,
             is_sold=car.is_sold,
             photos=car.photos,
+            thumbnails=car.thumbnails,
         )
+
+    async def create(self, car: CarEntity) -> CarEntity:
+        db_car = Car(**self._to_values(car))
         self.session.add(db_car)
         await self.session.commit()
         await self.session.refresh(db_car)
@@ -326,13 +629,122 @@ class CarRepository(ICarRepository):
         db_car.vin = car.vin
         db_car.is_sold = car.is_sold
         db_car.photos = car.photos
+        db_car.thumbnails = car.thumbnails
 
         await self.session.commit()
         await self.session.refresh(db_car)
         return self._to_entity(db_car)
 
-    async def delete(self, id: UUID) -> bool:
-        stmt = delete(Car).where(Car.id == id)
+    async def patch(
+        self, id: UUID, values: Dict, seller_id: Optional[UUID] = None
+    ) -> Optional[CarEntity]:
+        stmt = update(Car).where(Car.id == id)
+        if seller_id:
+            stmt = stmt.where(Car.seller_id == seller_id)
+        stmt = (
+            stmt.values(**values, updated_at=utc_now())
+            .returning(Car)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            result = await self.session.execute(stmt)
+            db_car = result.scalars().first()
+            await self.session.commit()
+        except IntegrityError:
+            # Нарушение внешнего ключа: указана несуществующая модель или продавец
+            await self.session.rollback()
+            if "model_id" in values:
+                raise NotFoundError(f"Модель с ID {values['model_id']} не найдена")
+            raise NotFoundError(f"Пользователь с ID {values.get('seller_id')} не найден")
+        if not db_car:
+            return None
+        return self._to_entity(db_car)
+
+    async def add_photos(
+        self, id: UUID, photos: List[str], thumbnails: List[str]
+    ) -> bool:
+        # Дописываем на стороне базы, чтобы параллельные загрузки не затирали друг друга
+        stmt = (
+            update(Car)
+            .where(Car.id == id)
+            .values(
+                photos=Car.photos.concat(photos),
+                thumbnails=Car.thumbnails.concat(thumbnails),
+                updated_at=utc_now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
         result = await self.session.execute(stmt)
         await self.session.commit()
         return result.rowcount > 0
+
+    async def get_many(self, ids: List[UUID]) -> List[CarEntity]:
+        if not ids:
+            return []
+        result = await self.session.execute(select(Car).where(Car.id.in_(set(ids))))
+        cars = {car.id: self._to_entity(car) for car in result.scalars().all()}
+        return [cars[id] for id in ids if id in cars]
+
+    async def create_many(self, cars: List[CarEntity]) -> List[CarEntity]:
+        if not cars:
+            return []
+        # Многострочный INSERT ... RETURNING, строки возвращаются в порядке входного списка
+        stmt = insert(Car).returning(Car, sort_by_parameter_order=True)
+        result = await self.session.scalars(
+            stmt, [self._to_values(car) for car in cars]
+        )
+        created = [self._to_entity(car) for car in result.all()]
+        await self.session.commit()
+        return created
+
+    async def update_many(
+        self, changes: List[Tuple[UUID, Dict]], seller_id: Optional[UUID] = None
+    ) -> List[CarEntity]:
+        if not changes:
+            return []
+        now = utc_now()
+        ids = list(dict.fromkeys(id for id, _ in changes))
+        table = Car.__table__
+        # Строки блокируются до конца транзакции: найденное здесь объявление
+        # нельзя удалить, перенести в архив или передать другому продавцу до
+        # фиксации, поэтому обновляются и возвращаются ровно найденные строки
+        stmt = select(table.c.id).where(table.c.id.in_(ids)).with_for_update()
+        if seller_id:
+            stmt = stmt.where(table.c.seller_id == seller_id)
+        locked = set((await self.session.execute(stmt)).scalars().all())
+
+        # Пакетный UPDATE по первичному ключу (executemany) в одной транзакции,
+        # по одному выражению на каждый набор изменяемых полей. Выражение по
+        # таблице, а не ORM bulk UPDATE: тот при единственной строке в наборе
+        # сверяет число обновлённых строк, и исчезнувшее объявление прерывало
+        # бы весь пакет StaleDataError
+        groups = defaultdict(list)
+        for id, values in changes:
+            if id in locked:
+                groups[tuple(sorted(values))].append(
+                    {**values, "updated_at": now, "car_id": id}
+                )
+        for params in groups.values():
+            await self.session.execute(
+                update(table).where(table.c.id == bindparam("car_id")), params
+            )
+
+        # Состояние читается до фиксации, пока строки заблокированы; объекты,
+        # уже загруженные в сессию, перечитываются
+        result = await self.session.execute(
+            select(Car)
+            .where(Car.id.in_(locked))
+            .execution_options(populate_existing=True)
+        )
+        cars = {car.id: self._to_entity(car) for car in result.scalars().all()}
+        await self.session.commit()
+        return [cars[id] for id in ids if id in cars]
+
+    async def delete(self, id: UUID) -> bool:
+        result = await self.session.execute(delete(Car).where(Car.id == id))
+        if result.rowcount > 0:
+            await self.session.commit()
+            return True
+        result = await self.session.execute(delete(ArchivedCar).where(ArchivedCar.id == id))
+        await self.session.commit()
+        return result.rowcount > 0
@@ -0,0 +1,34 @@
+from dataclasses import fields
+from operator import attrgetter
+from typing import Generic, Type, TypeVar
+
+from sqlalchemy import inspect
+
+Entity = TypeVar("Entity")
+
+
+class EntityMapper(Generic[Entity]):
+    """
+    Преобразование ORM-объекта в сущность по совпадающим именам колонок и полей.
+
+    Список полей вычисляется один раз при создании, значения читаются одним
+    attrgetter и передаются в конструктор позиционно, без промежуточного словаря
+    и именованных аргументов. Поэтому поля сущности, которым соответствуют
+    колонки, должны идти первыми; остальные поля (например, связанные модель и
+    бренд) получают значения по умолчанию
+    """
+
+    def __init__(self, entity_class: Type[Entity], orm_class: type):
+        columns = set(inspect(orm_class).column_attrs.keys())
+        entity_fields = tuple(item.name for item in fields(entity_class))
+        self.entity_class = entity_class
+        self.names = tuple(name for name in entity_fields if name in columns)
+        if self.names != entity_fields[: len(self.names)]:
+            raise TypeError(
+                f"Поля {entity_class.__name__} с колонками {orm_class.__name__} "
+                "должны идти перед остальными полями"
+            )
+        self._values = attrgetter(*self.names)
+
+    def __call__(self, row) -> Entity:
+        return self.entity_class(*self._values(row))
@@ -0,0 +1,112 @@
+import time
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.entites import CarMarketStats
+from core.InterfaceRepositories import ICarStatsRepository
+from infrastructure.models import car_market_stats
+from settings import get_settings
+
+settings = get_settings()
+
+# Ключ advisory-блокировки: обновлять представление одновременно может только один процесс
+REFRESH_LOCK_KEY = 0x6361725F73746174
+
+# Забирает отметки об изменениях, которые добавляют триггеры на cars и models
+CLAIM_CHANGES_QUERY = text(
+    "WITH claimed AS (DELETE FROM market_stats_changes RETURNING 1) "
+    "SELECT count(*) FROM claimed"
+)
+
+STAT_COLUMNS = [
+    column for column in car_market_stats.c if column.name != "group_id"
+]
+
+
+class CarStatsRepository(ICarStatsRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_market_stats(
+        self,
+        brand_id: Optional[UUID] = None,
+        model_id: Optional[UUID] = None,
+        year: Optional[int] = None,
+    ) -> List[CarMarketStats]:
+        # Строки бренда и модели различаются group_id, поэтому оба запроса
+        # идут по уникальному индексу (group_id, year)
+        stmt = (
+            select(*STAT_COLUMNS)
+            .where(car_market_stats.c.group_id == (model_id or brand_id))
+            .order_by(car_market_stats.c.year)
+        )
+        if year is not None:
+            stmt = stmt.where(car_market_stats.c.year == year)
+        result = await self.session.execute(stmt)
+        return [CarMarketStats(**row) for row in result.mappings()]
+
+
+class MarketStatsRefresher:
+    """
+    Обновляет представление car_market_stats после изменений объявлений.
+
+    Триггеры на cars и models добавляют отметку в market_stats_changes в той же
+    транзакции, что и запись, поэтому фоновая задача видит изменения из любого
+    процесса сервера и загрузки CSV. Задача забирает отметки и в той же
+    транзакции обновляет представление (REFRESH ... CONCURRENTLY не блокирует
+    чтение); если обновление не удалось, отметки остаются. Без изменений
+    представление обновляется раз в max_age секунд
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self.refreshed_at = time.monotonic()
+        self.refreshes = 0
+        self.last_changes = 0
+        self.last_duration: Optional[float] = None
+
+    async def refresh(self, session: AsyncSession) -> bool:
+        acquired = (
+            await session.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+            )
+        ).scalar()
+        if not acquired:
+            # Представление уже обновляет другой процесс; повторим на следующем шаге
+            await session.rollback()
+            return False
+
+        # Отметки удаляются до REFRESH, и его снимок видит все изменения, отметки
+        # которых удалены. Отметки транзакций, зафиксированных позже, дождутся
+        # следующего шага
+        changes = (await session.execute(CLAIM_CHANGES_QUERY)).scalar()
+        if not changes and time.monotonic() - self.refreshed_at < self.max_age:
+            await session.rollback()
+            return False
+
+        started_at = time.perf_counter()
+        await session.execute(
+            text("REFRESH MATERIALIZED VIEW CONCURRENTLY car_market_stats")
+        )
+        await session.commit()
+        self.last_duration = time.perf_counter() - started_at
+        self.refreshed_at = time.monotonic()
+        self.refreshes += 1
+        self.last_changes = changes
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "refreshes": self.refreshes,
+            "last_changes": self.last_changes,
+            "seconds_since_refresh": time.monotonic() - self.refreshed_at,
+            "last_duration_ms": (
+                self.last_duration * 1000 if self.last_duration is not None else None
+            ),
+        }
+
+
+market_stats_refresher = MarketStatsRefresher(max_age=settings.market_stats_max_age)
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import shutil
+from typing import BinaryIO, Optional
+
+import boto3
+
+from core.InterfaceRepositories import IObjectStorage
+from settings import get_settings
+
+config = get_settings()
+
+
+class LocalStorage(IObjectStorage):
+    """Файлы на локальном диске; приложение раздаёт их по base_url"""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"Недопустимый ключ файла: {key}")
+        return path
+
+    def _write(self, path: str, file: BinaryIO) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as target:
+            shutil.copyfileobj(file, target)
+
+    async def save(self, key: str, file: BinaryIO, content_type: str) -> str:
+        await asyncio.to_thread(self._write, self._path(key), file)
+        return self.url(key)
+
+    def _read(self, path: str) -> bytes:
+        with open(path, "rb") as source:
+            return source.read()
+
+    async def load(self, key: str) -> bytes:
+        return await asyncio.to_thread(self._read, self._path(key))
+
+    async def delete(self, key: str) -> None:
+        try:
+            await asyncio.to_thread(os.remove, self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class S3Storage(IObjectStorage):
+    """
+    S3-совместимое хранилище. upload_fileobj отправляет файл частями
+    (multipart upload для больших файлов), не загружая его в память целиком;
+    блокирующий клиент boto3 работает в пуле потоков
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        public_url: Optional[str] = None,
+    ):
+        self.bucket = bucket
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+        )
+        if public_url:
+            self.public_url = public_url.rstrip("/")
+        elif endpoint_url:
+            self.public_url = f"{endpoint_url.rstrip('/')}/{bucket}"
+        else:
+            self.public_url = f"https://{bucket}.s3.amazonaws.com"
+
+    async def save(self, key: str, file: BinaryIO, content_type: str) -> str:
+        await asyncio.to_thread(
+            self.client.upload_fileobj,
+            file,
+            self.bucket,
+            key,
+            ExtraArgs={"ContentType": content_type},
+        )
+        return self.url(key)
+
+    async def load(self, key: str) -> bytes:
+        def read() -> bytes:
+            return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+        return await asyncio.to_thread(read)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+
+storage: Optional[IObjectStorage] = None
+
+
+def get_storage() -> IObjectStorage:
+    global storage
+    if storage is None:
+        if config.storage_backend == "s3":
+            storage = S3Storage(
+                bucket=config.s3_bucket,
+                endpoint_url=config.s3_endpoint_url,
+                region=config.s3_region,
+                access_key=config.s3_access_key,
+                secret_key=config.s3_secret_key,
+                public_url=config.s3_public_url,
+            )
+        elif config.storage_backend == "local":
+            storage = LocalStorage(config.local_storage_path, config.local_storage_url)
+        else:
+            raise ValueError(f"Неизвестное хранилище файлов: {config.storage_backend}")
+    return storage
@@ -1,18 +1,29 @@
 import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+from uuid import UUID
 from fastapi import Depends, HTTPException, Request
 import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from infrastructure.postgres_db import database
-from core.services import AuthService, CarService
+from core.entites import TokenState
+from core.services import AuthService, CarService, PhotoService
+from core.services.revocation import revocation_registry
 from infrastructure.repositories import (
     AuthRepository,
     BannedRefreshTokenRepository,
     BrandRepository,
     ModelRepository,
     CarRepository,
+    CachedBrandRepository,
+    CachedModelRepository,
+    CarStatsRepository,
+    catalogue_cache,
 )
+from infrastructure.images import get_image_processor
+from infrastructure.storage import get_storage
 from settings import get_settings
 
 
@@ -23,17 +34,73 @@ async def get_auth_service(session: AsyncSession = Depends(database.get_db_sessi
     yield service
 
 
-async def get_car_service(session: AsyncSession = Depends(database.get_db_session)):
+async def get_routed_session(request: Request):
+    """
+    Сессия для запроса: GET/HEAD читают с реплики (если она есть и не отстаёт),
+    остальные методы работают с основной базой
+    """
+    read_only = request.method in ("GET", "HEAD")
+    async with database.session(read_only=read_only) as session:
+        yield session
+
+
+def build_car_service(session: AsyncSession) -> CarService:
     car_repository = CarRepository(session)
-    brand_repository = BrandRepository(session)
-    model_repository = ModelRepository(session)
-    service = CarService(car_repository, brand_repository, model_repository)
-    yield service
+    brand_repository = CachedBrandRepository(BrandRepository(session), catalogue_cache)
+    model_repository = CachedModelRepository(ModelRepository(session), catalogue_cache)
+    return CarService(
+        car_repository,
+        brand_repository,
+        model_repository,
+        catalogue_cache,
+        stats_repository=CarStatsRepository(session),
+    )
+
+
+async def get_car_service(session: AsyncSession = Depends(get_routed_session)):
+    yield build_car_service(session)
+
+
+@asynccontextmanager
+async def car_service_scope(read_only: bool = False):
+    """
+    Сервис автомобилей с собственной сессией для потоковых ответов: зависимости
+    с yield завершаются до отправки тела, поэтому их сессия к этому моменту закрыта
+    """
+    async with database.session(read_only=read_only) as session:
+        yield build_car_service(session)
+
+
+def build_photo_service(session: AsyncSession) -> PhotoService:
+    return PhotoService(
+        CarRepository(session),
+        get_storage(),
+        get_image_processor(),
+        max_size=settings.photo_max_size,
+        max_count=settings.photo_max_count,
+    )
+
+
+async def get_photo_service(session: AsyncSession = Depends(database.get_db_session)):
+    yield build_photo_service(session)
+
+
+@asynccontextmanager
+async def photo_service_scope():
+    """Сервис фотографий с собственной сессией для фоновой обработки после ответа"""
+    async with database.session() as session:
+        yield build_photo_service(session)
 
 
 settings = get_settings()
 
 
+async def load_token_state(user_id: UUID, jti: Optional[str]) -> Optional[TokenState]:
+    # Состояние отзыва читается из основной базы: реплика может отставать
+    async with database.session() as session:
+        return await AuthRepository(session).get_token_state(user_id, jti)
+
+
 class JWTBearer:
 
     async def __call__(self, request: Request):
@@ -43,13 +110,20 @@ class JWTBearer:
                 payload = jwt.decode(
                     credentials, settings.secret_key, algorithms=[settings.algorithm]
                 )
-                request.state.payload = payload
-                return payload
             except jwt.PyJWTError:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Could not validate credentials",
                 )
+            # Отзыв общий для всех процессов; база читается не чаще раза
+            # в TOKEN_REVOCATION_CHECK_TTL секунд на токен
+            if await revocation_registry.is_revoked(payload, load_token_state):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Token has been revoked",
+                )
+            request.state.payload = payload
+            return payload
         else:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="No credentials provided"
@@ -0,0 +1,84 @@
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.exceptions import (
+    NotFoundError,
+    DuplicateEntryError,
+    AlreadyExistsError,
+    InvalidCredentialsError,
+    TokenExpiredError,
+    InvalidTokenError,
+    InvalidRequestError,
+    PermissionDeniedError,
+    ServiceUnavailableError,
+)
+from logger import get_logger
+
+logger = get_logger()
+
+# HTTP-статусы доменных исключений
+EXCEPTION_STATUS_CODES = {
+    NotFoundError: 404,
+    DuplicateEntryError: 409,
+    AlreadyExistsError: 409,
+    InvalidCredentialsError: 401,
+    TokenExpiredError: 401,
+    InvalidTokenError: 401,
+    PermissionDeniedError: 403,
+    InvalidRequestError: 400,
+    ServiceUnavailableError: 503,
+}
+
+
+async def domain_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+    # Starlette выбирает обработчик по MRO, поэтому подклассы тоже попадают сюда
+    status_code = next(
+        EXCEPTION_STATUS_CODES[cls]
+        for cls in type(exc).__mro__
+        if cls in EXCEPTION_STATUS_CODES
+    )
+    return JSONResponse(status_code=status_code, content={"detail": str(exc)})
+
+
+def register_exception_handlers(app: FastAPI) -> None:
+    for exception_class in EXCEPTION_STATUS_CODES:
+        app.add_exception_handler(exception_class, domain_exception_handler)
+
+
+class UnhandledErrorMiddleware:
+    """
+    Отвечает 500 с JSON на непредвиденные исключения.
+
+    Чистый ASGI-middleware вместо BaseHTTPMiddleware: не создаёт отдельную
+    задачу и поток для каждого запроса и не буферизует потоковые ответы.
+    Регистрируется первым, то есть внутри CORS, как и прежний обработчик
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking_start(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_tracking_start)
+        except Exception as e:
+            logger.error(f"Unhandled error: {e}")
+            if response_started:
+                # Заголовки уже отправлены: ответ изменить нельзя
+                raise
+            response = JSONResponse(
+                status_code=500, content={"detail": "Internal Server Error"}
+            )
+            await response(scope, receive, send)
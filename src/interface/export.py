@@ -0,0 +1,111 @@
+import csv
+import io
+from typing import AsyncIterator, Iterable, List
+
+from core.entites import Car
+from interface.schemas.car import CarDetailResponse, CarResponse
+from interface.serialization import get_adapter
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+CSV_COLUMNS = (
+    "id",
+    "model_id",
+    "year",
+    "price",
+    "mileage",
+    "condition",
+    "fuel_type",
+    "transmission",
+    "drive_type",
+    "seller_id",
+    "color",
+    "engine_volume",
+    "power",
+    "description",
+    "vin",
+    "is_sold",
+    "photos",
+    "thumbnails",
+    "created_at",
+    "updated_at",
+)
+CSV_BRAND_MODEL_COLUMNS = ("model_name", "brand_id", "brand_name", "brand_country")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return " ".join(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return getattr(value, "value", value)
+
+
+class CsvEncoder:
+    """Кодирует пачки автомобилей в строки CSV; заголовок пишется перед первой пачкой"""
+
+    def __init__(self, include_brand_model: bool):
+        self.include_brand_model = include_brand_model
+        self.columns = CSV_COLUMNS + (
+            CSV_BRAND_MODEL_COLUMNS if include_brand_model else ()
+        )
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def header(self) -> bytes:
+        self.writer.writerow(self.columns)
+        return self._drain()
+
+    def encode(self, cars: Iterable[Car]) -> bytes:
+        for car in cars:
+            row = [_csv_value(getattr(car, column)) for column in CSV_COLUMNS]
+            if self.include_brand_model:
+                model, brand = car.model, car.brand
+                row += [
+                    model.name if model else "",
+                    brand.id if brand else "",
+                    brand.name if brand else "",
+                    (brand.country or "") if brand else "",
+                ]
+            self.writer.writerow(row)
+        return self._drain()
+
+    def _drain(self) -> bytes:
+        data = self.buffer.getvalue().encode()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+def encode_ndjson(cars: List[Car], include_brand_model: bool) -> bytes:
+    """Одна строка JSON на автомобиль в том же виде, что и в списке автомобилей"""
+    adapter = get_adapter(CarDetailResponse if include_brand_model else CarResponse)
+    return b"".join(
+        adapter.dump_json(adapter.validate_python(car, from_attributes=True)) + b"\n"
+        for car in cars
+    )
+
+
+async def export_chunks(
+    batches: AsyncIterator[List[Car]], format: str, include_brand_model: bool
+) -> AsyncIterator[bytes]:
+    """
+    Превращает поток пачек автомобилей в поток байтов NDJSON или CSV:
+    каждая пачка кодируется и отдаётся сразу, ничего не накапливая
+    """
+    if format not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Неизвестный формат выгрузки: {format}")
+
+    if format == "csv":
+        encoder = CsvEncoder(include_brand_model)
+        yield encoder.header()
+        async for cars in batches:
+            yield encoder.encode(cars)
+    else:
+        async for cars in batches:
+            yield encode_ndjson(cars, include_brand_model)
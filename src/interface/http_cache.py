@@ -0,0 +1,79 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Tuple
+from uuid import UUID
+
+from fastapi import Request, Response
+from starlette import status
+
+
+def make_etag(versions: Iterable[Tuple[UUID, datetime]]) -> str:
+    """
+    Строгий ETag по идентификаторам и времени обновления сущностей
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for id, updated_at in versions:
+        digest.update(f"{id}:{updated_at.isoformat()};".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def is_conditional(request: Request) -> bool:
+    """Есть ли в запросе заголовки, по которым может получиться ответ 304"""
+    return (
+        "if-none-match" in request.headers or "if-modified-since" in request.headers
+    )
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match имеет приоритет над If-Modified-Since (RFC 9110)
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP-дата имеет точность до секунды
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: Optional[str] = None,
+) -> Optional[Response]:
+    """
+    Выставляет заголовки валидации кэша и возвращает ответ 304, если у клиента
+    актуальная версия. Иначе возвращает None, и обработчик формирует тело как обычно
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
@@ -1,19 +1,16 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import ORJSONResponse, JSONResponse
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 
 from settings import get_settings
 from logger import get_logger
-from core.exceptions import (
-    NotFoundError,
-    DuplicateEntryError,
-    AlreadyExistsError,
-    InvalidCredentialsError,
-    TokenExpiredError,
-    InvalidTokenError,
-    InvalidRequestError,
-)
+from infrastructure.background import start_background_tasks, stop_background_tasks
+from infrastructure.images import get_image_processor
+from infrastructure.postgres_db import database
+from interface.errors import UnhandledErrorMiddleware, register_exception_handlers
+from interface.middleware import QueryStatsMiddleware, RequestIdMiddleware
 from interface.routers import router
 
 config = get_settings()
@@ -24,7 +21,13 @@ logger = get_logger()
 async def lifespan(app: FastAPI):
     """Инициализация настроек до запуска сервиса"""
     logger.info(app)
+    background_tasks = start_background_tasks()
     yield
+    await stop_background_tasks(background_tasks)
+    get_image_processor().shutdown()
+    # К этому моменту uvicorn дождался текущих запросов: закрываем соединения,
+    # чтобы процесс не оставлял их открытыми на стороне Postgres
+    await database.dispose()
 
 
 app = FastAPI(
@@ -39,38 +42,43 @@ app = FastAPI(
 )
 
 
-@app.middleware("http")
-async def custom_exception_middleware(request: Request, call_next):
-    try:
-        response = await call_next(request)
-        return response
-    except NotFoundError as e:
-        return JSONResponse(status_code=404, content={"detail": str(e)})
-    except DuplicateEntryError as e:
-        return JSONResponse(status_code=409, content={"detail": str(e)})
-    except AlreadyExistsError as e:
-        return JSONResponse(status_code=409, content={"detail": str(e)})
-    except InvalidCredentialsError as e:
-        return JSONResponse(status_code=401, content={"detail": str(e)})
-    except TokenExpiredError as e:
-        return JSONResponse(status_code=401, content={"detail": str(e)})
-    except InvalidTokenError as e:
-        return JSONResponse(status_code=401, content={"detail": str(e)})
-    except InvalidRequestError as e:
-        return JSONResponse(status_code=400, content={"detail": str(e)})
-    except Exception as e:
-        logger.error(f"Unhandled error: {e}")
-        return JSONResponse(
-            status_code=500, content={"detail": "Internal Server Error"}
-        )
-
+register_exception_handlers(app)
 
+# Middleware добавляются изнутри наружу: последний добавленный — внешний
+app.add_middleware(UnhandledErrorMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Next-Cursor",
+        "X-Total-Count",
+        "X-Total-Count-Exact",
+        "ETag",
+        "Last-Modified",
+        "X-DB-Query-Count",
+        "X-DB-Time-Ms",
+        "X-DB-Slowest-Ms",
+        "X-Request-ID",
+    ],
 )
+# Учитывает всю обработку запроса, включая CORS
+app.add_middleware(
+    QueryStatsMiddleware,
+    emit_headers=config.is_debug_mode,
+    slow_request_threshold=config.slow_request_threshold_ms,
+)
+# Самый внешний: идентификатор запроса есть во всех записях журнала
+app.add_middleware(RequestIdMiddleware)
 
 app.include_router(router, prefix="/api")
+
+# В режиме локального хранилища фотографии раздаёт само приложение
+if config.storage_backend == "local":
+    app.mount(
+        config.local_storage_url,
+        StaticFiles(directory=config.local_storage_path, check_dir=False),
+        name="media",
+    )
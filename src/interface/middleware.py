@@ -0,0 +1,103 @@
+import re
+import time
+from uuid import uuid4
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from infrastructure.query_stats import QueryStats, current_query_stats, normalize_sql
+from logger import get_logger, request_id
+
+logger = get_logger()
+
+# Принимаем идентификатор от прокси, только если он похож на идентификатор
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+class RequestIdMiddleware:
+    """
+    Присваивает запросу идентификатор (из заголовка X-Request-ID или новый),
+    делает его доступным журналу и возвращает в ответе
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        current = incoming if incoming and _REQUEST_ID.match(incoming) else uuid4().hex
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Request-ID", current)
+            await send(message)
+
+        token = request_id.set(current)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id.reset(token)
+
+
+class QueryStatsMiddleware:
+    """
+    Собирает статистику SQL-запросов каждого HTTP-запроса: количество, общее
+    время в базе и самый медленный запрос.
+
+    В режиме отладки статистика отдаётся в заголовках X-DB-Query-Count,
+    X-DB-Time-Ms и X-DB-Slowest-Ms. Запросы дольше slow_request_threshold
+    миллисекунд пишутся в журнал вместе с нормализованным самым медленным SQL.
+    Чистый ASGI-middleware, чтобы не добавлять задержку BaseHTTPMiddleware
+    """
+
+    def __init__(self, app: ASGIApp, emit_headers: bool, slow_request_threshold: float):
+        self.app = app
+        self.emit_headers = emit_headers
+        self.slow_request_threshold = slow_request_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        started_at = time.perf_counter()
+        status_code = None
+
+        async def send_with_stats(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.emit_headers:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-DB-Query-Count", str(stats.count))
+                    headers.append("X-DB-Time-Ms", f"{stats.total_time * 1000:.2f}")
+                    headers.append("X-DB-Slowest-Ms", f"{stats.slowest_time * 1000:.2f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_query_stats.reset(token)
+            duration = (time.perf_counter() - started_at) * 1000
+            if duration >= self.slow_request_threshold:
+                slowest = (
+                    normalize_sql(stats.slowest_statement)
+                    if stats.slowest_statement
+                    else "-"
+                )
+                logger.warning(
+                    f"Медленный запрос {scope['method']} {scope['path']} -> {status_code}: "
+                    f"{duration:.1f} мс, SQL-запросов {stats.count} "
+                    f"({stats.total_time * 1000:.1f} мс), самый медленный "
+                    f"{stats.slowest_time * 1000:.1f} мс: {slowest}"
+                )
@@ -1,10 +1,16 @@
 from interface.routers.secured import router as secured_router
 from interface.routers.public import router as public_router
+from interface.routers.metrics import router as metrics_router
 from fastapi import APIRouter
 from interface.routers.decorator import require_scopes
+from settings import get_settings
+
+settings = get_settings()
 
 router = APIRouter()
 router.include_router(secured_router)
 router.include_router(public_router)
+if settings.is_metrics_enabled:
+    router.include_router(metrics_router)
 
 __all__ = ["require_scopes", "router"]
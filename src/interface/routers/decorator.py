@@ -1,19 +1,40 @@
 import functools
 from typing import List, Callable
-from fastapi import Depends, HTTPException, Request
+from fastapi import HTTPException, Request
 from starlette import status
-from interface.dependencies import get_auth_service
-from core.services import AuthService
+from core.entites import User
 from uuid import UUID
 
 
-def require_scopes(required_scopes: List[str]) -> Callable:
+def principal_from_payload(payload: dict) -> User:
+    """
+    Собирает пользователя из claims проверенного JWT без обращения к базе данных.
+    Пароль в такой сущности не заполняется.
+    """
+    return User(
+        id=UUID(payload["sub"]),
+        email=payload.get("email", ""),
+        password="",
+        name=payload.get("name", ""),
+        surname=payload.get("surname", ""),
+        is_superuser=payload.get("is_superuser", False),
+        scopes=payload.get("scopes", []),
+    )
+
+
+def require_scopes(required_scopes: List[str], load_user: bool = False) -> Callable:
     """
     Декоратор для проверки прав доступа пользователя.
     Администраторы (is_admin=True или имеющие scope 'admin') автоматически пропускаются.
 
+    По умолчанию request.state.user собирается из claims токена, уже проверенного
+    JWTBearer. Если обработчику нужна полная запись пользователя, передайте
+    load_user=True: запись берётся через короткоживущий кэш AuthService, а сам
+    обработчик должен принимать зависимость auth_service.
+
     Args:
         required_scopes: Список необходимых прав доступа
+        load_user: Загружать полную запись пользователя вместо claims токена
 
     Returns:
         Декоратор, который проверяет наличие необходимых прав у пользователя
@@ -21,12 +42,9 @@ def require_scopes(required_scopes: List[str]) -> Callable:
 
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
-        async def wrapper(
-            request: Request,
-            auth_service: AuthService = Depends(get_auth_service),
-            *args,
-            **kwargs,
-        ):
+        async def wrapper(request: Request, *args, **kwargs):
+            # FastAPI передаёт сюда параметры исходного обработчика
+            # (functools.wraps сохраняет его сигнатуру)
             try:
                 # Получаем payload из request.state.payload
                 payload = request.state.payload
@@ -42,19 +60,15 @@ def require_scopes(required_scopes: List[str]) -> Callable:
                         detail=f"Недостаточно прав доступа. Требуются: {', '.join(required_scopes)}",
                     )
 
-                # Получение ID пользователя из payload
-                user_id = payload.get("sub")
-
-                # Получение информации о пользователе
-                user = await auth_service.get_user(user_id)
+                if load_user:
+                    auth_service = kwargs["auth_service"]
+                    user = await auth_service.get_principal(payload.get("sub"))
+                else:
+                    user = principal_from_payload(payload)
 
                 # Добавление информации о пользователе в запрос
                 request.state.user = user
 
-                return await func(
-                    request=request, auth_service=auth_service, *args, **kwargs
-                )
-
             except HTTPException as e:
                 raise e
             except Exception as e:
@@ -63,6 +77,8 @@ def require_scopes(required_scopes: List[str]) -> Callable:
                     detail="Ошибка аутентификации",
                 )
 
+            return await func(*args, request=request, **kwargs)
+
         return wrapper
 
     return decorator
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Request
+
+from core.services.auth import login_latency
+from core.services.password import get_password_hasher
+from infrastructure.postgres_db import database
+from infrastructure.query_stats import query_log
+from interface.dependencies import JWTBearer
+from interface.routers.decorator import require_scopes
+from logger import get_log_stats
+from infrastructure.repositories import (
+    car_archiver,
+    catalogue_cache,
+    car_count_cache,
+    market_stats_refresher,
+)
+
+# Метрики раскрывают адреса реплик и внутреннее состояние сервиса
+router = APIRouter(tags=["metrics"], dependencies=[Depends(JWTBearer())])
+
+
+@router.get("/metrics")
+@require_scopes(["admin"])
+async def get_metrics(request: Request):
+    """
+    Внутренние метрики сервиса: пул соединений, кэши и пул хеширования паролей.
+    Требуется право admin.
+    """
+    return {
+        "database": database.stats(),
+        "queries": query_log.stats(),
+        "logging": get_log_stats(),
+        "catalogue_cache": catalogue_cache.stats(),
+        "car_count_cache": car_count_cache.stats(),
+        "password_hasher": get_password_hasher().stats(),
+        "login": login_latency.stats(),
+        "market_stats": market_stats_refresher.stats(),
+        "archive": car_archiver.stats(),
+    }
@@ -55,8 +55,11 @@ async def logout(
     access_token = request.cookies.get("access_token")
     refresh_token = request.cookies.get("refresh_token")
     if refresh_token:
-        await auth_service.logout(refresh_token)
+        # Access-токен отзывается вместе с refresh-токеном
+        await auth_service.logout(refresh_token, access_token=access_token)
         response.delete_cookie(key="refresh_token")
+    elif access_token:
+        await auth_service.revoke_access_token(access_token)
     if access_token:
         response.delete_cookie(key="access_token")
 
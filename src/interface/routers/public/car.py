@@ -1,14 +1,30 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 from uuid import UUID
 from fastapi import APIRouter, Depends, Request, Response, Query
 from interface.dependencies import get_car_service
+from interface.http_cache import conditional_response, is_conditional, make_etag
+from interface.serialization import json_response
 from interface.schemas.car import (
     CarResponse,
     ModelResponse,
     BrandResponse,
     CarDetailResponse,
+    CarSearchResponse,
+    CarMarketStatsResponse,
 )
 from core.services import CarService
+from settings import get_settings
+from core.entites import (
+    Car,
+    CarSearchQuery,
+    CarCondition,
+    FuelType,
+    TransmissionType,
+    DriveType,
+)
+
+settings = get_settings()
 
 router = APIRouter(prefix="/public/cars", tags=["public_cars"])
 
@@ -23,30 +39,104 @@ async def get_all_cars_public(
     condition: Optional[str] = None,
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     car_service: CarService = Depends(get_car_service),
 ):
-    """Публичное получение списка всех автомобилей с возможностью фильтрации"""
-    cars = await car_service.get_all_cars(
+    """Публичное получение списка всех автомобилей с возможностью фильтрации.
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    С include_total общее количество возвращается в X-Total-Count, а
+    X-Total-Count-Exact показывает, точное это число или оценка"""
+    cars, next_cursor = await car_service.get_cars_page(
         model_id=model_id,
         brand_id=brand_id,
         condition=condition,
         limit=limit,
         offset=offset,
+        cursor=cursor,
         include_brand_model=True,  # Включаем информацию о модели и бренде
     )
-    return [CarDetailResponse.model_validate(car) for car in cars]
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        count = await car_service.count_cars(
+            model_id=model_id, brand_id=brand_id, condition=condition
+        )
+        response.headers["X-Total-Count"] = str(count.total)
+        response.headers["X-Total-Count-Exact"] = "true" if count.exact else "false"
+    return json_response(List[CarDetailResponse], cars, response)
 
 
-@router.get("/{car_id}", response_model=CarDetailResponse)
-async def get_car_public(
-    car_id: UUID,
+@router.get("/search", response_model=CarSearchResponse)
+async def search_cars_public(
     request: Request,
     response: Response,
+    q: Optional[str] = Query(None, max_length=200),
+    model_id: Optional[UUID] = None,
+    brand_id: Optional[UUID] = None,
+    condition: Optional[CarCondition] = None,
+    fuel_type: Optional[FuelType] = None,
+    transmission: Optional[TransmissionType] = None,
+    drive_type: Optional[DriveType] = None,
+    color: Optional[str] = None,
+    price_min: Optional[float] = Query(None, ge=0),
+    price_max: Optional[float] = Query(None, ge=0),
+    year_min: Optional[int] = None,
+    year_max: Optional[int] = None,
+    mileage_min: Optional[int] = Query(None, ge=0),
+    mileage_max: Optional[int] = Query(None, ge=0),
+    engine_volume_min: Optional[float] = Query(None, ge=0),
+    engine_volume_max: Optional[float] = Query(None, ge=0),
+    power_min: Optional[int] = Query(None, ge=0),
+    power_max: Optional[int] = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
     car_service: CarService = Depends(get_car_service),
 ):
-    """Публичное получение информации об автомобиле по ID"""
-    car = await car_service.get_car(car_id, include_brand_model=True)
-    return CarDetailResponse.model_validate(car)
+    """Публичный полнотекстовый поиск автомобилей с фильтрами и фасетами"""
+    result = await car_service.search_cars(
+        CarSearchQuery(
+            text=q,
+            model_id=model_id,
+            brand_id=brand_id,
+            condition=condition,
+            fuel_type=fuel_type,
+            transmission=transmission,
+            drive_type=drive_type,
+            color=color,
+            price_min=price_min,
+            price_max=price_max,
+            year_min=year_min,
+            year_max=year_max,
+            mileage_min=mileage_min,
+            mileage_max=mileage_max,
+            engine_volume_min=engine_volume_min,
+            engine_volume_max=engine_volume_max,
+            power_min=power_min,
+            power_max=power_max,
+            limit=limit,
+            offset=offset,
+        )
+    )
+    return json_response(CarSearchResponse, result, response)
+
+
+@router.get("/stats", response_model=List[CarMarketStatsResponse])
+async def get_market_stats_public(
+    request: Request,
+    response: Response,
+    brand_id: Optional[UUID] = None,
+    model_id: Optional[UUID] = None,
+    year: Optional[int] = None,
+    car_service: CarService = Depends(get_car_service),
+):
+    """Рыночная статистика цен и пробега по годам выпуска для бренда или модели.
+    Нужно передать ровно один из параметров brand_id и model_id"""
+    stats = await car_service.get_market_stats(
+        brand_id=brand_id, model_id=model_id, year=year
+    )
+    response.headers["Cache-Control"] = settings.cache_control_stats
+    return json_response(List[CarMarketStatsResponse], stats, response)
 
 
 @router.get("/brands", response_model=List[BrandResponse])
@@ -57,7 +147,16 @@ async def get_all_brands_public(
 ):
     """Публичное получение списка всех брендов автомобилей"""
     brands = await car_service.get_all_brands()
-    return [BrandResponse.model_validate(brand) for brand in brands]
+    not_modified = conditional_response(
+        request,
+        response,
+        # Без Last-Modified: по максимальному updated_at нельзя заметить удаление
+        etag=make_etag((brand.id, brand.updated_at) for brand in brands),
+        cache_control=settings.cache_control_brand,
+    )
+    if not_modified:
+        return not_modified
+    return json_response(List[BrandResponse], brands, response)
 
 
 @router.get("/brands/{brand_id}", response_model=BrandResponse)
@@ -69,7 +168,16 @@ async def get_brand_public(
 ):
     """Публичное получение информации о бренде по ID"""
     brand = await car_service.get_brand(brand_id)
-    return BrandResponse.model_validate(brand)
+    not_modified = conditional_response(
+        request,
+        response,
+        etag=make_etag([(brand.id, brand.updated_at)]),
+        last_modified=brand.updated_at,
+        cache_control=settings.cache_control_brand,
+    )
+    if not_modified:
+        return not_modified
+    return json_response(BrandResponse, brand, response)
 
 
 @router.get("/models", response_model=List[ModelResponse])
@@ -81,7 +189,16 @@ async def get_all_models_public(
 ):
     """Публичное получение списка всех моделей автомобилей с фильтрацией по бренду"""
     models = await car_service.get_all_models(brand_id=brand_id)
-    return [ModelResponse.model_validate(model) for model in models]
+    not_modified = conditional_response(
+        request,
+        response,
+        # Без Last-Modified: по максимальному updated_at нельзя заметить удаление
+        etag=make_etag((model.id, model.updated_at) for model in models),
+        cache_control=settings.cache_control_model,
+    )
+    if not_modified:
+        return not_modified
+    return json_response(List[ModelResponse], models, response)
 
 
 @router.get("/models/{model_id}", response_model=ModelResponse)
@@ -93,4 +210,59 @@ async def get_model_public(
 ):
     """Публичное получение информации о модели по ID"""
     model = await car_service.get_model(model_id)
-    return ModelResponse.model_validate(model)
+    not_modified = conditional_response(
+        request,
+        response,
+        etag=make_etag([(model.id, model.updated_at)]),
+        last_modified=model.updated_at,
+        cache_control=settings.cache_control_model,
+    )
+    if not_modified:
+        return not_modified
+    return json_response(ModelResponse, model, response)
+
+
+# Маршрут с параметром объявляется последним, чтобы не перехватывать
+# статические пути /search, /brands и /models
+def _car_versions(car: Car) -> List[Tuple[UUID, datetime]]:
+    # Версия объявления учитывает перенос в архив (он не меняет updated_at) и
+    # связанные модель и бренд, которые входят в ответ
+    versions = [(car.id, car.updated_at)]
+    if car.archived_at:
+        versions.append((car.id, car.archived_at))
+    versions += [(item.id, item.updated_at) for item in (car.model, car.brand) if item]
+    return versions
+
+
+def _car_conditional_response(
+    request: Request, response: Response, versions: List[Tuple[UUID, datetime]]
+) -> Optional[Response]:
+    return conditional_response(
+        request,
+        response,
+        etag=make_etag(versions),
+        last_modified=max(updated_at for _, updated_at in versions),
+        cache_control=settings.cache_control_car,
+    )
+
+
+@router.get("/{car_id}", response_model=CarDetailResponse)
+async def get_car_public(
+    car_id: UUID,
+    request: Request,
+    response: Response,
+    car_service: CarService = Depends(get_car_service),
+):
+    """Публичное получение информации об автомобиле по ID.
+    На условный запрос сначала читаются только версии объявления, модели и
+    бренда, а само объявление загружается, если версия клиента устарела"""
+    if is_conditional(request):
+        versions = await car_service.get_car_versions(car_id)
+        not_modified = _car_conditional_response(request, response, versions)
+        if not_modified:
+            return not_modified
+    car = await car_service.get_car(car_id, include_brand_model=True)
+    not_modified = _car_conditional_response(request, response, _car_versions(car))
+    if not_modified:
+        return not_modified
+    return json_response(CarDetailResponse, car, response)
@@ -2,6 +2,7 @@ from typing import List
 from uuid import UUID
 from fastapi import APIRouter, Depends, Request, Response
 from interface.dependencies import get_car_service
+from interface.serialization import json_response
 from interface.schemas.car import (
     BrandCreate, BrandUpdate, BrandResponse,
     ModelCreate, ModelUpdate, ModelResponse,
@@ -25,7 +26,7 @@ async def admin_create_brand(
     """Создание нового бренда (только администратор)"""
     brand = Brand(**brand_data.model_dump())
     created_brand = await car_service.create_brand(brand)
-    return BrandResponse.model_validate(created_brand)
+    return json_response(BrandResponse, created_brand, response, status_code=201)
 
 
 @router.put("/brands/{brand_id}", response_model=BrandResponse)
@@ -38,16 +39,10 @@ async def admin_update_brand(
     car_service: CarService = Depends(get_car_service)
 ):
     """Обновление информации о бренде (только администратор)"""
-    # Получаем текущие данные
-    current_brand = await car_service.get_brand(brand_id)
-    
-    # Обновляем только переданные поля
+    # Обновляем только переданные поля одним запросом
     update_data = brand_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(current_brand, field, value)
-    
-    updated_brand = await car_service.update_brand(current_brand)
-    return BrandResponse.model_validate(updated_brand)
+    updated_brand = await car_service.patch_brand(brand_id, update_data)
+    return json_response(BrandResponse, updated_brand, response)
 
 
 @router.delete("/brands/{brand_id}", status_code=204)
@@ -75,7 +70,7 @@ async def admin_create_model(
     """Создание новой модели (только администратор)"""
     model = Model(**model_data.model_dump())
     created_model = await car_service.create_model(model)
-    return ModelResponse.model_validate(created_model)
+    return json_response(ModelResponse, created_model, response, status_code=201)
 
 
 @router.put("/models/{model_id}", response_model=ModelResponse)
@@ -88,16 +83,10 @@ async def admin_update_model(
     car_service: CarService = Depends(get_car_service)
 ):
     """Обновление информации о модели (только администратор)"""
-    # Получаем текущие данные
-    current_model = await car_service.get_model(model_id)
-    
-    # Обновляем только переданные поля
+    # Обновляем только переданные поля одним запросом
     update_data = model_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(current_model, field, value)
-    
-    updated_model = await car_service.update_model(current_model)
-    return ModelResponse.model_validate(updated_model)
+    updated_model = await car_service.patch_model(model_id, update_data)
+    return json_response(ModelResponse, updated_model, response)
 
 
 @router.delete("/models/{model_id}", status_code=204)
@@ -124,16 +113,10 @@ async def admin_update_car(
     car_service: CarService = Depends(get_car_service)
 ):
     """Обновление любого объявления (только администратор)"""
-    # Получаем текущие данные
-    current_car = await car_service.get_car(car_id)
-    
-    # Обновляем только переданные поля
+    # Обновляем только переданные поля одним запросом
     update_data = car_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(current_car, field, value)
-    
-    updated_car = await car_service.update_car(current_car)
-    return CarResponse.model_validate(updated_car)
+    updated_car = await car_service.patch_car(car_id, update_data)
+    return json_response(CarResponse, updated_car, response)
 
 
 @router.delete("/listings/{car_id}", status_code=204)
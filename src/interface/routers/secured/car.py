@@ -1,11 +1,43 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, Request, Response, Query, HTTPException, status
-from interface.dependencies import get_car_service
-from interface.schemas.car import CarCreate, CarUpdate, CarResponse
-from core.services import CarService
-from core.entites import Car
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    Depends,
+    File,
+    Request,
+    Response,
+    Query,
+    HTTPException,
+    status,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from interface.dependencies import (
+    car_service_scope,
+    get_car_service,
+    get_photo_service,
+    photo_service_scope,
+)
+from interface.export import EXPORT_MEDIA_TYPES, export_chunks
+from interface.serialization import json_response
+from interface.schemas.car import (
+    CarCreate,
+    CarUpdate,
+    CarBatchUpdate,
+    CarResponse,
+    BatchItemResponse,
+    CarPhotoResponse,
+)
+from core.services import CarService, PhotoService
+from core.entites import Car, CarPhoto, PhotoUpload
+from logger import get_logger
 from interface.routers.decorator import require_scopes
+from settings import get_settings
+
+settings = get_settings()
+logger = get_logger()
 
 router = APIRouter(prefix="/cars", tags=["cars"])
 
@@ -26,7 +58,60 @@ async def create_car(
 
     car = Car(**car_data.model_dump())
     created_car = await car_service.create_car(car)
-    return CarResponse.model_validate(created_car)
+    return json_response(CarResponse, created_car, response, status_code=201)
+
+
+def _batch_response(results) -> list:
+    return [
+        {
+            "index": result.index,
+            "success": result.error is None,
+            "car": result.car,
+            "error": result.error,
+        }
+        for result in results
+    ]
+
+
+@router.post("/batch", response_model=List[BatchItemResponse])
+@require_scopes(["car:create"])
+async def create_cars_batch(
+    request: Request,
+    response: Response,
+    cars_data: List[CarCreate] = Body(..., min_length=1, max_length=settings.car_batch_max_size),
+    car_service: CarService = Depends(get_car_service),
+):
+    """Пакетное создание объявлений в одной транзакции с результатом по каждому элементу"""
+    seller_id = UUID(request.state.payload.get("sub"))
+    cars = []
+    for car_data in cars_data:
+        car_data.seller_id = seller_id
+        cars.append(Car(**car_data.model_dump()))
+    results = await car_service.create_cars(cars)
+    return json_response(List[BatchItemResponse], _batch_response(results), response)
+
+
+@router.patch("/batch", response_model=List[BatchItemResponse])
+@require_scopes(["car:update"])
+async def update_cars_batch(
+    request: Request,
+    response: Response,
+    cars_data: List[CarBatchUpdate] = Body(..., min_length=1, max_length=settings.car_batch_max_size),
+    car_service: CarService = Depends(get_car_service),
+):
+    """Пакетное частичное обновление своих объявлений в одной транзакции"""
+    payload = request.state.payload
+    # Администратор может обновлять любые объявления
+    is_admin = "admin" in payload.get("scopes", [])
+    seller_id = None if is_admin else UUID(payload.get("sub"))
+    # Продавец не может передать объявление другому пользователю
+    exclude = {"id"} if is_admin else {"id", "seller_id"}
+    changes = [
+        (car_data.id, car_data.model_dump(exclude_unset=True, exclude=exclude))
+        for car_data in cars_data
+    ]
+    results = await car_service.update_cars(changes, seller_id=seller_id)
+    return json_response(List[BatchItemResponse], _batch_response(results), response)
 
 
 @router.put("/{car_id}", response_model=CarResponse)
@@ -39,28 +124,57 @@ async def update_car(
     car_service: CarService = Depends(get_car_service),
 ):
     """Обновление своего объявления о продаже автомобиля"""
-    # Получаем текущие данные
-    current_car = await car_service.get_car(car_id)
+    # Владение проверяется условием UPDATE; администратор может править любое объявление
+    payload = request.state.payload
+    is_admin = "admin" in payload.get("scopes", [])
+    seller_id = None if is_admin else UUID(payload.get("sub"))
+    # Продавец не может передать объявление другому пользователю
+    exclude = set() if is_admin else {"seller_id"}
 
-    # Проверяем, принадлежит ли объявление текущему пользователю
-    if hasattr(request.state, "payload"):
-        user_id = UUID(request.state.payload.get("sub"))
-        if (
-            current_car.seller_id != user_id
-            and "admin" not in request.state.payload.get("scopes", [])
-        ):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Вы можете редактировать только свои объявления",
-            )
+    # Обновляем только переданные поля одним запросом
+    update_data = car_data.model_dump(exclude_unset=True, exclude=exclude)
+    updated_car = await car_service.patch_car(car_id, update_data, seller_id=seller_id)
+    return json_response(CarResponse, updated_car, response)
+
+
+async def _process_photos(photos: List[CarPhoto]) -> None:
+    """Обработка фотографий после ответа клиенту, в собственной сессии"""
+    try:
+        async with photo_service_scope() as photo_service:
+            failed = await photo_service.process(photos)
+    except Exception as e:
+        logger.error(f"Не удалось обработать фотографии объявления: {e}")
+        return
+    for photo_id, error in failed.items():
+        logger.error(f"Не удалось обработать фотографию {photo_id}: {error!r}")
 
-    # Обновляем только переданные поля
-    update_data = car_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(current_car, field, value)
 
-    updated_car = await car_service.update_car(current_car)
-    return CarResponse.model_validate(updated_car)
+@router.post(
+    "/{car_id}/photos", response_model=List[CarPhotoResponse], status_code=202
+)
+@require_scopes(["car:update"])
+async def upload_car_photos(
+    car_id: UUID,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    photo_service: PhotoService = Depends(get_photo_service),
+):
+    """Загрузка фотографий своего объявления. Оригиналы сохраняются сразу,
+    миниатюры и карточки готовятся в фоне и появляются в объявлении позже"""
+    payload = request.state.payload
+    seller_id = None
+    if "admin" not in payload.get("scopes", []):
+        seller_id = UUID(payload.get("sub"))
+
+    uploads = [
+        PhotoUpload(file=file.file, content_type=file.content_type, size=file.size)
+        for file in files
+    ]
+    photos = await photo_service.store_originals(car_id, uploads, seller_id=seller_id)
+    background_tasks.add_task(_process_photos, photos)
+    return json_response(List[CarPhotoResponse], photos, response, status_code=202)
 
 
 @router.delete("/{car_id}", status_code=204)
@@ -96,12 +210,55 @@ async def delete_car(
 async def get_my_cars(
     request: Request,
     response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     car_service: CarService = Depends(get_car_service),
 ):
-    """Получение списка собственных объявлений пользователя"""
+    """Получение списка собственных объявлений пользователя.
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor"""
     if hasattr(request.state, "payload"):
         user_id = UUID(request.state.payload.get("sub"))
-        # Здесь нужно будет добавить фильтр по seller_id в сервис
-        cars = await car_service.get_all_cars(seller_id=user_id)
-        return [CarResponse.model_validate(car) for car in cars]
+        cars, next_cursor = await car_service.get_cars_page(
+            seller_id=user_id,
+            limit=limit,
+            cursor=cursor,
+            include_brand_model=False,
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return json_response(List[CarResponse], cars, response)
     return []
+
+
+@router.get("/export")
+@require_scopes(["car:export"])
+async def export_cars(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    model_id: Optional[UUID] = None,
+    brand_id: Optional[UUID] = None,
+    condition: Optional[str] = None,
+    include_brand_model: bool = True,
+):
+    """Потоковая выгрузка всего каталога в NDJSON или CSV с фильтрами как у списка.
+    Строки читаются серверным курсором и отправляются по мере получения, поэтому
+    на всё время выгрузки занято соединение с БД: нужен scope car:export"""
+
+    async def body():
+        # Сессия открывается внутри генератора: она нужна, пока отправляется тело
+        async with car_service_scope(read_only=True) as car_service:
+            batches = car_service.stream_cars(
+                model_id=model_id,
+                brand_id=brand_id,
+                condition=condition,
+                include_brand_model=include_brand_model,
+                batch_size=settings.export_batch_size,
+            )
+            async for chunk in export_chunks(batches, format, include_brand_model):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="cars.{format}"'},
+    )
@@ -17,8 +17,13 @@ from interface.schemas.car import (
     CarBase,
     CarCreate,
     CarUpdate,
+    CarBatchUpdate,
     CarResponse,
     CarDetailResponse,
+    CarSearchResponse,
+    BatchItemResponse,
+    CarMarketStatsResponse,
+    CarPhotoResponse,
 )
 from interface.schemas.scopes import (
     ScopesRequest,
@@ -42,8 +47,13 @@ __all__ = [
     "CarBase",
     "CarCreate",
     "CarUpdate",
+    "CarBatchUpdate",
     "CarResponse",
     "CarDetailResponse",
+    "CarSearchResponse",
+    "BatchItemResponse",
+    "CarMarketStatsResponse",
+    "CarPhotoResponse",
     "ScopesRequest",
     "ScopesResponse",
 ]
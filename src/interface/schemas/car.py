@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -98,10 +98,16 @@ class CarUpdate(CarBase):
     drive_type: Optional[DriveType] = None
 
 
+class CarBatchUpdate(CarUpdate):
+    id: UUID
+
+
 class CarResponse(CarBase):
     id: UUID
+    thumbnails: List[str] = []
     created_at: datetime
     updated_at: datetime
+    archived_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -111,8 +117,59 @@ class CarDetailResponse(CarBase):
     id: UUID
     model: Optional[ModelResponse] = None
     brand: Optional[BrandResponse] = None
+    thumbnails: List[str] = []
     created_at: datetime
     updated_at: datetime
+    archived_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class CarSearchResponse(BaseModel):
+    items: List[CarDetailResponse]
+    total: int
+    facets: Dict[str, Dict[str, int]]
+
+    class Config:
+        from_attributes = True
+
+
+class BatchItemResponse(BaseModel):
+    index: int
+    success: bool
+    car: Optional[CarResponse] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class CarMarketStatsResponse(BaseModel):
+    brand_id: UUID
+    model_id: Optional[UUID] = None
+    year: int
+    listings: int
+    price_min: float
+    price_max: float
+    price_mean: float
+    price_median: float
+    price_p10: float
+    price_p90: float
+    mileage_min: int
+    mileage_max: int
+    mileage_mean: float
+    mileage_median: float
+    mileage_p10: float
+    mileage_p90: float
+
+    class Config:
+        from_attributes = True
+
+
+class CarPhotoResponse(BaseModel):
+    id: UUID
+    original_url: str
 
     class Config:
         from_attributes = True
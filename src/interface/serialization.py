@@ -0,0 +1,39 @@
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+# Заголовки, которые формируются заново для нового тела ответа
+_BODY_HEADERS = (b"content-length", b"content-type")
+
+
+@lru_cache(maxsize=None)
+def get_adapter(schema: Any) -> TypeAdapter:
+    """Кэширует TypeAdapter, чтобы схема валидации строилась один раз"""
+    return TypeAdapter(schema)
+
+
+def json_response(
+    schema: Any, data: Any, response: Response, status_code: int = 200
+) -> Response:
+    """
+    Валидирует данные по схеме один раз и сериализует их сразу в JSON-байты
+    (pydantic-core), минуя повторную валидацию response_model в FastAPI.
+
+    Заголовки, выставленные обработчиком на response (курсор, ETag, cookies),
+    переносятся в итоговый ответ, т.к. FastAPI не объединяет их с возвращённым Response.
+    """
+    adapter = get_adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    result = Response(
+        content=body,
+        status_code=response.status_code or status_code,
+        media_type="application/json",
+    )
+    result.raw_headers.extend(
+        (key, value)
+        for key, value in response.raw_headers
+        if key.lower() not in _BODY_HEADERS
+    )
+    return result
@@ -1,138 +1,81 @@
-import csv
+import argparse
 import asyncio
-from uuid import uuid4
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from infrastructure.models import Brand, Model, Car
-from core.entites.car import (
-    FuelType,
-    TransmissionType,
-    DriveType,
-    CarCondition,
-)
-from settings import get_settings
-
-settings = get_settings()
-# Замените URL на асинхронный
-DATABASE_URL = settings.database_url.replace("postgresql://", "postgresql+asyncpg://")
-print(f"Подключение к базе данных: {DATABASE_URL}")
-
-async_engine = create_async_engine(DATABASE_URL)
-AsyncSessionLocal = sessionmaker(
-    class_=AsyncSession, autocommit=False, autoflush=False, bind=async_engine
-)
+import os
 
+from sqlalchemy.ext.asyncio import create_async_engine
 
-async def populate_database(csv_file):
-    async with AsyncSessionLocal() as db:
-        try:
-            with open(csv_file, mode="r", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
-                brands_cache = {}
-                models_cache = {}
-
-                for row in reader:
-                    print(row)
-                    brand_name = row["brand_name"]
-                    if brand_name not in brands_cache:
-                        # Асинхронный запрос к БД
-                        result = await db.execute(
-                            Brand.__table__.select().where(Brand.name == brand_name)
-                        )
-                        brand = result.scalars().first()
+from infrastructure.ingestion import CarCsvIngestor, INGESTION_METHODS
+from logger import get_logger
+from settings import get_settings
 
-                        if not brand:
-                            brand = Brand(
-                                id=uuid4(),
-                                name=brand_name,
-                                country=row["brand_country"],
-                                logo_url=row["brand_logo_url"],
-                            )
-                            db.add(brand)
-                            await db.commit()
-                            await db.refresh(brand)
-                        brands_cache[brand_name] = brand.id
-                    brand_id = brands_cache[brand_name]
+settings = get_settings()
+logger = get_logger()
 
-                    model_name = row["model_name"]
-                    model_key = (
-                        str(brand_id),
-                        model_name,
-                    )  # Преобразуем UUID в строку для ключа
-                    if model_key not in models_cache:
-                        # Асинхронный запрос к БД
-                        result = await db.execute(
-                            Model.__table__.select().where(
-                                Model.brand_id == brand_id, Model.name == model_name
-                            )
-                        )
-                        model = result.scalars().first()
 
-                        if not model:
-                            model = Model(
-                                id=uuid4(),
-                                brand_id=brand_id,
-                                name=model_name,
-                                year_from=(
-                                    int(row["model_year_from"])
-                                    if row["model_year_from"]
-                                    else None
-                                ),
-                                year_to=(
-                                    int(row["model_year_to"])
-                                    if row["model_year_to"]
-                                    else None
-                                ),
-                            )
-                            db.add(model)
-                            await db.commit()
-                            await db.refresh(model)
-                        models_cache[model_key] = model.id
-                    model_id = models_cache[model_key]
+async def populate_database(
+    csv_file: str,
+    batch_size: int = 10000,
+    checkpoint_path: str | None = None,
+    method: str = "copy",
+):
+    engine = create_async_engine(settings.database_url)
+    try:
+        ingestor = CarCsvIngestor(
+            engine,
+            batch_size=batch_size,
+            checkpoint_path=checkpoint_path,
+            method=method,
+        )
+        return await ingestor.run(csv_file)
+    finally:
+        await engine.dispose()
 
-                    car = Car(
-                        id=uuid4(),
-                        model_id=model_id,
-                        year=int(row["car_year"]),
-                        price=float(row["car_price"]),
-                        mileage=int(row["car_mileage"]),
-                        condition=CarCondition(row["car_condition"]),
-                        fuel_type=FuelType(row["car_fuel_type"]),
-                        transmission=TransmissionType(row["car_transmission"]),
-                        drive_type=DriveType(row["car_drive_type"]),
-                        color=row["car_color"] if row["car_color"] else None,
-                        engine_volume=(
-                            float(row["car_engine_volume"])
-                            if row["car_engine_volume"] != "null"
-                            and row["car_engine_volume"]
-                            else None
-                        ),
-                        power=int(row["car_power"]) if row["car_power"] else None,
-                        description=(
-                            row["car_description"] if row["car_description"] else None
-                        ),
-                        vin=row["car_vin"] if row["car_vin"] else None,
-                        photos=(
-                            row["car_photos"].split(";") if row["car_photos"] else []
-                        ),
-                        is_sold=False,
-                    )
-                    db.add(car)
-                    # Коммитим каждую машину, чтобы не держать большую транзакцию
-                    await db.commit()
 
-        except Exception as e:
-            await db.rollback()
-            print(f"Произошла ошибка: {e}")
-            raise e
+def parse_args():
+    parser = argparse.ArgumentParser(description="Загрузка автомобилей из CSV")
+    parser.add_argument(
+        "csv_file",
+        nargs="?",
+        default=os.environ.get("CARS_CSV_FILE"),
+        help="CSV-файл с автомобилями; по умолчанию из переменной CARS_CSV_FILE",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=10000, help="Количество строк в одной пачке"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Файл чекпоинта для продолжения прерванной загрузки",
+    )
+    parser.add_argument(
+        "--method",
+        choices=INGESTION_METHODS,
+        default="copy",
+        help="Способ записи автомобилей: COPY или многострочный INSERT",
+    )
+    args = parser.parse_args()
+    if not args.csv_file:
+        parser.error("укажите CSV-файл аргументом или переменной CARS_CSV_FILE")
+    return args
 
 
 async def main():
+    args = parse_args()
     try:
-        await populate_database("/Users/timursarafiev/Documents/to_cars_db.csv")
-        print("База данных успешно заполнена!")
+        stats = await populate_database(
+            args.csv_file,
+            batch_size=args.batch_size,
+            checkpoint_path=args.checkpoint,
+            method=args.method,
+        )
+        logger.info(
+            f"База данных успешно заполнена: {stats.rows} строк за {stats.elapsed:.1f} с "
+            f"({stats.rows_per_second:.0f} строк/с), новых брендов {stats.brands_created}, "
+            f"новых моделей {stats.models_created}"
+        )
     except Exception as e:
-        print(f"Произошла ошибка при загрузке данных: {e}")
+        logger.error(f"Произошла ошибка при загрузке данных: {e}")
+        raise
 
 
 if __name__ == "__main__":
@@ -1,23 +1,183 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import re
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
+from settings import get_settings
 
 logger: logging.Logger | None = None
+listener: QueueListener | None = None
+queue_handler: "LogQueueHandler | None" = None
 LOGGER_LEVEL = logging.INFO
 
+# Идентификатор HTTP-запроса, в рамках которого пишется запись
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Изменяемые части сообщений (идентификаторы, числа), которые не должны
+# превращать одинаковые ошибки в разные
+_VARIABLE_PARTS = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+(?:\.\d+)?",
+    re.IGNORECASE,
+)
+
+
+class RequestIdFilter(logging.Filter):
+    """Добавляет в запись идентификатор текущего запроса"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Ограничивает повторяющиеся предупреждения и ошибки: не больше burst
+    одинаковых сообщений за interval секунд. Число пропущенных записей
+    передаётся со следующей записанной в поле suppressed
+    """
+
+    def __init__(self, burst: int, interval: float, max_keys: int = 10_000):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.max_keys = max_keys
+        self._windows: dict = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+
+        key = (record.name, record.levelno, _VARIABLE_PARTS.sub("#", str(record.msg)))
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            if len(self._windows) >= self.max_keys:
+                self._windows.clear()
+            suppressed = window[2] if window else 0
+            self._windows[key] = [now, 1, 0]
+            record.suppressed = suppressed
+            return True
+
+        if window[1] < self.burst:
+            window[1] += 1
+            record.suppressed = 0
+            return True
+        window[2] += 1
+        return False
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "location": f"{record.filename}:{record.lineno}",
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__(
+            "| %(asctime)s | [%(levelname)s | %(filename)s:%(lineno)s] "
+            "%(request_id)s %(message)s"
+        )
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.request_id = getattr(record, "request_id", None) or "-"
+        return super().format(record)
+
+
+class LogQueueHandler(QueueHandler):
+    """
+    Кладёт запись в ограниченную очередь без ожидания. Если очередь
+    переполнена (вывод не успевает), запись отбрасывается и учитывается в
+    dropped: логирование не должно задерживать обработку запроса
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Аргументы и traceback подставляем сразу: объекты могут измениться,
+        # пока запись ждёт в очереди
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
 def get_logger():
     """
-    Возвращает глобальный логгер
+    Возвращает глобальный логгер.
+
+    Записи передаются через очередь в отдельный поток (QueueListener), который
+    и пишет их в stderr, поэтому медленный терминал или pipe не блокирует
+    цикл событий
     """
-    global logger
+    global logger, listener, queue_handler
     if not logger:
+        config = get_settings()
         logger = logging.getLogger()
         logger.setLevel(LOGGER_LEVEL)
-        formatter = logging.Formatter(
-            "| %(asctime)s | [%(levelname)s | %(filename)s:%(lineno)s] %(message)s"
-        )
+
         stream_handler = logging.StreamHandler()
-        stream_handler.setFormatter(formatter)
-        logger.addHandler(stream_handler)
+        if config.log_format == "json":
+            stream_handler.setFormatter(JsonFormatter())
+        else:
+            stream_handler.setFormatter(TextFormatter())
+
+        queue_handler = LogQueueHandler(queue.Queue(maxsize=config.log_queue_size))
+        queue_handler.addFilter(RequestIdFilter())
+        queue_handler.addFilter(
+            RateLimitFilter(
+                burst=config.log_rate_limit_burst,
+                interval=config.log_rate_limit_interval,
+            )
+        )
+        logger.addHandler(queue_handler)
+
+        listener = QueueListener(queue_handler.queue, stream_handler)
+        listener.start()
+        # Дописываем оставшиеся в очереди записи при завершении процесса
+        atexit.register(listener.stop)
 
     return logger
+
+
+def get_log_stats() -> dict:
+    if queue_handler is None:
+        return {}
+    return {
+        "queued": queue_handler.queue.qsize(),
+        "dropped": queue_handler.dropped,
+    }
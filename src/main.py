@@ -1,13 +1,116 @@
+import argparse
 import logging
+import os
+
 import uvicorn
 
+from settings import get_settings
 
-if __name__ == "__main__":
+SERVER_MODES = ("development", "production")
+
+
+def worker_count(configured: int) -> int:
+    return configured if configured > 0 else os.cpu_count() or 1
+
+
+def pool_limits(budget: int, workers: int, pool_size: int, max_overflow: int):
+    """
+    Размер пула одного процесса из общего лимита соединений: pool_size +
+    max_overflow на все процессы не превышает budget. Одно соединение
+    резервируется для блокировки фонового обслуживания, которую держит один
+    процесс. Постоянная часть пула сохраняется, насколько позволяет доля
+    процесса, остальное уходит в overflow
+    """
+    per_worker = (budget - 1) // workers
+    if per_worker < 1:
+        raise SystemExit(
+            f"DB_CONNECTION_BUDGET={budget} должен быть больше числа процессов ({workers})"
+        )
+    size = min(pool_size, per_worker)
+    overflow = min(max_overflow, per_worker - size)
+    return size, overflow
+
+
+def image_pool_limit(budget: int, workers: int, image_workers: int) -> int:
+    """
+    Размер пула обработки изображений одного процесса из общего лимита: все
+    процессы вместе запускают не больше budget процессов обработки, но у каждого
+    есть хотя бы один (пул создаётся при первой загрузке фотографий)
+    """
+    return max(1, min(image_workers, budget // workers))
+
+
+def run_development(config) -> None:
     uvicorn.run(
         "interface.main:app",
-        host="0.0.0.0",
-        port=8010,
+        host=config.server_host,
+        port=config.server_port,
         log_level=logging.DEBUG,
         reload=True,
         use_colors=True,
     )
+
+
+def run_production(config) -> None:
+    from logger import get_logger
+
+    logger = get_logger()
+    workers = worker_count(config.server_workers)
+
+    if config.db_connection_budget:
+        pool_size, max_overflow = pool_limits(
+            config.db_connection_budget,
+            workers,
+            config.db_pool_size,
+            config.db_max_overflow,
+        )
+        # Процессы запускаются заново (spawn) и читают настройки из окружения
+        os.environ["DB_POOL_SIZE"] = str(pool_size)
+        os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+    else:
+        pool_size, max_overflow = config.db_pool_size, config.db_max_overflow
+    image_workers = image_pool_limit(
+        config.image_worker_budget or os.cpu_count() or 1,
+        workers,
+        config.image_workers,
+    )
+    os.environ["IMAGE_WORKERS"] = str(image_workers)
+    logger.info(
+        f"Запуск {workers} процессов, пул соединений процесса {pool_size}+{max_overflow}, "
+        f"не больше {workers * (pool_size + max_overflow)} соединений с каждой базой, "
+        f"обработка изображений — до {image_workers} процессов на процесс сервера"
+    )
+
+    uvicorn.run(
+        "interface.main:app",
+        host=config.server_host,
+        port=config.server_port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=config.server_keep_alive,
+        backlog=config.server_backlog,
+        timeout_graceful_shutdown=config.server_graceful_timeout,
+        proxy_headers=True,
+        forwarded_allow_ips=config.server_forwarded_allow_ips,
+        # Журнал uvicorn идёт через корневой логгер процесса (JSON и очередь)
+        log_config=None,
+        log_level=logging.INFO,
+        # Доступ журналирует прокси; медленные запросы пишет QueryStatsMiddleware
+        access_log=False,
+    )
+
+
+def parse_args(config):
+    parser = argparse.ArgumentParser(description="Запуск Cars API")
+    parser.add_argument("--mode", choices=SERVER_MODES, default=config.server_mode)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    config = get_settings()
+    args = parse_args(config)
+    if args.mode == "production":
+        run_production(config)
+    else:
+        run_development(config)
@@ -0,0 +1,99 @@
+"""add_cars_archive
+
+Revision ID: 5d3e8a1c7f60
+Revises: 4b9d2e6f1a85
+Create Date: 2026-10-16 23:12:47.530184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d3e8a1c7f60'
+down_revision: Union[str, None] = '4b9d2e6f1a85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_cars_updated_at', 'cars', ['updated_at'], unique=False)
+
+    # Типы перечислений уже созданы для cars
+    op.create_table('cars_archive',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('model_id', sa.Uuid(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('mileage', sa.Integer(), nullable=False),
+    sa.Column('condition', postgresql.ENUM(name='carcondition', create_type=False), nullable=False),
+    sa.Column('fuel_type', postgresql.ENUM(name='fueltype', create_type=False), nullable=False),
+    sa.Column('transmission', postgresql.ENUM(name='transmissiontype', create_type=False), nullable=False),
+    sa.Column('drive_type', postgresql.ENUM(name='drivetype', create_type=False), nullable=False),
+    sa.Column('seller_id', sa.Uuid(), nullable=True),
+    sa.Column('color', sa.String(length=50), nullable=True),
+    sa.Column('engine_volume', sa.Float(), nullable=True),
+    sa.Column('power', sa.Integer(), nullable=True),
+    sa.Column('description', sa.String(length=2000), nullable=True),
+    sa.Column('vin', sa.String(length=17), nullable=True),
+    sa.Column('is_sold', sa.Boolean(), nullable=False),
+    sa.Column('photos', sa.ARRAY(sa.String()), nullable=False),
+    sa.Column('thumbnails', sa.ARRAY(sa.String()), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+
+    # Секции по годам: от самого старого объявления до следующего года.
+    # Секции следующих лет создаёт архиватор; всё, что не попало в секцию,
+    # остаётся в секции по умолчанию
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            first_year integer := COALESCE(
+                (SELECT extract(year FROM min(created_at))::integer FROM cars),
+                extract(year FROM now())::integer
+            );
+        BEGIN
+            FOR year IN first_year .. extract(year FROM now())::integer + 1 LOOP
+                EXECUTE format(
+                    'CREATE TABLE cars_archive_%s PARTITION OF cars_archive '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    year, make_date(year, 1, 1), make_date(year + 1, 1, 1)
+                );
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute("CREATE TABLE cars_archive_default PARTITION OF cars_archive DEFAULT")
+
+
+def downgrade() -> None:
+    # Возвращаем архив в cars, кроме объявлений удалённых моделей; продавец
+    # обнуляется, если пользователя уже нет
+    op.execute(
+        """
+        INSERT INTO cars (
+            id, created_at, updated_at, model_id, year, price, mileage, condition,
+            fuel_type, transmission, drive_type, seller_id, color, engine_volume,
+            power, description, vin, is_sold, photos, thumbnails
+        )
+        SELECT
+            a.id, a.created_at, a.updated_at, a.model_id, a.year, a.price, a.mileage,
+            a.condition, a.fuel_type, a.transmission, a.drive_type, u.id, a.color,
+            a.engine_volume, a.power, a.description, a.vin, a.is_sold, a.photos,
+            a.thumbnails
+        FROM cars_archive a
+        JOIN models m ON m.id = a.model_id
+        LEFT JOIN users u ON u.id = a.seller_id
+        ON CONFLICT (id) DO NOTHING
+        """
+    )
+    op.drop_table('cars_archive')
+    op.drop_index('ix_cars_updated_at', table_name='cars')
@@ -0,0 +1,26 @@
+"""add_users_tokens_revoked_at
+
+Revision ID: 6f2a9c4d8b13
+Revises: 5d3e8a1c7f60
+Create Date: 2026-10-17 10:21:38.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f2a9c4d8b13'
+down_revision: Union[str, None] = '5d3e8a1c7f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('tokens_revoked_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'tokens_revoked_at')
@@ -0,0 +1,96 @@
+"""add_cars_search
+
+Revision ID: 7a5e0c4b2d93
+Revises: 3f1c2a7d9b41
+Create Date: 2026-10-16 11:40:27.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a5e0c4b2d93'
+down_revision: Union[str, None] = '3f1c2a7d9b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('cars', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.create_index('ix_cars_search_vector', 'cars', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_cars_price', 'cars', ['price'], unique=False)
+    op.create_index('ix_cars_year', 'cars', ['year'], unique=False)
+    op.create_index('ix_cars_mileage', 'cars', ['mileage'], unique=False)
+
+    # Поисковый вектор: названия бренда и модели (вес A) и описание (вес B)
+    op.execute("""
+        CREATE FUNCTION cars_search_vector_refresh() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('simple', coalesce((
+                    SELECT b.name || ' ' || m.name
+                    FROM models m JOIN brands b ON b.id = m.brand_id
+                    WHERE m.id = NEW.model_id
+                ), '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER cars_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF model_id, description ON cars
+        FOR EACH ROW EXECUTE FUNCTION cars_search_vector_refresh()
+    """)
+
+    # При переименовании модели или бренда пересчитываем векторы связанных автомобилей
+    op.execute("""
+        CREATE FUNCTION models_search_vector_refresh() RETURNS trigger AS $$
+        BEGIN
+            UPDATE cars SET description = description WHERE model_id = NEW.id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER models_search_vector_trigger
+        AFTER UPDATE OF name ON models
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION models_search_vector_refresh()
+    """)
+    op.execute("""
+        CREATE FUNCTION brands_search_vector_refresh() RETURNS trigger AS $$
+        BEGIN
+            UPDATE cars SET description = description
+            WHERE model_id IN (SELECT id FROM models WHERE brand_id = NEW.id);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER brands_search_vector_trigger
+        AFTER UPDATE OF name ON brands
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION brands_search_vector_refresh()
+    """)
+
+    # Заполняем векторы для существующих автомобилей
+    op.execute("UPDATE cars SET description = description")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS brands_search_vector_trigger ON brands")
+    op.execute("DROP FUNCTION IF EXISTS brands_search_vector_refresh()")
+    op.execute("DROP TRIGGER IF EXISTS models_search_vector_trigger ON models")
+    op.execute("DROP FUNCTION IF EXISTS models_search_vector_refresh()")
+    op.execute("DROP TRIGGER IF EXISTS cars_search_vector_trigger ON cars")
+    op.execute("DROP FUNCTION IF EXISTS cars_search_vector_refresh()")
+    op.drop_index('ix_cars_mileage', table_name='cars')
+    op.drop_index('ix_cars_year', table_name='cars')
+    op.drop_index('ix_cars_price', table_name='cars')
+    op.drop_index('ix_cars_search_vector', table_name='cars', postgresql_using='gin')
+    op.drop_column('cars', 'search_vector')
@@ -0,0 +1,52 @@
+"""add_market_stats_changes
+
+Revision ID: 8c4e1b7d2a59
+Revises: 6f2a9c4d8b13
+Create Date: 2026-10-17 12:47:05.318462
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e1b7d2a59'
+down_revision: Union[str, None] = '6f2a9c4d8b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Отметки об изменениях данных car_market_stats. Отметку добавляет триггер
+    # в той же транзакции, что и запись, поэтому изменения из любого процесса
+    # (и загрузки CSV) видны фоновой задаче. Строки только добавляются,
+    # поэтому параллельные записи не ждут друг друга
+    op.execute("CREATE TABLE market_stats_changes (id bigserial PRIMARY KEY)")
+    op.execute(
+        """
+        CREATE FUNCTION mark_market_stats_changed() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO market_stats_changes DEFAULT VALUES;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in ("cars", "models"):
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_market_stats_changed
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION mark_market_stats_changed()
+            """
+        )
+    # Представление могло устареть до появления отметок
+    op.execute("INSERT INTO market_stats_changes DEFAULT VALUES")
+
+
+def downgrade() -> None:
+    for table in ("cars", "models"):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_market_stats_changed ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS mark_market_stats_changed()")
+    op.execute("DROP TABLE IF EXISTS market_stats_changes")
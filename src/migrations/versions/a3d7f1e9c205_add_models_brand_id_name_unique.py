@@ -0,0 +1,49 @@
+"""add_models_brand_id_name_unique
+
+Revision ID: a3d7f1e9c205
+Revises: 8c4e1b7d2a59
+Create Date: 2026-10-17 14:08:51.277340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d7f1e9c205'
+down_revision: Union[str, None] = '8c4e1b7d2a59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Для каждой модели — самая старая модель того же бренда с тем же названием
+DUPLICATES = """
+    SELECT id, first_value(id) OVER (
+        PARTITION BY brand_id, name ORDER BY created_at, id
+    ) AS keep_id
+    FROM models
+"""
+
+
+def upgrade() -> None:
+    # Повторяющиеся модели (их могли создать параллельные загрузки CSV)
+    # объединяются: объявления переносятся на самую старую из них
+    for table in ("cars", "cars_archive"):
+        op.execute(
+            f"""
+            UPDATE {table} c SET model_id = d.keep_id
+            FROM ({DUPLICATES}) d
+            WHERE c.model_id = d.id AND d.id <> d.keep_id
+            """
+        )
+    op.execute(
+        f"""
+        DELETE FROM models m USING ({DUPLICATES}) d
+        WHERE m.id = d.id AND d.id <> d.keep_id
+        """
+    )
+    op.create_unique_constraint('uq_models_brand_id_name', 'models', ['brand_id', 'name'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_models_brand_id_name', 'models', type_='unique')
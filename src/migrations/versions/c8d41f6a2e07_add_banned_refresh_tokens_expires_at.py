@@ -0,0 +1,38 @@
+"""add_banned_refresh_tokens_expires_at
+
+Revision ID: c8d41f6a2e07
+Revises: 7a5e0c4b2d93
+Create Date: 2026-10-16 14:05:51.872240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from settings import get_settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d41f6a2e07'
+down_revision: Union[str, None] = '7a5e0c4b2d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('BannedRefreshTokens', sa.Column('expires_at', sa.DateTime(), nullable=True))
+    # Существующие записи живут не дольше срока действия refresh-токена
+    op.execute(
+        sa.text(
+            'UPDATE "BannedRefreshTokens" '
+            "SET expires_at = created_at + make_interval(days => :days)"
+        ).bindparams(days=int(get_settings().refresh_token_expire_days))
+    )
+    op.alter_column('BannedRefreshTokens', 'expires_at', nullable=False)
+    op.create_index(op.f('ix_BannedRefreshTokens_expires_at'), 'BannedRefreshTokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_BannedRefreshTokens_expires_at'), table_name='BannedRefreshTokens')
+    op.drop_column('BannedRefreshTokens', 'expires_at')
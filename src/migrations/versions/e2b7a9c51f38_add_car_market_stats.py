@@ -0,0 +1,53 @@
+"""add_car_market_stats
+
+Revision ID: e2b7a9c51f38
+Revises: c8d41f6a2e07
+Create Date: 2026-10-16 15:21:09.664017
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7a9c51f38'
+down_revision: Union[str, None] = 'c8d41f6a2e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _stats(column: str) -> str:
+    return f"""
+        min(c.{column}) AS {column}_min,
+        max(c.{column}) AS {column}_max,
+        avg(c.{column})::float AS {column}_mean,
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY c.{column}) AS {column}_median,
+        percentile_cont(0.1) WITHIN GROUP (ORDER BY c.{column}) AS {column}_p10,
+        percentile_cont(0.9) WITHIN GROUP (ORDER BY c.{column}) AS {column}_p90"""
+
+
+def upgrade() -> None:
+    # Агрегаты по активным объявлениям: по бренду и по модели за каждый год выпуска.
+    # group_id (модель или бренд) вместе с year уникален, что нужно для
+    # REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute(
+        f"""
+        CREATE MATERIALIZED VIEW car_market_stats AS
+        SELECT
+            COALESCE(c.model_id, m.brand_id) AS group_id,
+            m.brand_id,
+            c.model_id,
+            c.year,
+            count(*)::integer AS listings,{_stats("price")},{_stats("mileage")}
+        FROM cars c
+        JOIN models m ON m.id = c.model_id
+        WHERE NOT c.is_sold
+        GROUP BY GROUPING SETS ((m.brand_id, c.year), (m.brand_id, c.model_id, c.year))
+        """
+    )
+    op.create_index('ux_car_market_stats_group_id_year', 'car_market_stats', ['group_id', 'year'], unique=True)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS car_market_stats")
@@ -1,6 +1,6 @@
 import os
 import sys
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import Field, PostgresDsn
 from pydantic_settings import BaseSettings
@@ -17,6 +17,44 @@ class Settings(BaseSettings):
     postgres_port: int = Field(os.environ.get("POSTGRES_PORT"))
     postgres_db: str = Field(os.environ.get("POSTGRES_DB"))
 
+    # Реплики для чтения: список host:port через запятую
+    postgres_replica_hosts: str = Field(os.environ.get("POSTGRES_REPLICA_HOSTS", ""))
+    replica_max_lag: float = Field(os.environ.get("REPLICA_MAX_LAG", 5))
+    replica_lag_check_interval: float = Field(
+        os.environ.get("REPLICA_LAG_CHECK_INTERVAL", 5)
+    )
+    replica_selection: str = Field(
+        os.environ.get("REPLICA_SELECTION", "round_robin")
+    )
+    # Ограничение на подключение и запрос проверки отставания реплики
+    replica_probe_timeout: float = Field(os.environ.get("REPLICA_PROBE_TIMEOUT", 2))
+
+    db_pool_size: int = Field(os.environ.get("DB_POOL_SIZE", 5))
+    db_max_overflow: int = Field(os.environ.get("DB_MAX_OVERFLOW", 10))
+    db_pool_timeout: float = Field(os.environ.get("DB_POOL_TIMEOUT", 30))
+    db_pool_recycle: int = Field(os.environ.get("DB_POOL_RECYCLE", 1800))
+    db_pool_pre_ping: bool = Field(os.environ.get("DB_POOL_PRE_PING", True))
+    db_statement_cache_size: int = Field(
+        os.environ.get("DB_STATEMENT_CACHE_SIZE", 100)
+    )
+    # Лимит соединений с каждой базой на все процессы сервера; в режиме
+    # production делится между процессами. 0 — без ограничения
+    db_connection_budget: int = Field(os.environ.get("DB_CONNECTION_BUDGET", 0))
+
+    # Запуск сервера: development (один процесс с перезагрузкой) или production
+    server_mode: str = Field(os.environ.get("SERVER_MODE", "development"))
+    server_host: str = Field(os.environ.get("SERVER_HOST", "0.0.0.0"))
+    server_port: int = Field(os.environ.get("SERVER_PORT", 8010))
+    # Количество процессов; 0 — по числу ядер
+    server_workers: int = Field(os.environ.get("SERVER_WORKERS", 0))
+    server_keep_alive: int = Field(os.environ.get("SERVER_KEEP_ALIVE", 5))
+    server_backlog: int = Field(os.environ.get("SERVER_BACKLOG", 2048))
+    # Сколько секунд после SIGTERM дожидаться завершения текущих запросов
+    server_graceful_timeout: int = Field(os.environ.get("SERVER_GRACEFUL_TIMEOUT", 30))
+    server_forwarded_allow_ips: str = Field(
+        os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1")
+    )
+
     project_name: str = Field(os.environ.get("PROJECT_NAME"))
     project_description: str = Field(os.environ.get("PROJECT_DESCRIPTION"))
     project_version: str = Field(os.environ.get("PROJECT_VERSION"))
@@ -29,6 +67,100 @@ class Settings(BaseSettings):
     )
     refresh_token_expire_days: int = Field(os.environ.get("REFRESH_TOKEN_EXPIRE_DAYS"))
 
+    catalogue_cache_ttl: int = Field(os.environ.get("CATALOGUE_CACHE_TTL", 300))
+    catalogue_cache_max_size: int = Field(
+        os.environ.get("CATALOGUE_CACHE_MAX_SIZE", 1024)
+    )
+    principal_cache_ttl: int = Field(os.environ.get("PRINCIPAL_CACHE_TTL", 30))
+    # Как долго процесс доверяет прочитанному из базы состоянию отзыва токена
+    token_revocation_check_ttl: float = Field(
+        os.environ.get("TOKEN_REVOCATION_CHECK_TTL", 5)
+    )
+    password_hash_workers: int = Field(os.environ.get("PASSWORD_HASH_WORKERS", 4))
+    password_hash_max_queue: int = Field(
+        os.environ.get("PASSWORD_HASH_MAX_QUEUE", 64)
+    )
+    # Заголовки Cache-Control для публичного каталога
+    cache_control_car: str = Field(
+        os.environ.get("CACHE_CONTROL_CAR", "public, max-age=30, must-revalidate")
+    )
+    cache_control_brand: str = Field(
+        os.environ.get("CACHE_CONTROL_BRAND", "public, max-age=300, must-revalidate")
+    )
+    cache_control_model: str = Field(
+        os.environ.get("CACHE_CONTROL_MODEL", "public, max-age=300, must-revalidate")
+    )
+    car_batch_max_size: int = Field(os.environ.get("CAR_BATCH_MAX_SIZE", 5000))
+    # Метрики доступны только администраторам и по умолчанию выключены
+    is_metrics_enabled: bool = Field(os.environ.get("METRICS_ENABLED", False))
+    # Обновление материализованного представления рыночной статистики
+    market_stats_refresh_interval: float = Field(
+        os.environ.get("MARKET_STATS_REFRESH_INTERVAL", 30)
+    )
+    market_stats_max_age: float = Field(os.environ.get("MARKET_STATS_MAX_AGE", 3600))
+    cache_control_stats: str = Field(
+        os.environ.get("CACHE_CONTROL_STATS", "public, max-age=60")
+    )
+    # Хранилище фотографий: local (файлы на диске, для разработки) или s3
+    storage_backend: str = Field(os.environ.get("STORAGE_BACKEND", "local"))
+    local_storage_path: str = Field(os.environ.get("LOCAL_STORAGE_PATH", "media"))
+    local_storage_url: str = Field(os.environ.get("LOCAL_STORAGE_URL", "/media"))
+    s3_bucket: Optional[str] = Field(os.environ.get("S3_BUCKET"))
+    s3_endpoint_url: Optional[str] = Field(os.environ.get("S3_ENDPOINT_URL"))
+    s3_region: Optional[str] = Field(os.environ.get("S3_REGION"))
+    s3_access_key: Optional[str] = Field(os.environ.get("S3_ACCESS_KEY"))
+    s3_secret_key: Optional[str] = Field(os.environ.get("S3_SECRET_KEY"))
+    # Базовый адрес для публичных ссылок (CDN); по умолчанию endpoint/bucket
+    s3_public_url: Optional[str] = Field(os.environ.get("S3_PUBLIC_URL"))
+    photo_max_size: int = Field(os.environ.get("PHOTO_MAX_SIZE", 10 * 1024 * 1024))
+    photo_max_count: int = Field(os.environ.get("PHOTO_MAX_COUNT", 10))
+    image_workers: int = Field(os.environ.get("IMAGE_WORKERS", 2))
+    # Процессов обработки изображений на все процессы сервера; в режиме
+    # production делится между процессами. 0 — по числу ядер
+    image_worker_budget: int = Field(os.environ.get("IMAGE_WORKER_BUDGET", 0))
+    # Журнал: формат json или text, очередь записей и ограничение повторов
+    log_format: str = Field(os.environ.get("LOG_FORMAT", "json"))
+    log_queue_size: int = Field(os.environ.get("LOG_QUEUE_SIZE", 10_000))
+    log_rate_limit_burst: int = Field(os.environ.get("LOG_RATE_LIMIT_BURST", 10))
+    log_rate_limit_interval: float = Field(
+        os.environ.get("LOG_RATE_LIMIT_INTERVAL", 60)
+    )
+    # Пороги журнала медленных SQL-запросов и HTTP-запросов, мс
+    slow_query_threshold_ms: float = Field(
+        os.environ.get("SLOW_QUERY_THRESHOLD_MS", 200)
+    )
+    slow_request_threshold_ms: float = Field(
+        os.environ.get("SLOW_REQUEST_THRESHOLD_MS", 1000)
+    )
+    # Очистка истёкших заблокированных refresh-токенов
+    banned_token_purge_interval: float = Field(
+        os.environ.get("BANNED_TOKEN_PURGE_INTERVAL", 600)
+    )
+    banned_token_purge_batch_size: int = Field(
+        os.environ.get("BANNED_TOKEN_PURGE_BATCH_SIZE", 1000)
+    )
+    # Фоновое обслуживание базы выполняет один процесс, удерживающий
+    # advisory-блокировку; остальные пытаются её захватить раз в интервал
+    maintenance_lock_interval: float = Field(
+        os.environ.get("MAINTENANCE_LOCK_INTERVAL", 30)
+    )
+    # Общее количество в списке автомобилей: точный COUNT, если оценка
+    # планировщика не больше порога, иначе оценка с кэшированием по фильтру
+    count_exact_threshold: int = Field(os.environ.get("COUNT_EXACT_THRESHOLD", 10000))
+    count_cache_ttl: float = Field(os.environ.get("COUNT_CACHE_TTL", 60))
+    count_cache_max_size: int = Field(os.environ.get("COUNT_CACHE_MAX_SIZE", 1024))
+    # Перенос проданных (через ARCHIVE_SOLD_AFTER_DAYS после изменения) и
+    # устаревших (через ARCHIVE_STALE_AFTER_DAYS) объявлений в cars_archive
+    archive_sold_after_days: float = Field(os.environ.get("ARCHIVE_SOLD_AFTER_DAYS", 30))
+    archive_stale_after_days: float = Field(
+        os.environ.get("ARCHIVE_STALE_AFTER_DAYS", 365)
+    )
+    archive_batch_size: int = Field(os.environ.get("ARCHIVE_BATCH_SIZE", 1000))
+    archive_max_batches: int = Field(os.environ.get("ARCHIVE_MAX_BATCHES", 100))
+    archive_interval: float = Field(os.environ.get("ARCHIVE_INTERVAL", 3600))
+    # Потоковая выгрузка каталога: строк в одной пачке серверного курсора
+    export_batch_size: int = Field(os.environ.get("EXPORT_BATCH_SIZE", 1000))
+
     @property
     def database_url(self) -> Optional[PostgresDsn]:
         return (
@@ -37,6 +169,19 @@ class Settings(BaseSettings):
         )
 
 
+    @property
+    def replica_database_urls(self) -> List[str]:
+        urls = []
+        for host in filter(None, map(str.strip, self.postgres_replica_hosts.split(","))):
+            if ":" not in host:
+                host = f"{host}:{self.postgres_port}"
+            urls.append(
+                f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@"
+                f"{host}/{self.postgres_db}"
+            )
+        return urls
+
+
 settings: Settings | None = None
 
 